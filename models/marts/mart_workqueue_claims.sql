@@ -1,5 +1,12 @@
 -- mart_workqueue_claims.sql
 -- Claim-grain workqueue mart for triage and analytics
+-- Partitioned on min_svc_dt so the denials scripts' aging windows prune to the lookback range
+
+{{ config(
+    materialized='table',
+    partition_by={'field': 'min_svc_dt', 'data_type': 'date'},
+    cluster_by=['top_denial_group']
+) }}
 
 with base_claim as (
     select
@@ -106,6 +113,7 @@ select
     coalesce(d.denied_potential_allowed_proxy_amt, 0) as denied_potential_allowed_proxy_amt,
     greatest(b.payer_allowed_amt - b.observed_paid_amt, 0) + coalesce(d.denied_potential_allowed_proxy_amt, 0) as at_risk_amt,
     case when b.comparable_line_count > 0 then b.denial_line_count / b.comparable_line_count else null end as p_denial,
+    b.min_svc_dt,
     date_diff(current_date(), b.min_svc_dt, day) as aging_days,
     dr.top_hcpcs,
     dr.top_denial_prcsg,
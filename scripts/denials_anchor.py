@@ -0,0 +1,57 @@
+"""Date anchor of the denials scripts' DETAIL_SQL, set by a script prefix in the same job as the query it anchors.
+
+BigQuery prunes partitions only when the filter on the partition column is a constant expression; a script variable
+counts as one, a scalar subquery does not. So each job first sets anchor_min_aging_days and anchor_max_svc_dt from a
+narrow read of the denial-flag columns, aging_days and min_svc_dt, and DETAIL_SQL filters min_svc_dt against
+anchor_max_svc_dt; the detail scan then reads only the partitions inside the lookback window.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+
+from denials_engine import QueryParam, bind_variables
+
+
+ANCHOR_VARIABLES = {"anchor_min_aging_days": "INT64", "anchor_max_svc_dt": "DATE"}
+
+ANCHOR_SQL = """
+SELECT
+  COALESCE(MIN(CAST(COALESCE(aging_days, 0) AS INT64)), 0) AS min_aging_days,
+  MAX(min_svc_dt) AS max_svc_dt
+FROM `{source_fqn}`
+WHERE
+  COALESCE(p_denial, 0.0) > 0
+  OR COALESCE(top_denial_prcsg, '') != ''
+  OR COALESCE(top_denial_group, 'UNSPECIFIED') != 'UNSPECIFIED'
+  OR COALESCE(denied_potential_allowed_proxy_amt, 0.0) > 0
+"""
+
+
+def anchor_script(source_fqn: str) -> str:
+    """DECLARE/SET statements that run ANCHOR_SQL; anchor_max_svc_dt is NULL when no denied row has a service date,
+    and DETAIL_SQL then keeps only the undated rows."""
+    declares = "".join(f"DECLARE {name} {type_};\n" for name, type_ in ANCHOR_VARIABLES.items())
+    select = ANCHOR_SQL.format(source_fqn=source_fqn).strip().replace("SELECT", "SELECT AS STRUCT", 1)
+    return f"{declares}SET ({', '.join(ANCHOR_VARIABLES)}) = (\n{select}\n);\n"
+
+
+def anchored(sql: str, source_fqn: str) -> str:
+    """sql as one job: the anchor statements, then sql reading the anchor variables as constants."""
+    return anchor_script(source_fqn) + sql
+
+
+def anchor_estimates(
+    queries: list[tuple[str, list[QueryParam]]], source_fqn: str, run_date: date
+) -> list[tuple[str, list[QueryParam]]]:
+    """Queries to dry-run in place of the anchored jobs, before any of them runs: ANCHOR_SQL, then each query with the
+    variables bound to placeholders. The placeholder window ends on run_date, so it spans as many partitions as the
+    real one but not necessarily the same ones; the jobs still run with --max-bytes-billed as a hard cap."""
+    placeholders = [
+        QueryParam("anchor_min_aging_days", "INT64", 0),
+        QueryParam("anchor_max_svc_dt", "DATE", run_date),
+    ]
+    return [
+        (ANCHOR_SQL.format(source_fqn=source_fqn), []),
+        *((bind_variables(sql, list(ANCHOR_VARIABLES)), [*params, *placeholders]) for sql, params in queries),
+    ]
@@ -0,0 +1,98 @@
+"""Multi-week backfill: one wide detail fetch, split by dataset week once, per-week artifacts written by a process pool."""
+
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Iterator, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from denials_frame import week_key
+
+
+DONE_MARKER = "_DONE"
+
+
+class WeekSlice(NamedTuple):
+    week_key: str
+    prior_week_key: str
+    current: pd.DataFrame
+    prior: pd.DataFrame
+
+
+# (week slice, week output dir, options) -> written paths; must be a module-level function so it pickles.
+WeekRenderer = Callable[[WeekSlice, Path, dict[str, Any]], list[Path]]
+
+
+def add_backfill_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--backfill-weeks",
+        type=int,
+        default=0,
+        help="Write outputs for each of the latest N dataset weeks (each against its prior week) from one detail query.",
+    )
+    parser.add_argument("--backfill-workers", type=int, default=1, help="Processes writing backfill weeks.")
+
+
+def backfill_lookback_days(weeks: int, lookback_days: int) -> int:
+    """Lookback wide enough for N full weeks plus the prior week of the oldest one."""
+    return max(lookback_days, 7 * (weeks + 2))
+
+
+def week_slices(detail_df: pd.DataFrame, weeks: int, last_week_id: int | None = None) -> Iterator[WeekSlice]:
+    """Latest `weeks` dataset weeks, oldest first, each paired with the previous week present in the data."""
+    positions = detail_df.groupby("dataset_week_id", sort=True).indices
+    week_ids = [wk for wk in positions if last_week_id is None or wk <= last_week_id]
+    for i in range(max(len(week_ids) - weeks, 0), len(week_ids)):
+        current = detail_df.iloc[positions[week_ids[i]]]
+        if i:
+            prior_id = week_ids[i - 1]
+            yield WeekSlice(week_key(week_ids[i]), week_key(prior_id), current, detail_df.iloc[positions[prior_id]])
+        else:
+            yield WeekSlice(week_key(week_ids[i]), "", current, detail_df.iloc[np.array([], dtype=np.intp)])
+
+
+def run_backfill(
+    render: WeekRenderer, slices: Iterator[WeekSlice], root: Path, options: dict[str, Any], workers: int = 1
+) -> tuple[list[str], list[str]]:
+    """Render every week not yet marked done under root/<week_key>/; returns (written, skipped) week keys.
+
+    A week's marker is written only after all of its files, so an interrupted backfill resumes at the first unfinished week.
+    """
+    written: list[str] = []
+    skipped: list[str] = []
+
+    def finish(week_dir: Path, paths: list[Path]) -> None:
+        (week_dir / DONE_MARKER).write_text("".join(f"{path.name}\n" for path in paths), encoding="utf-8")
+        written.append(week_dir.name)
+
+    def pending() -> Iterator[tuple[WeekSlice, Path]]:
+        for week in slices:
+            week_dir = root / week.week_key
+            if (week_dir / DONE_MARKER).exists():
+                skipped.append(week.week_key)
+                continue
+            week_dir.mkdir(parents=True, exist_ok=True)
+            yield week, week_dir
+
+    if workers <= 1:
+        for week, week_dir in pending():
+            finish(week_dir, render(week, week_dir, options))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(render, week, week_dir, options): week_dir for week, week_dir in pending()}
+            for future in as_completed(futures):
+                finish(futures[future], future.result())
+    return sorted(written), skipped
+
+
+def backfill_summary_lines(root: Path, written: list[str], skipped: list[str]) -> list[str]:
+    return [
+        f"BACKFILL_DIR={root.as_posix()}",
+        f"BACKFILL_WEEKS_WRITTEN={len(written)}",
+        f"BACKFILL_WEEKS_SKIPPED={len(skipped)}",
+        f"BACKFILL_WEEK_RANGE={min(written + skipped, default='NONE')}..{max(written + skipped, default='NONE')}",
+    ]
@@ -0,0 +1,129 @@
+"""On-disk Parquet cache for query results, shared by the denials brief scripts."""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Iterator
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from denials_engine import FETCH_PAGE_ROWS, QueryEngine, QueryParam, cast_result, to_frame
+
+
+DEFAULT_CACHE_MAX_BYTES = 1 << 30
+
+
+def cache_key(engine_name: str, source_version: str, sql: str, params: list[QueryParam]) -> str:
+    payload = {
+        "engine": engine_name,
+        "source_version": source_version,
+        "sql": sql,
+        "params": [[p.name, p.type_, str(p.value)] for p in params],
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class CachedEngine:
+    """Serves repeated (SQL, params, source version) queries from Parquet files; evicts least recently used."""
+
+    def __init__(self, engine: QueryEngine, cache_dir: Path, max_bytes: int) -> None:
+        self.engine = engine
+        self.name = engine.name
+        self.stats = engine.stats
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._source_version: str | None = None
+        self._lock = threading.Lock()
+
+    def source_version(self) -> str:
+        with self._lock:
+            if self._source_version is None:
+                self._source_version = self.engine.source_version()
+            return self._source_version
+
+    def _path(self, sql: str, params: list[QueryParam]) -> Path:
+        return self.cache_dir / f"{cache_key(self.name, self.source_version(), sql, params)}.parquet"
+
+    def estimate_bytes(self, sql: str, params: list[QueryParam]) -> int:
+        return 0 if self._path(sql, params).exists() else self.engine.estimate_bytes(sql, params)
+
+    def iter_arrow(self, sql: str, params: list[QueryParam]) -> Iterator[pa.Table]:
+        path = self._path(sql, params)
+        if path.exists():
+            os.utime(path)
+            self.stats.record_cache(hit=True)
+            parquet = pq.ParquetFile(path)
+            if not parquet.metadata.num_rows:
+                yield cast_result(parquet.schema_arrow.empty_table())
+            for batch in parquet.iter_batches(batch_size=FETCH_PAGE_ROWS):
+                yield cast_result(pa.Table.from_batches([batch]))
+            return
+        self.stats.record_cache(hit=False)
+        tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp")
+        writer: pq.ParquetWriter | None = None
+        complete = False
+        try:
+            for table in self.engine.iter_arrow(sql, params):
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp_path, table.schema)
+                writer.write_table(table)
+                yield table
+            complete = True
+        finally:
+            if writer is not None:
+                writer.close()
+            if complete:
+                os.replace(tmp_path, path)
+                self._evict()
+            else:
+                tmp_path.unlink(missing_ok=True)
+
+    def query_arrow(self, sql: str, params: list[QueryParam]) -> pa.Table:
+        return pa.concat_tables(list(self.iter_arrow(sql, params)))
+
+    def query_df(self, sql: str, params: list[QueryParam]) -> pd.DataFrame:
+        return to_frame(self.query_arrow(sql, params))
+
+    def _evict(self) -> None:
+        entries = sorted(
+            ((f.stat().st_mtime_ns, f.stat().st_size, f) for f in self.cache_dir.glob("*.parquet")),
+            key=lambda item: item[0],
+        )
+        total = sum(size for _, size, _ in entries)
+        for _, size, f in entries:
+            if total <= self.max_bytes:
+                break
+            f.unlink(missing_ok=True)
+            total -= size
+
+
+def add_cache_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--cache",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Reuse query results cached by SQL, parameters and source last-modified time (default: off).",
+    )
+    parser.add_argument("--cache-dir", default=str(Path("exports") / "cache"), help="Directory for cached Parquet results.")
+    parser.add_argument(
+        "--cache-max-bytes",
+        type=int,
+        default=DEFAULT_CACHE_MAX_BYTES,
+        help="Size cap for the cache directory; least recently used results are evicted first.",
+    )
+
+
+def with_cache(engine: QueryEngine, args: argparse.Namespace) -> QueryEngine:
+    if not args.cache:
+        return engine
+    if args.cache_max_bytes <= 0:
+        raise RuntimeError("--cache-max-bytes must be positive.")
+    return CachedEngine(engine, Path(args.cache_dir), args.cache_max_bytes)
@@ -0,0 +1,61 @@
+"""Ordered regex rule tables, compiled once, applied to distinct values in Python and emitted as SQL CASE cascades."""
+
+from __future__ import annotations
+
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Mapping, Sequence
+
+
+BUCKET_RULES: list[tuple[str, str]] = [
+    ("AUTH_ELIG", r"auth|authorization|precert|elig|eligibility|coverage|member"),
+    ("CODING_DOC", r"coding|modifier|dx|icd|cpt|documentation|medical record|bundl"),
+    ("TIMELY_FILING", r"timely|filing|limit|late"),
+    ("DUPLICATE", r"duplicate|dup"),
+    ("CONTRACTUAL", r"contract|noncovered|non-covered|bundled per contract|write off"),
+]
+DEFAULT_BUCKET = "OTHER_PROXY"
+# Below this many distinct values a process pool costs more to start than it saves.
+PARALLEL_MIN_VALUES = 50_000
+
+
+class RuleClassifier:
+    """First matching rule wins, like a CASE WHEN cascade; patterns are compiled once when the table is built."""
+
+    def __init__(self, rules: Sequence[tuple[str, str]], default: str) -> None:
+        self.rules = list(rules)
+        self.default = default
+        self.labels = list(dict.fromkeys([*(label for label, _ in self.rules), default]))
+        self.compiled = [(label, re.compile(pattern).search) for label, pattern in self.rules]
+
+    def classify_text(self, text: str) -> str:
+        for label, search in self.compiled:
+            if search(text):
+                return label
+        return self.default
+
+    def _classify_chunk(self, texts: Sequence[str]) -> list[str]:
+        return [self.classify_text(text) for text in texts]
+
+    def classify_unique(self, texts: Sequence[str], workers: int = 1) -> list[str]:
+        """Label per text, split across worker processes when there are enough texts to pay for them."""
+        if workers <= 1 or len(texts) < PARALLEL_MIN_VALUES:
+            return self._classify_chunk(texts)
+        size = -(-len(texts) // workers)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = pool.map(self._classify_chunk, [texts[i : i + size] for i in range(0, len(texts), size)])
+            return [label for chunk in chunks for label in chunk]
+
+    def case_sql(self, column: str, outputs: Mapping[str, str] | None = None, indent: str = "    ") -> str:
+        """CASE cascade over REGEXP_CONTAINS(column, ...); outputs maps labels to SQL expressions (quoted labels if None)."""
+        def value(label: str) -> str:
+            return outputs[label] if outputs is not None else f"'{label}'"
+
+        lines = ["CASE"]
+        lines += [f"{indent}  WHEN REGEXP_CONTAINS({column}, r'{pattern}') THEN {value(label)}" for label, pattern in self.rules]
+        lines += [f"{indent}  ELSE {value(self.default)}", f"{indent}END"]
+        return "\n".join(lines)
+
+
+BUCKET_CLASSIFIER = RuleClassifier(BUCKET_RULES, DEFAULT_BUCKET)
+DENIAL_BUCKET_SQL = BUCKET_CLASSIFIER.case_sql("denial_reason_text")
@@ -0,0 +1,207 @@
+"""Grouped aggregation behind a selectable backend: pandas, or pyarrow's multithreaded hash aggregation (Acero).
+
+Both backends return the same frame, byte for byte once written: float sums are exact (math.fsum, correctly rounded)
+and money sums are int64 fixed-point (denials_money), rather than order-dependent, so splitting the rows across
+threads cannot change a digit.
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+from fractions import Fraction
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from denials_money import fixed_units, parse_fixed, units_to_floats
+
+
+COMPUTE_BACKENDS = ("pandas", "arrow")
+# output name -> (source column, how); how is fsum, mean (exact sum / non-null count), a fixed-point money sum or mean
+# (denials_money.fixed_how), sum (integers), size, count, first, max or min.
+Aggs = dict[str, tuple[str, str]]
+# Exact sums split each value into signed 31-bit integer limbs; int64 limb sums cannot overflow below 2**32 rows.
+LIMB_BITS = 31
+LIMB_MASK = (1 << LIMB_BITS) - 1
+# Wider columns (values spanning more than ~370 binary orders of magnitude) fall back to pandas.
+MAX_LIMBS = 12
+
+
+def add_compute_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--compute-backend",
+        choices=COMPUTE_BACKENDS,
+        default="pandas",
+        help="Grouped aggregations in pandas (single thread) or pyarrow hash aggregation (all cores); outputs are identical.",
+    )
+
+
+def _exact_mean(values: pd.Series) -> float:
+    present = values.dropna()
+    return math.fsum(present) / len(present) if len(present) else float("nan")
+
+
+PANDAS_HOWS = {"fsum": math.fsum, "mean": _exact_mean}
+
+
+def group_agg(df: pd.DataFrame, keys: Sequence[str], aggs: Aggs, backend: str = "pandas") -> pd.DataFrame:
+    """Like df.groupby(keys, as_index=False, observed=True).agg(**aggs): one row per observed key, in groupby order."""
+    df, aggs, fixed = _fixed_point_units(df, aggs)
+    grouped = None
+    if backend == "arrow" and len(df):
+        grouped = _arrow_group_agg(df, list(keys), aggs)
+    if grouped is None:
+        grouped = df.groupby(list(keys), as_index=False, observed=True).agg(
+            **{name: (column, PANDAS_HOWS.get(how, how)) for name, (column, how) in aggs.items()}
+        )
+    for name, (decimals, rows) in fixed.items():
+        grouped[name] = units_to_floats(grouped[name].to_numpy(), decimals, grouped.pop(rows).to_numpy() if rows else None)
+    return grouped
+
+
+def _fixed_point_units(df: pd.DataFrame, aggs: Aggs) -> tuple[pd.DataFrame, Aggs, dict[str, tuple[int, str | None]]]:
+    """Swap fixed-point aggregations for integer sums of unit columns (plus a row count for means)."""
+    units: dict[str, np.ndarray] = {}
+    plain: Aggs = {}
+    fixed: dict[str, tuple[int, str | None]] = {}
+    for i, (name, (column, how)) in enumerate(aggs.items()):
+        parsed = parse_fixed(how)
+        if parsed is None:
+            plain[name] = (column, how)
+            continue
+        decimals, is_mean = parsed
+        units[f"_units{i}"] = fixed_units(df[column], decimals)
+        plain[name] = (f"_units{i}", "sum")
+        if is_mean:
+            plain[f"_rows{i}"] = (f"_units{i}", "size")
+        fixed[name] = (decimals, f"_rows{i}" if is_mean else None)
+    return (df.assign(**units), plain, fixed) if units else (df, aggs, fixed)
+
+
+def exact_limbs(values: np.ndarray) -> tuple[list[np.ndarray], int] | None:
+    """Signed int64 limbs L_j with sum_j L_j * 2**(31 j) == value * 2**scale_bits exactly; None if too wide."""
+    values = np.asarray(values, dtype=float)
+    mantissa, exponent = np.frexp(np.abs(values))
+    digits = (mantissa * 2.0**53).astype(np.int64)
+    nonzero = digits != 0
+    if not nonzero.any():
+        return [np.zeros(len(values), dtype=np.int64)], 0
+    lowest_bit = np.log2((digits & -digits)[nonzero].astype(float)).astype(np.int64)
+    # Never below 0: whole numbers need no scaling, and a negative scale would make exact_total shift by a negative count.
+    scale_bits = max(int(-(exponent[nonzero] - 53 + lowest_bit).min()), 0)
+    width = int(exponent[nonzero].max()) + scale_bits
+    n_limbs = max(-(-width // LIMB_BITS), 1)
+    if n_limbs > MAX_LIMBS:
+        return None
+    shift = np.where(nonzero, exponent - 53 + scale_bits, 0).astype(np.int64)
+    negative = np.signbit(values)
+    limbs = []
+    for j in range(n_limbs):
+        offset = shift - LIMB_BITS * j
+        left = np.clip(offset, 0, LIMB_BITS)
+        right = np.clip(-offset, 0, 63)
+        limb = np.where(offset >= 0, (digits & ((1 << (LIMB_BITS - left)) - 1)) << left, (digits >> right) & LIMB_MASK)
+        limbs.append(np.where(negative, -limb, limb))
+    return limbs, scale_bits
+
+
+def exact_total(limb_sums: Sequence[int], scale_bits: int) -> float:
+    """Correctly rounded float of sum_j limb_sums[j] * 2**(31 j - scale_bits), i.e. what math.fsum returns."""
+    total = sum(int(s) << (LIMB_BITS * j) for j, s in enumerate(limb_sums))
+    return float(Fraction(total, 1 << scale_bits))
+
+
+def _key_array(series: pd.Series) -> pa.Array:
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        return pa.array(codes, mask=codes < 0)
+    return pa.array(series, from_pandas=True)
+
+
+def _arrow_group_agg(df: pd.DataFrame, keys: list[str], aggs: Aggs) -> pd.DataFrame | None:
+    """Acero hash aggregation; None when a float sum holds NaN/inf or is too wide for exact limbs (pandas then runs)."""
+    present = df[keys].notna().all(axis=1).to_numpy()
+    if not present.all():
+        df = df[present]
+    columns: dict[str, pa.Array] = {f"k{i}": _key_array(df[key]) for i, key in enumerate(keys)}
+    requests: list[tuple[str | list[str], str] | tuple[str, str, pc.FunctionOptions]] = []
+    plans: list[tuple[str, str, str, object]] = []
+    for i, (name, (column, how)) in enumerate(aggs.items()):
+        values = df[column]
+        if how == "size":
+            # A per-aggregation column: count_all over no columns would give every size output the same field name.
+            columns[f"v{i}"] = pa.array(np.zeros(len(df), dtype=np.int8))
+            requests.append((f"v{i}", "count", pc.CountOptions(mode="all")))
+            plans.append((name, how, f"v{i}_count", None))
+        elif how in ("count", "max", "min", "sum"):
+            columns[f"v{i}"] = pa.array(values, from_pandas=True)
+            requests.append((f"v{i}", how))
+            plans.append((name, how, f"v{i}_{how}", values.dtype))
+        elif how == "first":
+            valid = values.notna().to_numpy()
+            columns[f"v{i}"] = pa.array(np.arange(len(values), dtype=np.int64), mask=~valid)
+            requests.append((f"v{i}", "min"))
+            plans.append((name, how, f"v{i}_min", values))
+        elif how in ("fsum", "mean"):
+            numbers = values.to_numpy(dtype=float, na_value=np.nan)
+            finite = np.isfinite(numbers)
+            if how == "fsum" and not finite.all():
+                return None
+            split = exact_limbs(np.where(finite, numbers, 0.0))
+            if split is None:
+                return None
+            limbs, scale_bits = split
+            for j, limb in enumerate(limbs):
+                columns[f"v{i}_{j}"] = pa.array(limb)
+                requests.append((f"v{i}_{j}", "sum"))
+            if how == "fsum":
+                # fsum keeps -0.0 only when every value is -0.0.
+                columns[f"v{i}_nz"] = pa.array((numbers == 0) & np.signbit(numbers))
+                requests.append((f"v{i}_nz", "all"))
+            else:
+                columns[f"v{i}_n"] = pa.array(finite)
+                requests.append((f"v{i}_n", "sum"))
+            plans.append((name, how, f"v{i}", (len(limbs), scale_bits)))
+        else:
+            raise RuntimeError(f"Unsupported aggregation for --compute-backend arrow: {how}")
+
+    table = pa.table(columns).group_by([f"k{i}" for i in range(len(keys))], use_threads=True).aggregate(requests)
+    out = pd.DataFrame(
+        {
+            key: (
+                pd.Categorical.from_codes(table[f"k{i}"].to_numpy(), dtype=df[key].dtype)
+                if isinstance(df[key].dtype, pd.CategoricalDtype)
+                else pd.Series(table[f"k{i}"].to_pandas()).astype(df[key].dtype)
+            )
+            for i, key in enumerate(keys)
+        }
+    )
+    for name, how, field, extra in plans:
+        if how in ("size", "count", "sum"):
+            out[name] = table[field].to_numpy().astype(np.int64)
+        elif how in ("max", "min"):
+            out[name] = pd.Series(table[field].to_pandas()).astype(extra)
+        elif how == "first":
+            positions = table[field].to_numpy(zero_copy_only=False)
+            positions = np.where(pd.isna(positions), -1, positions).astype(np.int64)
+            if extra.dtype == object:
+                # pandas' first() gives None, not NaN, for an object column with no value in the group.
+                taken = np.full(len(positions), None, dtype=object)
+                taken[positions >= 0] = extra.to_numpy()[positions[positions >= 0]]
+                out[name] = taken
+            else:
+                out[name] = pd.Series(extra.array.take(positions, allow_fill=True))
+        else:
+            n_limbs, scale_bits = extra
+            limb_sums = [table[f"{field}_{j}_sum"].to_pylist() for j in range(n_limbs)]
+            totals = [exact_total(group, scale_bits) for group in zip(*limb_sums)]
+            if how == "fsum":
+                out[name] = [-0.0 if negative_zero else total for total, negative_zero in zip(totals, table[f"{field}_nz_all"].to_pylist())]
+            else:
+                counts = table[f"{field}_n_sum"].to_pylist()
+                out[name] = [total / count if count else float("nan") for total, count in zip(totals, counts)]
+    return out.sort_values(keys, kind="mergesort").reset_index(drop=True)
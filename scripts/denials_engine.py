@@ -0,0 +1,519 @@
+"""Query execution backends shared by the denials brief scripts."""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable, Iterator, NamedTuple, Protocol
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+
+ENGINE_CHOICES = ("bigquery", "local")
+FETCH_PAGE_ROWS = 100_000
+DEFAULT_MAX_CONCURRENT_JOBS = 4
+ON_DEMAND_USD_PER_TIB = 6.25
+
+# claim_id stays text: the mart casts clm_id to STRING and the workqueue breaks ties on it lexically.
+RESULT_ARROW_TYPES: dict[str, pa.DataType] = {
+    "claim_id": pa.string(),
+    "service_date": pa.date32(),
+    "dataset_week_key": pa.date32(),
+    "aging_days": pa.int64(),
+    "min_aging_days": pa.int64(),
+    "denial_bucket": pa.dictionary(pa.int32(), pa.string()),
+    "denial_reason": pa.dictionary(pa.int32(), pa.string()),
+    "denied_amount": pa.float64(),
+    "denied_amount_proxy": pa.float64(),
+    "p_denial": pa.float64(),
+    "preventability_weight": pa.float64(),
+    "recoverability_weight": pa.float64(),
+    "time_weight": pa.float64(),
+    "row_priority": pa.float64(),
+    "prevention_priority_score": pa.float64(),
+    "recovery_priority_score": pa.float64(),
+}
+
+try:
+    TEXT_DTYPE = pd.StringDtype("pyarrow", na_value=np.nan)
+except TypeError:
+    TEXT_DTYPE = pd.StringDtype("pyarrow_numpy")
+
+
+class QueryParam(NamedTuple):
+    name: str
+    type_: str
+    value: Any
+
+
+class FetchStats:
+    def __init__(self) -> None:
+        self.jobs = 0
+        self.rows = 0
+        self.batches = 0
+        self.seconds = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # Warehouse slot time of the jobs run; None until an engine that reports it runs one.
+        self.slot_ms: int | None = None
+        self._lock = threading.Lock()
+
+    def record(self, rows: int, batches: int, started: float, slot_ms: int | None = None) -> None:
+        with self._lock:
+            self.jobs += 1
+            self.rows += rows
+            self.batches += batches
+            self.seconds += time.perf_counter() - started
+            if slot_ms is not None:
+                self.slot_ms = (self.slot_ms or 0) + slot_ms
+
+    def record_cache(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+
+
+class QueryEngine(Protocol):
+    name: str
+    stats: FetchStats
+
+    def source_version(self) -> str: ...
+
+    def estimate_bytes(self, sql: str, params: list[QueryParam]) -> int: ...
+
+    def iter_arrow(self, sql: str, params: list[QueryParam]) -> Iterator[pa.Table]: ...
+
+    def query_arrow(self, sql: str, params: list[QueryParam]) -> pa.Table: ...
+
+    def query_df(self, sql: str, params: list[QueryParam]) -> pd.DataFrame: ...
+
+
+def _split_call_args(body: str) -> list[str]:
+    args: list[str] = []
+    depth = 0
+    quote = ""
+    start = 0
+    for i, ch in enumerate(body):
+        if quote:
+            if ch == quote:
+                quote = ""
+            continue
+        if ch in ("'", '"'):
+            quote = ch
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            args.append(body[start:i].strip())
+            start = i + 1
+    args.append(body[start:].strip())
+    return args
+
+
+def _rewrite_calls(sql: str, name: str, rewrite: Callable[[list[str]], str]) -> str:
+    pattern = re.compile(rf"\b{name}\s*\(", re.IGNORECASE)
+    out: list[str] = []
+    pos = 0
+    while True:
+        match = pattern.search(sql, pos)
+        if not match:
+            out.append(sql[pos:])
+            return "".join(out)
+        depth = 1
+        quote = ""
+        i = match.end()
+        while i < len(sql) and depth:
+            ch = sql[i]
+            if quote:
+                if ch == quote:
+                    quote = ""
+            elif ch in ("'", '"'):
+                quote = ch
+            elif ch == "(":
+                depth += 1
+            elif ch == ")":
+                depth -= 1
+            i += 1
+        if depth:
+            raise ValueError(f"Unbalanced parentheses after {name}( in SQL.")
+        out.append(sql[pos:match.start()])
+        out.append(rewrite(_split_call_args(sql[match.end():i - 1])))
+        pos = i
+
+
+def _date_sub_days(args: list[str]) -> str:
+    interval = re.fullmatch(r"INTERVAL\s+(.+)\s+DAY", args[1], re.IGNORECASE | re.DOTALL)
+    if len(args) != 2 or not interval:
+        raise ValueError(f"Unsupported DATE_SUB arguments: {args}")
+    # The inner cast types a NULL date parameter, which DuckDB cannot subtract from as is.
+    return f"CAST(CAST(({translate_sql(args[0])}) AS DATE) - INTERVAL ({translate_sql(interval.group(1))}) DAY AS DATE)"
+
+
+def _date_trunc_week(args: list[str]) -> str:
+    if len(args) != 2 or re.sub(r"\s+", "", args[1]).upper() != "WEEK(MONDAY)":
+        raise ValueError(f"Unsupported DATE_TRUNC arguments: {args}")
+    return f"CAST(DATE_TRUNC('week', {translate_sql(args[0])}) AS DATE)"
+
+
+def _safe_divide(args: list[str]) -> str:
+    if len(args) != 2:
+        raise ValueError(f"Unsupported SAFE_DIVIDE arguments: {args}")
+    return f"(CAST(({translate_sql(args[0])}) AS DOUBLE) / NULLIF(({translate_sql(args[1])}), 0))"
+
+
+def translate_sql(sql: str) -> str:
+    """Rewrite the BigQuery dialect used by the denials scripts (and the marts' SAFE_DIVIDE) into DuckDB SQL."""
+    out = _rewrite_calls(sql, "DATE_SUB", _date_sub_days)
+    out = _rewrite_calls(out, "DATE_TRUNC", _date_trunc_week)
+    out = _rewrite_calls(out, "SAFE_DIVIDE", _safe_divide)
+    out = re.sub(r"\br'", "'", out)
+    parts = re.split(r"('(?:[^']|'')*')", out)
+    for i in range(0, len(parts), 2):
+        code = parts[i]
+        code = re.sub(r"\bREGEXP_CONTAINS\s*\(", "regexp_matches(", code, flags=re.IGNORECASE)
+        code = re.sub(r"\bAS\s+STRING\b", "AS VARCHAR", code, flags=re.IGNORECASE)
+        code = re.sub(r"\bAS\s+INT64\b", "AS BIGINT", code, flags=re.IGNORECASE)
+        code = re.sub(r"\bAS\s+FLOAT64\b", "AS DOUBLE", code, flags=re.IGNORECASE)
+        # BigQuery reads 1.0 as FLOAT64; DuckDB would read it as DECIMAL.
+        code = re.sub(r"(?<![\w.])(\d+\.\d+)(?![\w.])", r"CAST(\1 AS DOUBLE)", code)
+        code = re.sub(r"`([^`]+)`", r'"\1"', code)
+        parts[i] = re.sub(r"@(\w+)", r"$\1", code)
+    return "".join(parts)
+
+
+def _split_statements(sql: str) -> list[str]:
+    """Statements of a script, each ended by a semicolon at the end of a line; string literals and mid-line semicolons
+    (as in comments) do not split."""
+    parts = re.split(r"('(?:[^']|'')*')", sql)
+    statements = [""]
+    for i, part in enumerate(parts):
+        pieces = [part] if i % 2 else re.split(r";[ \t]*(?:\n|$)", part)
+        statements[-1] += pieces[0]
+        statements.extend(pieces[1:])
+    return [statement.strip() for statement in statements if statement.strip()]
+
+
+_DECLARE = re.compile(r"DECLARE\s+(\w+)\s+(\w+)$", re.IGNORECASE)
+_SET_STRUCT = re.compile(r"SET\s*\(([\w\s,]+)\)\s*=\s*\(\s*SELECT\s+AS\s+STRUCT\b(.*)\)$", re.IGNORECASE | re.DOTALL)
+
+
+def bind_variables(sql: str, names: list[str]) -> str:
+    """Turn references to script variables into @params of the same names."""
+    return re.sub(rf"\b({'|'.join(map(re.escape, names))})\b", r"@\1", sql) if names else sql
+
+
+def cast_result(table: pa.Table) -> pa.Table:
+    """Cast a result table to the shared column types; unknown columns keep their wire type."""
+    schema = pa.schema([pa.field(f.name, RESULT_ARROW_TYPES.get(f.name, f.type)) for f in table.schema])
+    return table if schema.equals(table.schema) else table.cast(schema)
+
+
+def _pandas_type(arrow_type: pa.DataType) -> Any:
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return TEXT_DTYPE
+    return None
+
+
+def to_frame(table: pa.Table) -> pd.DataFrame:
+    """Convert a typed result table: text as pyarrow strings, dictionaries as lexically ordered categories."""
+    df = table.to_pandas(types_mapper=_pandas_type, date_as_object=False, self_destruct=True)
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].cat.reorder_categories(sorted(df[col].cat.categories))
+    return df
+
+
+def iter_frames(engine: QueryEngine, sql: str, params: list[QueryParam]) -> Iterator[pd.DataFrame]:
+    """Result pages as typed frames, one at a time; callers never hold the full result."""
+    # Closing this generator closes the engine's at once, instead of whenever it is collected.
+    with contextlib.closing(engine.iter_arrow(sql, params)) as tables:
+        for table in tables:
+            yield to_frame(table)
+
+
+def query_frames(engine: QueryEngine, queries: list[tuple[str, list[QueryParam]]]) -> list[pd.DataFrame]:
+    """Submit independent queries as concurrent jobs; the engine caps how many are in flight. Results keep request order."""
+    if len(queries) <= 1:
+        return [engine.query_df(sql, params) for sql, params in queries]
+    with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+        futures = [pool.submit(engine.query_df, sql, params) for sql, params in queries]
+        return [future.result() for future in futures]
+
+
+def check_scan_budget(engine: QueryEngine, queries: list[tuple[str, list[QueryParam]]], max_bytes_billed: int) -> list[str]:
+    """Estimate every query before any job runs; raise if one would bill more than max_bytes_billed (0 disables the cap)."""
+    estimates = [engine.estimate_bytes(sql, params) for sql, params in queries]
+    total = sum(estimates)
+    lines = [f"QUERY_{i}_ESTIMATED_BYTES={estimate}" for i, estimate in enumerate(estimates, start=1)]
+    lines.append(f"ESTIMATED_BYTES_TOTAL={total}")
+    lines.append(f"ESTIMATED_ON_DEMAND_USD={total / (1 << 40) * ON_DEMAND_USD_PER_TIB:.4f}")
+    # Dry runs report bytes only; slot time is known once a job has run (QUERY_SLOT_MS).
+    lines.append("ESTIMATED_SLOT_MS=unavailable")
+    for i, estimate in enumerate(estimates, start=1):
+        if max_bytes_billed and estimate > max_bytes_billed:
+            raise RuntimeError(f"Query {i} would scan {estimate} bytes, over --max-bytes-billed={max_bytes_billed}; no query was run.")
+    return lines
+
+
+def engine_summary_lines(engine: QueryEngine) -> list[str]:
+    return [
+        f"QUERY_ENGINE={engine.name}",
+        f"QUERY_JOBS={engine.stats.jobs}",
+        f"FETCH_ROWS={engine.stats.rows}",
+        f"FETCH_BATCHES={engine.stats.batches}",
+        f"FETCH_SECONDS={engine.stats.seconds:.2f}",
+        f"QUERY_SLOT_MS={'unavailable' if engine.stats.slot_ms is None else engine.stats.slot_ms}",
+        f"CACHE_HITS={engine.stats.cache_hits}",
+        f"CACHE_MISSES={engine.stats.cache_misses}",
+    ]
+
+
+def _sql_literal(text: str) -> str:
+    return "'" + text.replace("'", "''") + "'"
+
+
+def _local_param_value(param: QueryParam) -> Any:
+    if param.type_ == "DATE" and isinstance(param.value, str):
+        return date.fromisoformat(param.value)
+    if param.type_ == "INT64":
+        return int(param.value)
+    return param.value
+
+
+_CLIENT_POOL: dict[tuple[str, str], Any] = {}
+_CLIENT_POOL_LOCK = threading.Lock()
+
+
+def _pooled_client(kind: str, project: str, factory: Callable[[], Any]) -> Any:
+    """One client per (kind, project) per process, so repeated engines skip construction and auth."""
+    with _CLIENT_POOL_LOCK:
+        key = (kind, project)
+        if key not in _CLIENT_POOL:
+            _CLIENT_POOL[key] = factory()
+        return _CLIENT_POOL[key]
+
+
+def _default_client(bigquery: Any, project: str) -> tuple[Any, Any]:
+    """(BigQuery client, the application default credentials it was built with)."""
+    import google.auth
+
+    credentials, _ = google.auth.default(scopes=["https://www.googleapis.com/auth/cloud-platform"])
+    return bigquery.Client(project=project, credentials=credentials), credentials
+
+
+class BigQueryEngine:
+    name = "bigquery"
+
+    def __init__(
+        self,
+        project: str,
+        source_fqn: str,
+        max_concurrent_jobs: int = DEFAULT_MAX_CONCURRENT_JOBS,
+        max_bytes_billed: int = 0,
+        client: Any = None,
+        credentials: Any = None,
+    ) -> None:
+        from google.cloud import bigquery
+
+        self._bigquery = bigquery
+        self.project = project
+        if client is None:
+            client, credentials = _pooled_client("bigquery", project, lambda: _default_client(bigquery, project))
+        self.client = client
+        # Kept so the Storage Read client authenticates as the query client does (None falls back to the default).
+        self.credentials = credentials
+        self.source_fqn = source_fqn
+        self.stats = FetchStats()
+        self.job_slots = threading.BoundedSemaphore(max_concurrent_jobs)
+        self.max_bytes_billed = max_bytes_billed
+
+    def _job_config(self, params: list[QueryParam], **options: Any) -> Any:
+        if self.max_bytes_billed:
+            options.setdefault("maximum_bytes_billed", self.max_bytes_billed)
+        return self._bigquery.QueryJobConfig(
+            query_parameters=[self._bigquery.ScalarQueryParameter(p.name, p.type_, p.value) for p in params], **options
+        )
+
+    def _storage_read_client(self) -> Any:
+        try:
+            from google.cloud import bigquery_storage
+        except ImportError:
+            return None
+        return _pooled_client(
+            "bigquery_storage", self.project, lambda: bigquery_storage.BigQueryReadClient(credentials=self.credentials)
+        )
+
+    def source_version(self) -> str:
+        modified = self.client.get_table(self.source_fqn).modified
+        return modified.isoformat() if modified else ""
+
+    def estimate_bytes(self, sql: str, params: list[QueryParam]) -> int:
+        job = self.client.query(sql, job_config=self._job_config(params, dry_run=True, use_query_cache=False))
+        return int(job.total_bytes_processed or 0)
+
+    def _result_job(self, job: Any) -> Any:
+        """The job whose table holds the rows: a script's last statement (the newest child job), else the job itself."""
+        job.result()
+        if not job.num_child_jobs:
+            return job
+        return next(iter(self.client.list_jobs(parent_job=job, max_results=1)))
+
+    def iter_arrow(self, sql: str, params: list[QueryParam]) -> Iterator[pa.Table]:
+        started = time.perf_counter()
+        rows = batches = 0
+        job = None
+        # finally also runs when a consumer closes the generator early, which releases the job slot and still counts the job.
+        try:
+            with self.job_slots:
+                job = self.client.query(sql, job_config=self._job_config(params))
+                result = self._result_job(job).result(page_size=FETCH_PAGE_ROWS)
+                for batch in result.to_arrow_iterable(bqstorage_client=self._storage_read_client()):
+                    rows += batch.num_rows
+                    batches += 1
+                    yield cast_result(pa.Table.from_batches([batch]))
+                if not batches:
+                    yield cast_result(self._result_job(job).result().to_arrow(create_bqstorage_client=False))
+        finally:
+            # A script's slot time covers its child statements.
+            self.stats.record(rows, batches, started, job.slot_millis if job is not None else None)
+
+    def query_arrow(self, sql: str, params: list[QueryParam]) -> pa.Table:
+        return pa.concat_tables(list(self.iter_arrow(sql, params)))
+
+    def query_df(self, sql: str, params: list[QueryParam]) -> pd.DataFrame:
+        return to_frame(self.query_arrow(sql, params))
+
+
+class LocalEngine:
+    """Runs the scripts' BigQuery SQL in-process with DuckDB over a Parquet snapshot."""
+
+    name = "local"
+
+    def __init__(self, source_fqn: str, parquet_path: Path, max_concurrent_jobs: int = DEFAULT_MAX_CONCURRENT_JOBS) -> None:
+        import duckdb
+
+        if not any(parquet_path.parent.glob(parquet_path.name)):
+            raise RuntimeError(f"Local snapshot not found: {parquet_path}")
+        self.parquet_path = parquet_path
+        self.stats = FetchStats()
+        self.job_slots = threading.BoundedSemaphore(max_concurrent_jobs)
+        self.con = duckdb.connect()
+        self.con.execute(f'CREATE VIEW "{source_fqn}" AS SELECT * FROM read_parquet({_sql_literal(parquet_path.as_posix())})')
+
+    def source_version(self) -> str:
+        files = sorted(self.parquet_path.parent.glob(self.parquet_path.name))
+        return ";".join(f"{f.name}:{f.stat().st_size}:{f.stat().st_mtime_ns}" for f in files)
+
+    def estimate_bytes(self, sql: str, params: list[QueryParam]) -> int:
+        """Uncompressed size of every snapshot column the SQL names, i.e. a full-scan upper bound like on-demand billing."""
+        import pyarrow.parquet as pq
+
+        words = set(re.findall(r"\w+", sql.lower()))
+        total = 0
+        for f in sorted(self.parquet_path.parent.glob(self.parquet_path.name)):
+            metadata = pq.ParquetFile(f).metadata
+            for rg in range(metadata.num_row_groups):
+                row_group = metadata.row_group(rg)
+                for c in range(row_group.num_columns):
+                    column = row_group.column(c)
+                    if column.path_in_schema.lower() in words:
+                        total += column.total_uncompressed_size
+        return total
+
+    def _run_script_prefix(self, cursor: Any, sql: str, params: list[QueryParam]) -> tuple[str, list[QueryParam]]:
+        """Run a script's DECLARE and SET (...) = (SELECT AS STRUCT ...) statements, as BigQuery would before the last
+        statement; returns that statement with the variables bound as params."""
+        *prefix, body = _split_statements(sql)
+        types: dict[str, str] = {}
+        values: dict[str, Any] = {}
+        for statement in prefix:
+            declare = _DECLARE.match(statement)
+            if declare:
+                types[declare.group(1)] = declare.group(2).upper()
+                continue
+            assign = _SET_STRUCT.match(statement)
+            if not assign:
+                raise ValueError(f"Unsupported script statement: {statement.splitlines()[0]}")
+            names = [name.strip() for name in assign.group(1).split(",")]
+            select = f"SELECT {assign.group(2)}"
+            bound = {p.name: _local_param_value(p) for p in params if f"@{p.name}" in select}
+            values.update(zip(names, cursor.execute(translate_sql(select), bound).fetchone()))
+        variables = [QueryParam(name, types[name], value) for name, value in values.items()]
+        return bind_variables(body, list(values)), [*params, *variables]
+
+    def iter_arrow(self, sql: str, params: list[QueryParam]) -> Iterator[pa.Table]:
+        started = time.perf_counter()
+        rows = batches = 0
+        try:
+            # A cursor per query: DuckDB connections are not shared across threads, cursors see the same views.
+            with self.job_slots, self.con.cursor() as cursor:
+                sql, params = self._run_script_prefix(cursor, sql, params)
+                result = cursor.execute(translate_sql(sql), {p.name: _local_param_value(p) for p in params})
+                reader = result.to_arrow_reader(FETCH_PAGE_ROWS)
+                for batch in reader:
+                    rows += batch.num_rows
+                    batches += 1
+                    yield cast_result(pa.Table.from_batches([batch]))
+                if not batches:
+                    yield cast_result(reader.schema.empty_table())
+        finally:
+            self.stats.record(rows, batches, started)
+
+    def query_arrow(self, sql: str, params: list[QueryParam]) -> pa.Table:
+        return pa.concat_tables(list(self.iter_arrow(sql, params)))
+
+    def query_df(self, sql: str, params: list[QueryParam]) -> pd.DataFrame:
+        return to_frame(self.query_arrow(sql, params))
+
+
+def add_engine_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--engine",
+        choices=ENGINE_CHOICES,
+        default="bigquery",
+        help="Query backend: BigQuery (default) or in-process DuckDB over a Parquet snapshot.",
+    )
+    parser.add_argument(
+        "--local-parquet",
+        default="",
+        help="Parquet snapshot of the relation for --engine local (default: exports/snapshots/<relation>.parquet).",
+    )
+    parser.add_argument(
+        "--max-concurrent-jobs",
+        type=int,
+        default=DEFAULT_MAX_CONCURRENT_JOBS,
+        help="Cap on query jobs in flight when independent queries are submitted together.",
+    )
+    parser.add_argument(
+        "--estimate-cost",
+        action="store_true",
+        help="Dry-run the queries, print estimated bytes scanned and on-demand cost, and exit.",
+    )
+    parser.add_argument(
+        "--max-bytes-billed",
+        type=int,
+        default=0,
+        help="Abort before any job runs if a query is estimated to scan more than this many bytes (default: no cap).",
+    )
+
+
+def make_engine(args: argparse.Namespace, source_fqn: str) -> QueryEngine:
+    if args.max_concurrent_jobs <= 0:
+        raise RuntimeError("--max-concurrent-jobs must be positive.")
+    if args.max_bytes_billed < 0:
+        raise RuntimeError("--max-bytes-billed must not be negative.")
+    if args.engine == "local":
+        parquet_path = Path(args.local_parquet) if args.local_parquet else Path("exports") / "snapshots" / f"{args.relation}.parquet"
+        return LocalEngine(source_fqn, parquet_path, args.max_concurrent_jobs)
+    return BigQueryEngine(args.project, source_fqn, args.max_concurrent_jobs, args.max_bytes_billed)
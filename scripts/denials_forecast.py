@@ -0,0 +1,201 @@
+"""Next-week exposure forecasts for every denial bucket and (bucket, reason) weekly priority series, fitted in one batch.
+
+Each series gets additive exponential smoothing (level, optional trend, optional weekly season) with parameters picked
+by grid search on one-step-ahead squared error. All series and all grid points advance together through a single
+recursion over the weeks, so the cost is weeks x series x grid array operations and no per-series Python loop. The
+interval is the expected value plus or minus a normal quantile times the chosen model's one-step RMSE.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from itertools import product
+from pathlib import Path
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from denials_compute import group_agg
+from denials_frame import week_ids, week_key
+from denials_money import fixed_units, units_to_floats
+from denials_pushdown import rollup_level
+
+
+SERIES_KEYS = ["denial_bucket", "denial_reason"]
+FORECAST_COLUMNS = [
+    "level",
+    "denial_bucket",
+    "denial_reason",
+    "forecast_week",
+    "history_weeks",
+    "active_weeks",
+    "last_week_priority",
+    "expected_priority",
+    "lower_priority",
+    "upper_priority",
+    "interval",
+    "model",
+    "alpha",
+    "beta",
+    "gamma",
+    "rmse",
+]
+ALPHAS = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9)
+BETAS = (0.0, 0.05, 0.1, 0.2)
+GAMMAS = (0.1, 0.2, 0.3)
+MIN_HISTORY_WEEKS = 3
+
+
+def add_forecast_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--forecast",
+        action="store_true",
+        help="Forecast next-week priority for every bucket and (bucket, reason) from the weekly history in --lookback-days.",
+    )
+    parser.add_argument("--forecast-interval", type=float, default=0.8, help="Central coverage of the forecast interval.")
+    parser.add_argument(
+        "--forecast-season-weeks",
+        type=int,
+        default=0,
+        help="Additive seasonal period in weeks (e.g. 52); used only when the history holds two full seasons.",
+    )
+
+
+def detail_week_totals(detail_df: pd.DataFrame, value: str, how: str, backend: str = "pandas") -> pd.DataFrame:
+    """(dataset_week_id, denial_bucket, denial_reason, priority_score) from compact detail rows."""
+    totals = group_agg(detail_df, ["dataset_week_id", *SERIES_KEYS], {"priority_score": (value, how)}, backend)
+    return totals.astype({key: str for key in SERIES_KEYS})
+
+
+def rollup_week_totals(rollup_df: pd.DataFrame) -> pd.DataFrame:
+    """The same frame from a push-down or streamed rollup (its (week, bucket, reason) groups)."""
+    rows = rollup_level(rollup_df, None, len(SERIES_KEYS))
+    return pd.DataFrame(
+        {
+            "dataset_week_id": week_ids(rows["dataset_week_start"]),
+            **{key: rows[key].astype(str).to_numpy() for key in SERIES_KEYS},
+            "priority_score": rows["priority_score"].to_numpy(dtype=float),
+        }
+    )
+
+
+def weekly_series(totals: pd.DataFrame, last_week_id: int, decimals: int) -> tuple[pd.DataFrame, np.ndarray]:
+    """(series keys, series x weeks matrix) for reasons and their buckets over consecutive weeks up to last_week_id.
+
+    Weeks without rows are 0. Bucket rows are exact sums of their reason rows (fixed-point units), so every mode
+    feeding the same reason totals gets the same bucket series.
+    """
+    totals = totals[totals["dataset_week_id"] <= last_week_id]
+    if totals.empty:
+        raise RuntimeError("--forecast found no weekly priority history up to the current week.")
+    first_week = int(totals["dataset_week_id"].min())
+    weeks = last_week_id - first_week + 1
+    if weeks < MIN_HISTORY_WEEKS:
+        raise RuntimeError(f"--forecast needs at least {MIN_HISTORY_WEEKS} dataset weeks of history; widen --lookback-days.")
+    reason_codes, reasons = pd.MultiIndex.from_frame(totals[SERIES_KEYS]).factorize(sort=True)
+    units = np.zeros((len(reasons), weeks), dtype=np.int64)
+    np.add.at(units, (reason_codes, totals["dataset_week_id"].to_numpy(dtype=np.int64) - first_week), fixed_units(totals["priority_score"], decimals))
+    bucket_codes, buckets = pd.factorize(reasons.get_level_values(0), sort=True)
+    bucket_units = np.zeros((len(buckets), weeks), dtype=np.int64)
+    np.add.at(bucket_units, bucket_codes, units)
+
+    keys = pd.concat(
+        [
+            pd.DataFrame({"level": "bucket", "denial_bucket": np.asarray(buckets, dtype=object), "denial_reason": ""}),
+            pd.DataFrame({"level": "reason", **{key: reasons.get_level_values(i).to_numpy(dtype=object) for i, key in enumerate(SERIES_KEYS)}}),
+        ],
+        ignore_index=True,
+    )
+    matrix = np.vstack([bucket_units, units])
+    return keys, units_to_floats(matrix.ravel(), decimals).reshape(matrix.shape)
+
+
+def fit_smoothing(y: np.ndarray, season_weeks: int = 0) -> dict[str, np.ndarray]:
+    """Best additive Holt(-Winters) fit per row of y (series x weeks) and its one-step forecast past the last week."""
+    n_series, weeks = y.shape
+    season = season_weeks if season_weeks > 1 and weeks >= 2 * season_weeks else 0
+    grid = np.array(list(product(ALPHAS, BETAS, GAMMAS if season else (0.0,))))
+    alpha, beta, gamma = grid[:, 0], grid[:, 1], grid[:, 2]
+    shape = (n_series, len(grid))
+    if season:
+        level = np.broadcast_to(y[:, :season].mean(axis=1)[:, None], shape).copy()
+        # season x series x grid, so each week touches one contiguous slice
+        seasonal = np.repeat((y[:, :season] - y[:, :season].mean(axis=1, keepdims=True)).T[:, :, None], len(grid), axis=2)
+    else:
+        level = np.broadcast_to(y[:, :1], shape).copy()
+    start = max(season, 1)
+    trend = np.zeros(shape)
+    sse = np.zeros(shape)
+    for t in range(start, weeks):
+        s = seasonal[t % season] if season else 0.0
+        err = y[:, t, None] - (level + trend + s)
+        sse += err * err
+        level = level + trend + alpha * err
+        trend = trend + alpha * beta * err
+        if season:
+            seasonal[t % season] = s + gamma * err
+    # Grid order puts smaller alpha/beta/gamma first, so ties go to the smoother model.
+    best = np.argmin(sse, axis=1)
+    rows = np.arange(n_series)
+    ahead = level + trend + (seasonal[weeks % season] if season else 0.0)
+    return {
+        "expected": ahead[rows, best],
+        "rmse": np.sqrt(sse[rows, best] / (weeks - start)),
+        "alpha": alpha[best],
+        "beta": beta[best],
+        "gamma": gamma[best],
+    }
+
+
+def forecast_table(totals: pd.DataFrame, last_week_id: int, decimals: int, interval: float, season_weeks: int = 0) -> pd.DataFrame:
+    if not 0.0 < interval < 1.0:
+        raise RuntimeError(f"--forecast-interval must be between 0 and 1, got {interval}.")
+    keys, y = weekly_series(totals, last_week_id, decimals)
+    fit = fit_smoothing(y, season_weeks)
+    spread = NormalDist().inv_cdf(0.5 + interval / 2.0) * fit["rmse"]
+    expected = np.maximum(fit["expected"], 0.0)
+    out = keys.assign(
+        forecast_week=week_key(last_week_id + 1),
+        history_weeks=y.shape[1],
+        active_weeks=(y != 0).sum(axis=1),
+        last_week_priority=y[:, -1],
+        expected_priority=expected,
+        lower_priority=np.maximum(expected - spread, 0.0),
+        upper_priority=expected + spread,
+        interval=interval,
+        model=np.where(fit["gamma"] > 0, "holt_winters", np.where(fit["beta"] > 0, "holt", "ses")),
+        alpha=fit["alpha"],
+        beta=fit["beta"],
+        gamma=fit["gamma"],
+        rmse=fit["rmse"],
+    )
+    out = out.sort_values(
+        ["level", "expected_priority", "denial_bucket", "denial_reason"], ascending=[True, False, True, True], kind="mergesort"
+    )
+    return out[FORECAST_COLUMNS].reset_index(drop=True)
+
+
+def run_forecast(
+    totals: pd.DataFrame, last_week_id: int, decimals: int, args: argparse.Namespace, path: Path
+) -> tuple[pd.DataFrame, list[str]]:
+    """Fit, write path and return (forecast table, console lines)."""
+    started = time.perf_counter()
+    forecast_df = forecast_table(totals, last_week_id, decimals, args.forecast_interval, args.forecast_season_weeks)
+    seconds = time.perf_counter() - started
+    forecast_df.to_csv(path, index=False)
+    return forecast_df, [
+        f"FORECAST_WEEK={week_key(last_week_id + 1)}",
+        f"FORECAST_SERIES={len(forecast_df)}",
+        f"FORECAST_HISTORY_WEEKS={int(forecast_df['history_weeks'].iloc[0]) if len(forecast_df) else 0}",
+        f"FORECAST_SECONDS={seconds:.3f}",
+        f"WROTE={path}",
+    ]
+
+
+def bucket_outlook(forecast_df: pd.DataFrame | None) -> pd.DataFrame:
+    """Bucket-level rows of a forecast table, highest expected priority first (empty when there is no forecast)."""
+    if forecast_df is None:
+        return pd.DataFrame(columns=FORECAST_COLUMNS)
+    return forecast_df[forecast_df["level"] == "bucket"]
@@ -0,0 +1,103 @@
+"""Compact in-memory layout for denials detail rows (integer week ids, text formatted only for output) and memory probes."""
+
+from __future__ import annotations
+
+import sys
+from datetime import date, timedelta
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+
+# Weeks start on Monday, matching DATE_TRUNC(..., WEEK(MONDAY)); 1970-01-05 is the first Monday after the epoch.
+WEEK_EPOCH = date(1970, 1, 5)
+WEEK_EPOCH_DAY = (WEEK_EPOCH - date(1970, 1, 1)).days
+
+
+def week_ids(dates: pd.Series) -> np.ndarray:
+    days = pd.to_datetime(dates).to_numpy(dtype="datetime64[D]").astype(np.int64)
+    return ((days - WEEK_EPOCH_DAY) // 7).astype(np.int32)
+
+
+def week_id(value: Any) -> int:
+    return int(week_ids(pd.Series([value]))[0])
+
+
+def week_start(week: int) -> date:
+    return WEEK_EPOCH + timedelta(weeks=int(week))
+
+
+def week_key(week: int) -> str:
+    return week_start(week).isoformat()
+
+
+def week_labels(weeks: pd.Series) -> pd.Series:
+    """Format week ids as YYYY-MM-DD, once per distinct week."""
+    labels = {week: week_key(week) for week in pd.unique(weeks)}
+    return weeks.map(labels)
+
+
+def intern_text(values: pd.Series) -> pd.Series:
+    """Text as a categorical with lexically sorted categories.
+
+    Grouping, merging and sorting then run on the integer codes, and code order is text order, so sorts and
+    tie-breaks give the same rows as sorting the text itself.
+    """
+    codes, uniques = pd.factorize(values, sort=True)
+    return pd.Series(pd.Categorical.from_codes(codes, categories=uniques), index=values.index, name=values.name)
+
+
+def frame_mb(df: pd.DataFrame) -> float:
+    return float(df.memory_usage(deep=True).sum()) / (1 << 20)
+
+
+def _windows_peak_working_set() -> int:
+    import ctypes
+    from ctypes import wintypes
+
+    class ProcessMemoryCounters(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            *((name, ctypes.c_size_t) for name in (
+                "PeakWorkingSetSize",
+                "WorkingSetSize",
+                "QuotaPeakPagedPoolUsage",
+                "QuotaPagedPoolUsage",
+                "QuotaPeakNonPagedPoolUsage",
+                "QuotaNonPagedPoolUsage",
+                "PagefileUsage",
+                "PeakPagefileUsage",
+            )),
+        ]
+
+    counters = ProcessMemoryCounters()
+    counters.cb = ctypes.sizeof(counters)
+    process = ctypes.windll.kernel32.GetCurrentProcess()
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+        raise OSError("GetProcessMemoryInfo failed")
+    return int(counters.PeakWorkingSetSize)
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far, in MiB."""
+    try:
+        import resource
+    except ImportError:
+        return _windows_peak_working_set() / (1 << 20)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and KiB elsewhere.
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / (1 << 10)
+
+
+def compact_detail(df: pd.DataFrame) -> pd.DataFrame:
+    """Add dataset_week_id (int32, from service_date) and drop per-row week labels.
+
+    claim_id stays text: the workqueue only compares it among the few rows top_k_rows keeps, so sorted integer keys
+    for every row would cost more than they save.
+    """
+    out = df.drop(columns=[c for c in ("dataset_week_key", "dataset_week_start") if c in df.columns])
+    out["service_date"] = pd.to_datetime(out["service_date"])
+    out["dataset_week_id"] = week_ids(out["service_date"])
+    return out
@@ -0,0 +1,200 @@
+"""Recurring root-cause combinations: frequent itemsets over the whole RCI lookback, not just the current week.
+
+Every denied row is a transaction holding at most one item per field (denial group, processing code, next action,
+HCPCS), so an itemset is a subset of fields plus their values and the lattice has only 2**fields - 1 shapes. Items
+below the support floor are cut first (an itemset is never more frequent than its rarest item, the FP-growth header
+table step); each remaining shape is then one packed-integer group-by over the surviving rows, aggregated per week and
+then across weeks. Working memory is one int64 key column per shape plus tables sized by distinct itemsets.
+"""
+
+from __future__ import annotations
+
+import argparse
+from itertools import combinations
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+from denials_compute import group_agg
+from denials_money import AMOUNT_SUM
+from denials_frame import week_key
+
+
+# (item name, detail column); blank values are not items.
+ITEM_FIELDS = (
+    ("group", "top_denial_group"),
+    ("prcsg", "top_denial_prcsg"),
+    ("action", "top_next_best_action"),
+    ("hcpcs", "top_hcpcs"),
+)
+ITEMSET_COLUMNS = [
+    "itemset",
+    "itemset_size",
+    *(name for name, _ in ITEM_FIELDS),
+    "support_rows",
+    "support_weeks",
+    "first_week",
+    "last_week",
+    "denied_amount_sum",
+    "current_week_rows",
+    "current_week_amount",
+    "closed",
+]
+# Packed keys are re-factorized before the product of field cardinalities could overflow int64.
+_KEY_BOUND = 1 << 62
+
+
+def add_itemset_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--mine-itemsets",
+        action="store_true",
+        help="Mine recurring group/processing-code/action/HCPCS combinations over the whole lookback and write a recurring ticket pack.",
+    )
+    parser.add_argument("--itemset-min-support", type=int, default=20, help="Rows an itemset needs across the lookback.")
+    parser.add_argument("--itemset-min-weeks", type=int, default=3, help="Distinct dataset weeks an itemset must appear in.")
+    parser.add_argument("--itemset-min-size", type=int, default=2, help="Fewest items in a reported itemset.")
+
+
+def _item_codes(detail_df: pd.DataFrame, weeks: np.ndarray, min_support: int, min_weeks: int) -> list[tuple[np.ndarray, pd.Index]]:
+    """Per field: int codes into sorted item values, -1 for blank or infrequent items."""
+    week_codes, _ = pd.factorize(weeks)
+    fields = []
+    for _, column in ITEM_FIELDS:
+        codes, values = pd.factorize(detail_df[column].astype(str), sort=True)
+        codes = np.where(values.take(np.maximum(codes, 0)) == "", -1, codes) if len(values) else codes
+        present = codes >= 0
+        rows = np.bincount(codes[present], minlength=len(values))
+        pairs = np.unique(codes[present].astype(np.int64) * (week_codes.max(initial=0) + 1) + week_codes[present])
+        item_weeks = np.bincount(pairs // (week_codes.max(initial=0) + 1), minlength=len(values))
+        frequent = (rows >= min_support) & (item_weeks >= min_weeks)
+        fields.append((np.where(present & frequent[np.maximum(codes, 0)], codes, -1), values))
+    return fields
+
+
+def _pack(codes: Sequence[np.ndarray], sizes: Sequence[int]) -> np.ndarray:
+    key = np.zeros(len(codes[0]), dtype=np.int64)
+    bound = 1
+    for field_codes, size in zip(codes, sizes):
+        if bound * max(size, 1) >= _KEY_BOUND:
+            key, uniques = pd.factorize(key)
+            key = key.astype(np.int64)
+            bound = len(uniques)
+        key = key * max(size, 1) + field_codes
+        bound *= max(size, 1)
+    return key
+
+
+def _count_shape(
+    shape: tuple[int, ...],
+    fields: list[tuple[np.ndarray, pd.Index]],
+    detail_df: pd.DataFrame,
+    weeks: np.ndarray,
+    amount: str,
+    current_week_id: int,
+    min_support: int,
+    min_weeks: int,
+    backend: str,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """(frequent itemsets of one field shape, their current-week rows and amounts per denial bucket)."""
+    rows = np.flatnonzero(np.logical_and.reduce([fields[f][0] >= 0 for f in shape]))
+    key = _pack([fields[f][0][rows] for f in shape], [len(fields[f][1]) for f in shape])
+    weekly = group_agg(
+        pd.DataFrame({"key": key, "week": weeks[rows], "amount": detail_df[amount].to_numpy(dtype=float)[rows], "row": rows}),
+        ["key", "week"],
+        {"rows": ("row", "size"), "amount": ("amount", AMOUNT_SUM), "row": ("row", "min")},
+        backend,
+    )
+    sets = group_agg(
+        weekly,
+        ["key"],
+        {
+            "support_rows": ("rows", "sum"),
+            "support_weeks": ("week", "size"),
+            "first_week": ("week", "min"),
+            "last_week": ("week", "max"),
+            "denied_amount_sum": ("amount", AMOUNT_SUM),
+            "row": ("row", "min"),
+        },
+        backend,
+    )
+    sets = sets[(sets["support_rows"] >= min_support) & (sets["support_weeks"] >= min_weeks)].reset_index(drop=True)
+    current = weekly[weekly["week"] == current_week_id].set_index("key").reindex(sets["key"])
+    sets["current_week_rows"] = current["rows"].fillna(0).to_numpy(dtype=np.int64)
+    sets["current_week_amount"] = current["amount"].fillna(0.0).to_numpy(dtype=float)
+    sets["itemset_size"] = len(shape)
+    for f, (name, _) in enumerate(ITEM_FIELDS):
+        codes, values = fields[f]
+        sets[name] = values.take(codes[sets["row"].to_numpy()]).to_numpy(dtype=object) if f in shape else ""
+
+    in_current = rows[(weeks[rows] == current_week_id) & np.isin(key, sets["key"].to_numpy())]
+    by_bucket = group_agg(
+        pd.DataFrame(
+            {
+                "key": key[np.searchsorted(rows, in_current)],
+                "denial_bucket": detail_df["denial_bucket"].iloc[in_current].array,
+                "amount": detail_df[amount].to_numpy(dtype=float)[in_current],
+                "row": in_current,
+            }
+        ),
+        ["key", "denial_bucket"],
+        {"denied_amount_sum": ("amount", AMOUNT_SUM), "denial_count": ("row", "size")},
+        backend,
+    )
+    return sets, by_bucket
+
+
+def _itemset_text(sets: pd.DataFrame) -> pd.Series:
+    parts = [np.where(sets[name] != "", name + "=" + sets[name].astype(str).str.lower(), "") for name, _ in ITEM_FIELDS]
+    return pd.Series([" | ".join(part for part in row if part) for row in zip(*parts)], index=sets.index, dtype=object)
+
+
+def _mark_closed(sets: pd.DataFrame) -> pd.Series:
+    """Y when no one-item superset has the same row support (the superset would describe the same rows better)."""
+    names = [name for name, _ in ITEM_FIELDS]
+    superset_support = pd.Series(0, index=sets.index)
+    for name in names:
+        larger = sets[sets[name] != ""].assign(**{name: ""})
+        best = larger.groupby(names, sort=False)["support_rows"].max().rename("superset_support")
+        matched = sets[names].join(best, on=names)["superset_support"].fillna(0)
+        superset_support = np.maximum(superset_support, matched)
+    return pd.Series(np.where(sets["support_rows"] > superset_support, "Y", "N"), index=sets.index)
+
+
+def mine_itemsets(
+    detail_df: pd.DataFrame,
+    amount: str,
+    current_week_id: int,
+    min_support: int,
+    min_weeks: int,
+    min_size: int = 2,
+    backend: str = "pandas",
+) -> tuple[pd.DataFrame, pd.DataFrame, int]:
+    """(frequent itemsets ranked by recurrence, current-week amount per (itemset, denial bucket), frequent item count)."""
+    weeks = detail_df["dataset_week_id"].to_numpy(dtype=np.int64)
+    fields = _item_codes(detail_df, weeks, min_support, min_weeks)
+    frequent_items = sum(int(np.unique(codes[codes >= 0]).size) for codes, _ in fields)
+    found: list[pd.DataFrame] = []
+    buckets: list[pd.DataFrame] = []
+    for size in range(max(min_size, 1), len(ITEM_FIELDS) + 1):
+        for shape in combinations(range(len(ITEM_FIELDS)), size):
+            sets, by_bucket = _count_shape(
+                shape, fields, detail_df, weeks, amount, current_week_id, min_support, min_weeks, backend
+            )
+            if sets.empty:
+                continue
+            sets["itemset"] = _itemset_text(sets)
+            found.append(sets)
+            buckets.append(by_bucket.merge(sets[["key", "itemset"]], on="key").drop(columns="key"))
+    if not found:
+        return pd.DataFrame(columns=ITEMSET_COLUMNS), pd.DataFrame(columns=["itemset", "denial_bucket", "denied_amount_sum", "denial_count"]), frequent_items
+
+    itemsets = pd.concat(found, ignore_index=True)
+    itemsets["closed"] = _mark_closed(itemsets)
+    itemsets["first_week"] = itemsets["first_week"].map(week_key)
+    itemsets["last_week"] = itemsets["last_week"].map(week_key)
+    itemsets = itemsets.sort_values(
+        ["support_weeks", "denied_amount_sum", "itemset"], ascending=[False, False, True], kind="mergesort"
+    ).reset_index(drop=True)
+    bucket_rows = pd.concat(buckets, ignore_index=True)[["itemset", "denial_bucket", "denied_amount_sum", "denial_count"]]
+    return itemsets[ITEMSET_COLUMNS], bucket_rows, frequent_items
@@ -0,0 +1,126 @@
+"""Near-duplicate text clustering: MinHash signatures over byte 3-grams, LSH banding, union of verified band matches.
+
+Each text gets `perms` min-hashes of its 3-gram shingles; texts whose signatures agree on every row of some band land
+in the same band bucket, and a bucket member is linked to its bucket's first text when their signatures agree on at
+least `threshold` of the rows (the MinHash estimate of Jaccard similarity). Links chain across bands, so two texts of
+one cluster can be far apart; callers that show one representative per cluster re-check members against it with
+signature_agreement. Work is linear in the total text length times `perms`, with no pairwise comparison. Hash
+parameters are fixed, so clusters are the same on every run.
+"""
+
+from __future__ import annotations
+
+import argparse
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+
+SHINGLE = 3
+# Multiply-add-shift hashing: the high 32 bits of (a x + b) mod 2**64 with a odd, one (a, b) per permutation.
+_SEED = 20240311
+
+
+def add_cluster_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--cluster-patterns",
+        action="store_true",
+        help="Merge near-identical pattern_text values (MinHash-LSH) so the ticket pack rolls each cluster up into one ticket.",
+    )
+    parser.add_argument(
+        "--cluster-threshold", type=float, default=0.8, help="Estimated Jaccard similarity of 3-gram sets needed to merge."
+    )
+    parser.add_argument("--minhash-perms", type=int, default=64, help="MinHash signature length (a multiple of --lsh-bands).")
+    parser.add_argument("--lsh-bands", type=int, default=8, help="LSH bands; more bands catch lower similarities as candidates.")
+
+
+def shingle_codes(texts: Sequence[str]) -> tuple[np.ndarray, np.ndarray]:
+    """(3-gram codes of all texts back to back, start offset of each text's run); every text yields at least one."""
+    encoded = [f" {text} ".ljust(SHINGLE).encode("utf-8") for text in texts]
+    lengths = np.fromiter((len(chunk) for chunk in encoded), dtype=np.int64, count=len(encoded))
+    data = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.int64)
+    ends = np.cumsum(lengths)
+    starts = np.ones(len(data), dtype=bool)
+    for back in range(1, SHINGLE):
+        starts[ends - back] = False
+    positions = np.flatnonzero(starts)
+    codes = (data[positions] << 16) | (data[positions + 1] << 8) | data[positions + 2]
+    counts = lengths - (SHINGLE - 1)
+    return codes, np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+
+def minhash_signatures(texts: Sequence[str], perms: int) -> np.ndarray:
+    """len(texts) x perms uint32 MinHash signatures."""
+    codes, offsets = shingle_codes(texts)
+    # Hash each distinct 3-gram once per permutation; the rows then only gather and take segment minimums.
+    ids, vocabulary = pd.factorize(codes)
+    rng = np.random.default_rng(_SEED)
+    a = rng.integers(0, 1 << 63, size=perms, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    b = rng.integers(0, 1 << 63, size=perms, dtype=np.uint64)
+    hashed = ((a[:, None] * np.asarray(vocabulary, dtype=np.uint64)[None, :] + b[:, None]) >> np.uint64(32)).astype(np.uint32)
+    signatures = np.empty((perms, len(texts)), dtype=np.uint32)
+    for k in range(perms):
+        np.minimum.reduceat(np.take(hashed[k], ids), offsets, out=signatures[k])
+    return signatures.T
+
+
+def signature_agreement(signatures: np.ndarray, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """Share of MinHash rows on which signature rows left[i] and right[i] agree: the estimated Jaccard similarity."""
+    return (signatures[left] == signatures[right]).mean(axis=1)
+
+
+def _components(n: int, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """Smallest member index of each node's connected component (union-find by min-label hooking and pointer jumping)."""
+    parent = np.arange(n)
+    while True:
+        low = np.minimum(parent[left], parent[right])
+        high = np.maximum(parent[left], parent[right])
+        linked = low != high
+        if not linked.any():
+            return parent
+        np.minimum.at(parent, high[linked], low[linked])
+        while True:
+            jumped = parent[parent]
+            if (jumped == parent).all():
+                break
+            parent = jumped
+
+
+def lsh_clusters(signatures: np.ndarray, bands: int, threshold: float) -> np.ndarray:
+    """Cluster label (smallest member index) per signature row."""
+    n, perms = signatures.shape
+    if perms % bands:
+        raise RuntimeError(f"--minhash-perms ({perms}) must be a multiple of --lsh-bands ({bands}).")
+    rows = perms // bands
+    mix = np.random.default_rng(_SEED + 1).integers(0, 1 << 63, size=rows, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+    left: list[np.ndarray] = []
+    right: list[np.ndarray] = []
+    for band in range(bands):
+        block = signatures[:, band * rows:(band + 1) * rows]
+        # A wrapping multiply-add hash of the band; a colliding bucket only costs one failed verification below.
+        keys = (block.astype(np.uint64) * mix).sum(axis=1, dtype=np.uint64)
+        codes, _ = pd.factorize(keys)
+        _, first = np.unique(codes, return_index=True)
+        leaders = first[codes]
+        members = np.flatnonzero(leaders != np.arange(n))
+        if not len(members):
+            continue
+        verified = signature_agreement(signatures, members, leaders[members]) >= threshold
+        left.append(members[verified])
+        right.append(leaders[members[verified]])
+    if not left:
+        return np.arange(n)
+    return _components(n, np.concatenate(left), np.concatenate(right))
+
+
+def cluster_texts(texts: Sequence[str], threshold: float, perms: int = 64, bands: int = 8) -> tuple[np.ndarray, np.ndarray]:
+    """(cluster label per text, i.e. the index of the cluster's first text; the texts' signatures)."""
+    if not 0.0 < threshold <= 1.0:
+        raise RuntimeError(f"--cluster-threshold must be in (0, 1], got {threshold}.")
+    if bands < 1 or perms < bands:
+        raise RuntimeError("--minhash-perms must be at least --lsh-bands, and --lsh-bands at least 1.")
+    if not len(texts):
+        return np.array([], dtype=np.int64), np.empty((0, perms), dtype=np.uint32)
+    signatures = minhash_signatures(texts, perms)
+    return lsh_clusters(signatures, bands, threshold), signatures
@@ -0,0 +1,74 @@
+"""Fixed-point money: amounts reduce as int64 units (cents, or cents x weight hundredths for priorities), exact in any order.
+
+Amounts carry 2 decimals and every weight at most 2, so an amount times n weights is an exact decimal with 2 + 2n
+places. Rows keep their float dollar values for display and are scaled to units by each aggregation (group_agg, the
+stream states, what-if), not once at fetch; sums, means and SQL push-down totals are integer sums of those units,
+converted to float once, so the printed totals are the exact decimal totals.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+
+AMOUNT_DECIMALS = 2
+WEIGHT_DECIMALS = 2
+_FIXED_HOW = re.compile(r"fixed(\d+)(_mean)?$")
+
+
+def fixed_how(decimals: int, mean: bool = False) -> str:
+    """Aggregation name understood by group_agg and the stream measures: exact sum (or mean) at this many decimals."""
+    return f"fixed{decimals}{'_mean' if mean else ''}"
+
+
+AMOUNT_SUM = fixed_how(AMOUNT_DECIMALS)
+AMOUNT_MEAN = fixed_how(AMOUNT_DECIMALS, mean=True)
+# amount x one weight (triage, prevention and RCI priorities); recovery applies two weights.
+PRIORITY_DECIMALS = AMOUNT_DECIMALS + WEIGHT_DECIMALS
+RECOVERY_PRIORITY_DECIMALS = AMOUNT_DECIMALS + 2 * WEIGHT_DECIMALS
+PRIORITY_SUM = fixed_how(PRIORITY_DECIMALS)
+RECOVERY_PRIORITY_SUM = fixed_how(RECOVERY_PRIORITY_DECIMALS)
+
+
+def parse_fixed(how: str) -> tuple[int, bool] | None:
+    """(decimals, is_mean) for a fixed_how() name, None for any other aggregation."""
+    match = _FIXED_HOW.match(how)
+    return (int(match.group(1)), bool(match.group(2))) if match else None
+
+
+def fixed_units(values: Any, decimals: int) -> np.ndarray:
+    """int64 units of 10**-decimals, rounded half away from zero like SQL ROUND; raises on NaN/inf or int64 overflow."""
+    numbers = np.asarray(pd.Series(values).to_numpy(dtype=float, na_value=np.nan), dtype=float)
+    if not np.isfinite(numbers).all():
+        raise RuntimeError("Money values must be finite before fixed-point aggregation.")
+    scaled = numbers * 10**decimals
+    # Any sum of these units must fit int64; 2**62 leaves room for the float rounding of this check.
+    if np.abs(scaled).sum() >= 2.0**62:
+        raise RuntimeError(f"Money values too large for int64 fixed-point sums at {decimals} decimals.")
+    whole = np.trunc(scaled)
+    return (whole + np.where(np.abs(scaled - whole) >= 0.5, np.sign(scaled), 0.0)).astype(np.int64)
+
+
+def units_to_float(units: int, decimals: int, count: int = 1) -> float:
+    """units * 10**-decimals / count, rounded once (Python int division is correctly rounded)."""
+    return int(units) / (10**decimals * int(count)) if count else float("nan")
+
+
+def units_to_floats(units: np.ndarray, decimals: int, counts: np.ndarray | None = None) -> np.ndarray:
+    """Vectorized units_to_float: identical results, since int64 values and divisors below 2**53 are exact doubles."""
+    units = np.asarray(units, dtype=np.int64)
+    divisors = np.full(len(units), 10**decimals, dtype=np.int64) if counts is None else 10**decimals * np.asarray(counts, dtype=np.int64)
+    exact = (np.abs(units) < 2**53) & (divisors < 2**53)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = np.where(divisors > 0, units.astype(float) / divisors.astype(float), np.nan)
+    for i in np.flatnonzero(~exact):
+        out[i] = units_to_float(int(units[i]), decimals, int(divisors[i]) // 10**decimals)
+    return out
+
+
+def fixed_total(values: Any, decimals: int) -> float:
+    return units_to_float(int(fixed_units(values, decimals).sum()), decimals)
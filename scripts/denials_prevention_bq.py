@@ -6,14 +6,31 @@ import os
 from datetime import date
 from html import escape
 from pathlib import Path
+from typing import Any, Sequence
 
+import numpy as np
 import pandas as pd
-from google.cloud import bigquery
 
-DETAIL_SQL = """
+from denials_anchor import anchor_estimates, anchor_script, anchored
+from denials_backfill import WeekSlice, add_backfill_args, backfill_lookback_days, backfill_summary_lines, run_backfill, week_slices
+from denials_cache import add_cache_args, with_cache
+from denials_classify import DENIAL_BUCKET_SQL
+from denials_compute import add_compute_args, group_agg
+from denials_engine import QueryEngine, QueryParam, add_engine_args, check_scan_budget, engine_summary_lines, iter_frames, make_engine
+from denials_forecast import add_forecast_args, bucket_outlook, detail_week_totals, rollup_week_totals, run_forecast
+from denials_frame import compact_detail, week_id, week_key
+from denials_money import AMOUNT_DECIMALS, AMOUNT_SUM, PRIORITY_DECIMALS, PRIORITY_SUM, WEIGHT_DECIMALS, fixed_units, units_to_floats
+from denials_pushdown import decode_exact_sums, in_window, rollup_level, rollup_min_aging_days, rollup_sql, rollup_weeks
+from denials_scenarios import add_scenario_args, merge_rates, parse_rates, scenario_cube, scenario_slice
+from denials_stability import backfill_trend, trend_summary_lines
+from denials_stream import StreamRollup
+from denials_topk import top_k_rows
+
+DETAIL_SQL = f"""
 WITH base AS (
   SELECT
     CAST(clm_id AS STRING) AS claim_id,
+    anchor_min_aging_days AS min_aging_days,
     DATE_SUB(@as_of_date, INTERVAL CAST(COALESCE(aging_days, 0) AS INT64) DAY) AS service_date,
     COALESCE(top_denial_group, top_denial_prcsg, 'UNSPECIFIED') AS denial_reason_raw,
     LOWER(
@@ -28,8 +45,9 @@ WITH base AS (
     COALESCE(top_denial_prcsg, '') AS denial_code,
     COALESCE(denied_potential_allowed_proxy_amt, 0.0) AS denied_amount,
     COALESCE(p_denial, 0.0) AS p_denial
-  FROM `{source_fqn}`
-  WHERE CAST(COALESCE(aging_days, 0) AS INT64) BETWEEN @min_aging_days AND (@min_aging_days + @lookback_days)
+  FROM `{{source_fqn}}`
+  -- Constant bounds prune partitions; undated rows stay in, as they did under the aging_days window.
+  WHERE min_svc_dt BETWEEN DATE_SUB(anchor_max_svc_dt, INTERVAL @lookback_days DAY) AND anchor_max_svc_dt OR min_svc_dt IS NULL
 ),
 denied AS (
   SELECT
@@ -45,14 +63,7 @@ denied AS (
 bucketed AS (
   SELECT
     *,
-    CASE
-      WHEN REGEXP_CONTAINS(denial_reason_text, r'auth|authorization|precert|elig|eligibility|coverage|member') THEN 'AUTH_ELIG'
-      WHEN REGEXP_CONTAINS(denial_reason_text, r'coding|modifier|dx|icd|cpt|documentation|medical record|bundl') THEN 'CODING_DOC'
-      WHEN REGEXP_CONTAINS(denial_reason_text, r'timely|filing|limit|late') THEN 'TIMELY_FILING'
-      WHEN REGEXP_CONTAINS(denial_reason_text, r'duplicate|dup') THEN 'DUPLICATE'
-      WHEN REGEXP_CONTAINS(denial_reason_text, r'contract|noncovered|non-covered|bundled per contract|write off') THEN 'CONTRACTUAL'
-      ELSE 'OTHER_PROXY'
-    END AS denial_bucket
+    {DENIAL_BUCKET_SQL} AS denial_bucket
   FROM denied
   WHERE denial_flag
 ),
@@ -68,6 +79,7 @@ weighted AS (
 )
 SELECT
   claim_id,
+  min_aging_days,
   service_date,
   denial_reason_raw AS denial_reason,
   denial_bucket,
@@ -78,17 +90,20 @@ FROM weighted
 ORDER BY service_date DESC, prevention_priority_score DESC
 """
 
-MIN_AGING_SQL = """
-SELECT
-  MIN(CAST(COALESCE(aging_days, 0) AS INT64)) AS min_aging_days
-FROM `{source_fqn}`
-WHERE
-  COALESCE(p_denial, 0.0) > 0
-  OR COALESCE(top_denial_prcsg, '') != ''
-  OR COALESCE(top_denial_group, 'UNSPECIFIED') != 'UNSPECIFIED'
-  OR COALESCE(denied_potential_allowed_proxy_amt, 0.0) > 0
-"""
-
+ROLLUP_MEASURES = {
+    "denied_amount_sum": (in_window("denied_amount"), AMOUNT_SUM),
+    "denial_count": (in_window("claim_id"), "count"),
+    "preventability_weight": (in_window("preventability_weight"), "min"),
+    "priority_score": (in_window("prevention_priority_score"), PRIORITY_SUM),
+}
+SUMMARY_ORDER = (("priority_score", False), ("denied_amount_sum", False), ("denial_bucket", True), ("denial_reason", True))
+SCENARIO_KEYS = ["denial_bucket", "denial_reason"]
+STREAM_MEASURES = {
+    "denied_amount_sum": ("denied_amount", AMOUNT_SUM),
+    "denial_count": ("claim_id", "count"),
+    "preventability_weight": ("preventability_weight", "first"),
+    "priority_score": ("prevention_priority_score", PRIORITY_SUM),
+}
 OWNER_MAP = {
     "AUTH_ELIG": "Eligibility/Auth team",
     "CODING_DOC": "Coding/CDI",
@@ -157,37 +172,41 @@ def _stability_confidence(top2_overlap: int) -> str:
     return "LOW"
 
 
-def _run_query(client: bigquery.Client, sql: str, params: list[bigquery.ScalarQueryParameter]) -> pd.DataFrame:
-    cfg = bigquery.QueryJobConfig(query_parameters=params)
-    return client.query(sql, job_config=cfg).result().to_dataframe()
+def _run_query(engine: QueryEngine, sql: str, params: list[QueryParam]) -> pd.DataFrame:
+    return engine.query_df(sql, params)
 
 
-def _with_dataset_week_keys(df: pd.DataFrame) -> pd.DataFrame:
-    out = df.copy()
-    out["service_date"] = pd.to_datetime(out["service_date"])
-    out["dataset_week_start"] = out["service_date"] - pd.to_timedelta(out["service_date"].dt.weekday, unit="D")
-    out["dataset_week_key"] = out["dataset_week_start"].dt.strftime("%Y-%m-%d")
-    return out
+def _stream_rollup(engine: QueryEngine, sql: str, params: list[QueryParam], lookback_days: int) -> pd.DataFrame:
+    rollup = StreamRollup(STREAM_MEASURES, (), 0)
+    for batch_df in iter_frames(engine, sql, params):
+        rollup.add(batch_df)
+    return rollup.rollup_frame(lookback_days)
 
 
-def _build_summary(current_df: pd.DataFrame, limit_rows: int) -> pd.DataFrame:
-    summary = (
-        current_df.groupby(["denial_bucket", "denial_reason"], as_index=False)
-        .agg(
-            denied_amount_sum=("denied_amount", "sum"),
-            denial_count=("claim_id", "count"),
-            preventability_weight=("preventability_weight", "first"),
-        )
-        .copy()
+def _build_summary(current_df: pd.DataFrame, limit_rows: int, backend: str = "pandas") -> pd.DataFrame:
+    grouped = group_agg(
+        current_df,
+        ["denial_bucket", "denial_reason"],
+        {
+            "denied_amount_sum": ("denied_amount", AMOUNT_SUM),
+            "denial_count": ("claim_id", "count"),
+            "preventability_weight": ("preventability_weight", "first"),
+        },
+        backend,
+    )
+    return _summary_from_groups(grouped, limit_rows)
+
+
+def _summary_from_groups(grouped: pd.DataFrame, limit_rows: int) -> pd.DataFrame:
+    summary = grouped[["denial_bucket", "denial_reason", "denied_amount_sum", "denial_count", "preventability_weight"]].copy()
+    # Amount units times weight units are exact PRIORITY_DECIMALS units; a float product would not be.
+    summary["prevented_exposure_proxy"] = units_to_floats(
+        fixed_units(summary["denied_amount_sum"], AMOUNT_DECIMALS) * fixed_units(summary["preventability_weight"], WEIGHT_DECIMALS),
+        PRIORITY_DECIMALS,
     )
-    summary["prevented_exposure_proxy"] = summary["denied_amount_sum"] * summary["preventability_weight"]
     summary["priority_score"] = summary["prevented_exposure_proxy"]
     summary["payer_dim_status"] = "MISSING_IN_MART"
-    summary = summary.sort_values(
-        ["priority_score", "denied_amount_sum", "denial_bucket", "denial_reason"],
-        ascending=[False, False, True, True],
-        kind="mergesort",
-    ).head(limit_rows)
+    summary = top_k_rows(summary, SUMMARY_ORDER, limit_rows)
     return summary[
         [
             "denial_bucket",
@@ -202,10 +221,14 @@ def _build_summary(current_df: pd.DataFrame, limit_rows: int) -> pd.DataFrame:
     ]
 
 
-def _build_stability(current_df: pd.DataFrame, prior_df: pd.DataFrame) -> tuple[pd.DataFrame, int]:
-    current = current_df.groupby("denial_bucket", as_index=False).agg(current_priority_score=("prevention_priority_score", "sum"))
-    prior = prior_df.groupby("denial_bucket", as_index=False).agg(prior_priority_score=("prevention_priority_score", "sum"))
-    merged = current.merge(prior, on="denial_bucket", how="outer").fillna(0.0)
+def _build_stability(current_df: pd.DataFrame, prior_df: pd.DataFrame, backend: str = "pandas") -> tuple[pd.DataFrame, int]:
+    current = group_agg(current_df, ["denial_bucket"], {"current_priority_score": ("prevention_priority_score", PRIORITY_SUM)}, backend)
+    prior = group_agg(prior_df, ["denial_bucket"], {"prior_priority_score": ("prevention_priority_score", PRIORITY_SUM)}, backend)
+    return _stability_from_totals(current, prior)
+
+
+def _stability_from_totals(current: pd.DataFrame, prior: pd.DataFrame) -> tuple[pd.DataFrame, int]:
+    merged = current.merge(prior, on="denial_bucket", how="outer").fillna({"current_priority_score": 0.0, "prior_priority_score": 0.0})
     merged["delta_priority_score"] = merged["current_priority_score"] - merged["prior_priority_score"]
 
     current_rank_map = (
@@ -248,24 +271,30 @@ def _build_stability(current_df: pd.DataFrame, prior_df: pd.DataFrame) -> tuple[
     ], overlap
 
 
-def _build_scenarios(summary_df: pd.DataFrame) -> pd.DataFrame:
-    top2 = (
-        summary_df.sort_values(["priority_score", "denial_bucket"], ascending=[False, True], kind="mergesort")
-        .head(2)[["denial_bucket", "prevented_exposure_proxy"]]
-        .copy()
-    )
-    top2["prevent_10"] = top2["prevented_exposure_proxy"] * 0.10
-    top2["prevent_20"] = top2["prevented_exposure_proxy"] * 0.20
-    top2["prevent_30"] = top2["prevented_exposure_proxy"] * 0.30
-    return top2[["denial_bucket", "prevented_exposure_proxy", "prevent_10", "prevent_20", "prevent_30"]]
+def _build_scenario_cube(
+    summary_df: pd.DataFrame, rates: np.ndarray, weeks: int = 1, ramps: Sequence[str] = ("step",), ramp_weeks: int = 4
+) -> pd.DataFrame:
+    units = summary_df.sort_values(["priority_score", "denial_bucket"], ascending=[False, True], kind="mergesort")
+    return scenario_cube(units[[*SCENARIO_KEYS, "prevented_exposure_proxy"]], "prevented_exposure_proxy", rates, weeks, ramps, ramp_weeks)
+
+
+def _build_scenarios(scenario_cube_df: pd.DataFrame, brief_rates: np.ndarray) -> pd.DataFrame:
+    """Brief table: the top-2 summary rows at full rate in week 1, sliced from the cube."""
+    table = scenario_slice(scenario_cube_df, SCENARIO_KEYS, "prevented_exposure_proxy", brief_rates).head(2)
+    return table.drop(columns="denial_reason")
 
 
-def _build_brief_markdown(source_fqn: str, summary_df: pd.DataFrame, scenarios_df: pd.DataFrame, current_week: str, prior_week: str, top2_overlap: int, workqueue_size: int) -> str:
+def _rate_columns(scenarios_df: pd.DataFrame) -> list[str]:
+    return [column for column in scenarios_df.columns if column.startswith("prevent_")]
+
+
+def _build_brief_markdown(source_fqn: str, summary_df: pd.DataFrame, scenarios_df: pd.DataFrame, current_week: str, prior_week: str, top2_overlap: int, workqueue_size: int, forecast_df: pd.DataFrame | None = None) -> str:
     total_denied = float(summary_df["denied_amount_sum"].sum()) if not summary_df.empty else 0.0
     total_prevented = float(summary_df["prevented_exposure_proxy"].sum()) if not summary_df.empty else 0.0
     top2 = summary_df.head(2)
     top2_names = ", ".join(top2["denial_bucket"].tolist()) if not top2.empty else "NONE"
     top2_share = float(top2["priority_score"].sum()) / total_prevented if total_prevented > 0 else 0.0
+    rate_columns = _rate_columns(scenarios_df)
 
     lines = [
         "# Denials Prevention Opportunity Brief v1",
@@ -283,14 +312,33 @@ def _build_brief_markdown(source_fqn: str, summary_df: pd.DataFrame, scenarios_d
         f"- Workqueue size used: {workqueue_size}",
         "",
         "## Prevention scenarios (directional)",
-        "| denial_bucket | prevented_exposure_proxy | prevent_10 | prevent_20 | prevent_30 |",
-        "|---|---:|---:|---:|---:|",
+        "| denial_bucket | prevented_exposure_proxy | " + " | ".join(rate_columns) + " |",
+        "|---|---:|" + "---:|" * len(rate_columns),
     ]
     for _, row in scenarios_df.iterrows():
         lines.append(
-            f"| {row['denial_bucket']} | {_fmt_money(float(row['prevented_exposure_proxy']))} | {_fmt_money(float(row['prevent_10']))} | {_fmt_money(float(row['prevent_20']))} | {_fmt_money(float(row['prevent_30']))} |"
+            f"| {row['denial_bucket']} | {_fmt_money(float(row['prevented_exposure_proxy']))} | "
+            + " | ".join(_fmt_money(float(row[column])) for column in rate_columns)
+            + " |"
         )
 
+    outlook = bucket_outlook(forecast_df)
+    if not outlook.empty:
+        lines.extend([
+            "",
+            f"## Next-week prevented exposure outlook (dataset-week {outlook['forecast_week'].iloc[0]})",
+            "- Full table: `exports/denials_prevention_forecast_v1.csv` (every bucket and reason)",
+            "- Exponential-smoothing projection of weekly prevention priority; directional, not a commitment.",
+            "",
+            f"| denial_bucket | last_week | expected | {float(outlook['interval'].iloc[0]) * 100:.0f}% interval | model |",
+            "|---|---:|---:|---:|---|",
+        ])
+        for _, row in outlook.iterrows():
+            lines.append(
+                f"| {row['denial_bucket']} | {_fmt_money(float(row['last_week_priority']))} | {_fmt_money(float(row['expected_priority']))} | "
+                f"{_fmt_money(float(row['lower_priority']))} - {_fmt_money(float(row['upper_priority']))} | {row['model']} |"
+            )
+
     lines.extend(["", "## Levers & owners (next week)"])
     for bucket in top2["denial_bucket"].tolist():
         lines.append(f"### {bucket}")
@@ -312,12 +360,13 @@ def _build_brief_markdown(source_fqn: str, summary_df: pd.DataFrame, scenarios_d
     return "\n".join(lines) + "\n"
 
 
-def _build_public_html(summary_df: pd.DataFrame, scenarios_df: pd.DataFrame, current_week: str, prior_week: str, top2_overlap: int, workqueue_size: int) -> str:
+def _build_public_html(summary_df: pd.DataFrame, scenarios_df: pd.DataFrame, current_week: str, prior_week: str, top2_overlap: int, workqueue_size: int, forecast_df: pd.DataFrame | None = None) -> str:
     total_denied = float(summary_df["denied_amount_sum"].sum()) if not summary_df.empty else 0.0
     total_prevented = float(summary_df["prevented_exposure_proxy"].sum()) if not summary_df.empty else 0.0
     top2 = summary_df.head(2)
     top2_names = ", ".join(top2["denial_bucket"].tolist()) if not top2.empty else "NONE"
     top2_share = float(top2["priority_score"].sum()) / total_prevented if total_prevented > 0 else 0.0
+    rate_columns = _rate_columns(scenarios_df)
 
     cards = [
         "<section class=\"impact-card\">",
@@ -335,19 +384,37 @@ def _build_public_html(summary_df: pd.DataFrame, scenarios_df: pd.DataFrame, cur
         "<p><strong>Not safe for:</strong></p><ul><li>Payer-level decisions</li><li>Causal ROI claims</li></ul>",
         "</section>",
         "<h2>Prevention scenarios (directional)</h2>",
-        "<table><thead><tr><th>denial_bucket</th><th>prevented_exposure_proxy</th><th>prevent_10</th><th>prevent_20</th><th>prevent_30</th></tr></thead><tbody>",
+        "<table><thead><tr><th>denial_bucket</th><th>prevented_exposure_proxy</th>"
+        + "".join(f"<th>{escape(column)}</th>" for column in rate_columns)
+        + "</tr></thead><tbody>",
     ]
     for _, row in scenarios_df.iterrows():
         cards.append(
             "<tr>"
             + f"<td>{escape(str(row['denial_bucket']))}</td>"
             + f"<td>{escape(_fmt_money(float(row['prevented_exposure_proxy'])))}</td>"
-            + f"<td>{escape(_fmt_money(float(row['prevent_10'])))}</td>"
-            + f"<td>{escape(_fmt_money(float(row['prevent_20'])))}</td>"
-            + f"<td>{escape(_fmt_money(float(row['prevent_30'])))}</td>"
+            + "".join(f"<td>{escape(_fmt_money(float(row[column])))}</td>" for column in rate_columns)
             + "</tr>"
         )
     cards.append("</tbody></table>")
+    outlook = bucket_outlook(forecast_df)
+    if not outlook.empty:
+        cards.append(f"<h2>Next-week prevented exposure outlook (dataset-week {escape(str(outlook['forecast_week'].iloc[0]))})</h2>")
+        cards.append(
+            "<table><thead><tr><th>denial_bucket</th><th>last_week</th><th>expected</th>"
+            + f"<th>{float(outlook['interval'].iloc[0]) * 100:.0f}% interval</th><th>model</th></tr></thead><tbody>"
+        )
+        for _, row in outlook.iterrows():
+            cards.append(
+                "<tr>"
+                + f"<td>{escape(str(row['denial_bucket']))}</td>"
+                + f"<td>{escape(_fmt_money(float(row['last_week_priority'])))}</td>"
+                + f"<td>{escape(_fmt_money(float(row['expected_priority'])))}</td>"
+                + f"<td>{escape(_fmt_money(float(row['lower_priority'])))} - {escape(_fmt_money(float(row['upper_priority'])))}</td>"
+                + f"<td>{escape(str(row['model']))}</td>"
+                + "</tr>"
+            )
+        cards.append("</tbody></table>")
     cards.append("<h2>Levers & owners (next week)</h2>")
     for bucket in top2["denial_bucket"].tolist():
         cards.append(f"<h3>{escape(bucket)}</h3>")
@@ -365,6 +432,7 @@ def _build_teaching_html(source_fqn: str, summary_df: pd.DataFrame, scenarios_df
     total_prevented = float(summary_df["prevented_exposure_proxy"].sum()) if not summary_df.empty else 0.0
     top2_names = ", ".join(summary_df.head(2)["denial_bucket"].tolist()) if not summary_df.empty else "NONE"
     top2_share = float(summary_df.head(2)["priority_score"].sum()) / total_prevented if total_prevented > 0 else 0.0
+    rate_labels = "/".join(column.removeprefix("prevent_") for column in _rate_columns(scenarios_df))
 
     return "\n".join([
         "<h1>Denials Prevention Teaching Memo v1</h1>",
@@ -373,7 +441,7 @@ def _build_teaching_html(source_fqn: str, summary_df: pd.DataFrame, scenarios_df
         "<h2>60-second answer</h2>",
         f"<p>Current week <strong>{escape(current_week)}</strong> vs prior <strong>{escape(prior_week)}</strong> has TOP2 overlap <strong>{top2_overlap}/2</strong> ({_stability_confidence(top2_overlap)}). We run reversible owner actions first.</p>",
         "<h2>90-second answer</h2>",
-        f"<p>Top example is <strong>{escape(top_bucket)}</strong> / {escape(top_reason)} with prevented exposure proxy {_fmt_money(top_prevented)}. Scenario table gives 10/20/30% directional prevention outcomes for execution planning.</p>",
+        f"<p>Top example is <strong>{escape(top_bucket)}</strong> / {escape(top_reason)} with prevented exposure proxy {_fmt_money(top_prevented)}. Scenario table gives {rate_labels}% directional prevention outcomes for execution planning.</p>",
         "<h2>Hostile questions</h2>",
         "<ul><li>Is this real dollars? Directional proxy only.</li><li>Why no payer split? Payer is missing in mart layer.</li><li>How stable is this? TOP2 overlap week-over-week.</li><li>What would make it real? Payer dimension + true service dates + CARC/RARC.</li></ul>",
         "<h2>What data would make this real</h2>",
@@ -381,6 +449,30 @@ def _build_teaching_html(source_fqn: str, summary_df: pd.DataFrame, scenarios_df
     ])
 
 
+def _render_backfill_week(week: WeekSlice, week_dir: Path, options: dict[str, Any]) -> list[Path]:
+    summary_df = _build_summary(week.current, options["summary_limit"], options["compute_backend"])
+    _, top2_overlap = _build_stability(week.current, week.prior, options["compute_backend"])
+    brief_rates = options["scenario_brief_rates"]
+    scenarios_df = _build_scenarios(_build_scenario_cube(summary_df, brief_rates), brief_rates)
+    workqueue_size_used = min(int(options["workqueue_size"]), len(week.current))
+    summary_path = week_dir / "denials_prevention_summary_v1.csv"
+    md_path = week_dir / "denials_prevention_brief_v1.md"
+    summary_df.to_csv(summary_path, index=False)
+    md_path.write_text(
+        _build_brief_markdown(
+            options["source_fqn"],
+            summary_df,
+            scenarios_df,
+            week.week_key,
+            week.prior_week_key or "NONE",
+            top2_overlap,
+            workqueue_size_used,
+        ),
+        encoding="utf-8",
+    )
+    return [summary_path, md_path]
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Build denials prevention opportunity brief from a dbt BigQuery mart relation.")
     parser.add_argument("--project", default=os.getenv("BQ_PROJECT_ID") or os.getenv("GOOGLE_CLOUD_PROJECT") or "rcm-flagship")
@@ -392,6 +484,17 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--workqueue-size", type=int, default=25)
     parser.add_argument("--summary-limit", type=int, default=50)
     parser.add_argument("--dry-run-sql", action="store_true")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--pushdown",
+        action="store_true",
+        help="Aggregate summary/stability in SQL instead of fetching detail rows.",
+    )
+    mode.add_argument(
+        "--stream",
+        action="store_true",
+        help="Aggregate detail pages as they arrive instead of holding the full detail frame.",
+    )
     parser.add_argument("--write-html", dest="write_html", action="store_true", default=True)
     parser.add_argument("--no-write-html", dest="write_html", action="store_false")
     parser.add_argument(
@@ -403,6 +506,12 @@ def parse_args() -> argparse.Namespace:
     )
     parser.add_argument("--no-write-teaching-html", dest="write_teaching_html", action="store_false")
     parser.add_argument("--determinism-check", action="store_true")
+    add_backfill_args(parser)
+    add_compute_args(parser)
+    add_scenario_args(parser)
+    add_forecast_args(parser)
+    add_engine_args(parser)
+    add_cache_args(parser)
     return parser.parse_args()
 
 
@@ -412,18 +521,41 @@ def main() -> int:
     as_of_date = pd.to_datetime(args.as_of_date).date() if args.as_of_date else None
     query_anchor_date = as_of_date or date.today()
 
-    min_aging_sql = MIN_AGING_SQL.format(source_fqn=source_fqn)
     detail_sql = DETAIL_SQL.format(source_fqn=source_fqn)
 
     if args.dry_run_sql:
         print("-- SOURCE RELATION --")
         print(source_fqn)
-        print("\n-- DETAIL SQL --")
-        print(detail_sql)
-        print("\n-- MIN AGING SQL --")
-        print(min_aging_sql)
+        print("\n-- ANCHOR SCRIPT (runs ahead of each query below, in the same job) --")
+        print(anchor_script(source_fqn))
+        if args.pushdown:
+            print("\n-- ROLLUP SQL --")
+            print(rollup_sql(detail_sql, ROLLUP_MEASURES))
+        else:
+            print("\n-- DETAIL SQL --")
+            print(detail_sql)
         return 0
 
+    if args.backfill_weeks and (args.pushdown or args.stream):
+        raise RuntimeError("--backfill-weeks reads the detail rows; drop --pushdown/--stream.")
+    if args.forecast and args.backfill_weeks:
+        raise RuntimeError("--forecast projects the week after the current one; drop --backfill-weeks.")
+    brief_rates = parse_rates(args.scenario_brief_rates)
+
+    engine = with_cache(make_engine(args, source_fqn), args)
+    lookback_days = backfill_lookback_days(args.backfill_weeks, args.lookback_days) if args.backfill_weeks else args.lookback_days
+    params = [
+        QueryParam("as_of_date", "DATE", query_anchor_date),
+        QueryParam("lookback_days", "INT64", lookback_days),
+    ]
+    query_sql = rollup_sql(detail_sql, ROLLUP_MEASURES) if args.pushdown else detail_sql
+    if args.estimate_cost or args.max_bytes_billed:
+        for line in check_scan_budget(engine, anchor_estimates([(query_sql, params)], source_fqn, query_anchor_date), args.max_bytes_billed):
+            print(line)
+        if args.estimate_cost:
+            return 0
+    query_sql = anchored(query_sql, source_fqn)
+
     out_dir = Path(args.out)
     out_dir.mkdir(parents=True, exist_ok=True)
     private_dir = out_dir / "private"
@@ -431,30 +563,55 @@ def main() -> int:
     docs_dir = Path("docs")
     docs_dir.mkdir(parents=True, exist_ok=True)
 
-    client = bigquery.Client(project=args.project)
-    min_aging_df = _run_query(client, min_aging_sql, [])
-    min_aging_days = int(min_aging_df.iloc[0]["min_aging_days"]) if not min_aging_df.empty else None
-    if min_aging_days is None:
-        raise RuntimeError("No denied rows found to anchor current period.")
+    if args.backfill_weeks:
+        detail_df = _run_query(engine, query_sql, params)
+        if detail_df.empty:
+            raise RuntimeError("No denied rows returned for selected anchored window.")
+        detail_df = compact_detail(detail_df.drop(columns="min_aging_days"))
+        backfill_dir = out_dir / "backfill" / "prevention"
+        last_week_id = week_id(as_of_date) if as_of_date else None
+        trend_df = backfill_trend(detail_df, "prevention_priority_score", args.backfill_weeks, last_week_id, PRIORITY_SUM)
+        written, skipped = run_backfill(
+            _render_backfill_week,
+            week_slices(detail_df, args.backfill_weeks, last_week_id),
+            backfill_dir,
+            {
+                "source_fqn": source_fqn,
+                "summary_limit": args.summary_limit,
+                "workqueue_size": args.workqueue_size,
+                "compute_backend": args.compute_backend,
+                "scenario_brief_rates": brief_rates,
+            },
+            args.backfill_workers,
+        )
+        trend_path = backfill_dir / "denials_stability_trend_v1.csv"
+        trend_df.to_csv(trend_path, index=False)
+        print(f"SOURCE_RELATION={source_fqn}")
+        for line in [*engine_summary_lines(engine), *backfill_summary_lines(backfill_dir, written, skipped), *trend_summary_lines(trend_df)]:
+            print(line)
+        print(f"WROTE={trend_path}")
+        return 0
 
-    detail_df = _run_query(
-        client,
-        detail_sql,
-        [
-            bigquery.ScalarQueryParameter("as_of_date", "DATE", query_anchor_date),
-            bigquery.ScalarQueryParameter("min_aging_days", "INT64", min_aging_days),
-            bigquery.ScalarQueryParameter("lookback_days", "INT64", args.lookback_days),
-        ],
-    )
-    if detail_df.empty:
-        raise RuntimeError("No denied rows returned for selected anchored window.")
-
-    detail_df = _with_dataset_week_keys(detail_df)
-    max_service_date = detail_df["service_date"].max()
-    window_start = max_service_date - pd.Timedelta(days=args.lookback_days)
-    detail_df = detail_df[(detail_df["service_date"] >= window_start) & (detail_df["service_date"] <= max_service_date)].copy()
-    week_order = detail_df[["dataset_week_start", "dataset_week_key"]].drop_duplicates().sort_values("dataset_week_start")
-    week_keys = week_order["dataset_week_key"].tolist()
+    if args.pushdown or args.stream:
+        if args.pushdown:
+            rollup_df = decode_exact_sums(_run_query(engine, query_sql, params), ROLLUP_MEASURES)
+        else:
+            rollup_df = _stream_rollup(engine, query_sql, params, args.lookback_days)
+        if rollup_df.empty or int(rollup_df["detail_rows"].max()) == 0:
+            raise RuntimeError("No denied rows returned for selected anchored window.")
+        min_aging_days = rollup_min_aging_days(rollup_df)
+        week_keys = [wk.strftime("%Y-%m-%d") for wk in rollup_weeks(rollup_df, "window_rows")]
+    else:
+        detail_df = _run_query(engine, query_sql, params)
+        if detail_df.empty:
+            raise RuntimeError("No denied rows returned for selected anchored window.")
+        min_aging_days = int(detail_df.pop("min_aging_days").iloc[0])
+
+        detail_df = compact_detail(detail_df)
+        max_service_date = detail_df["service_date"].max()
+        window_start = max_service_date - pd.Timedelta(days=args.lookback_days)
+        detail_df = detail_df[(detail_df["service_date"] >= window_start) & (detail_df["service_date"] <= max_service_date)].copy()
+        week_keys = [week_key(wk) for wk in np.unique(detail_df["dataset_week_id"])]
     if as_of_date:
         as_of_week_start = pd.Timestamp(as_of_date) - pd.to_timedelta(pd.Timestamp(as_of_date).weekday(), unit="D")
         as_of_week_key = as_of_week_start.strftime("%Y-%m-%d")
@@ -464,25 +621,54 @@ def main() -> int:
 
     current_week = week_keys[-1]
     prior_week = week_keys[-2] if len(week_keys) > 1 else ""
-    current_df = detail_df[detail_df["dataset_week_key"] == current_week].copy()
-    prior_df = detail_df[detail_df["dataset_week_key"] == prior_week].copy() if prior_week else detail_df.head(0).copy()
-
-    summary_df = _build_summary(current_df, args.summary_limit)
-    stability_df, top2_overlap = _build_stability(current_df, prior_df)
-    scenarios_df = _build_scenarios(summary_df)
-    workqueue_size_used = min(int(args.workqueue_size), int(len(current_df)))
+    if args.pushdown or args.stream:
+        current_totals = rollup_level(rollup_df, pd.Timestamp(current_week), 1)
+        prior_totals = rollup_level(rollup_df, pd.Timestamp(prior_week), 1) if prior_week else current_totals.head(0)
+        summary_df = _summary_from_groups(rollup_level(rollup_df, pd.Timestamp(current_week), 2), args.summary_limit)
+        stability_df, top2_overlap = _stability_from_totals(
+            current_totals[["denial_bucket", "priority_score"]].rename(columns={"priority_score": "current_priority_score"}),
+            prior_totals[["denial_bucket", "priority_score"]].rename(columns={"priority_score": "prior_priority_score"}),
+        )
+        current_rows = int(current_totals["window_rows"].sum())
+        forecast_totals = rollup_week_totals(rollup_df) if args.forecast else None
+    else:
+        current_df = detail_df[detail_df["dataset_week_id"] == week_id(current_week)].copy()
+        prior_df = detail_df[detail_df["dataset_week_id"] == week_id(prior_week)].copy() if prior_week else detail_df.head(0).copy()
+
+        summary_df = _build_summary(current_df, args.summary_limit, args.compute_backend)
+        stability_df, top2_overlap = _build_stability(current_df, prior_df, args.compute_backend)
+        current_rows = int(len(current_df))
+        forecast_totals = (
+            detail_week_totals(detail_df, "prevention_priority_score", PRIORITY_SUM, args.compute_backend) if args.forecast else None
+        )
+    scenario_cube_df = _build_scenario_cube(
+        summary_df,
+        merge_rates(parse_rates(args.scenario_rates), brief_rates),
+        args.scenario_weeks,
+        list(dict.fromkeys(["step", *args.scenario_ramp])),
+        args.scenario_ramp_weeks,
+    )
+    scenarios_df = _build_scenarios(scenario_cube_df, brief_rates)
+    workqueue_size_used = min(int(args.workqueue_size), current_rows)
 
     summary_path = out_dir / "denials_prevention_summary_v1.csv"
+    scenarios_path = out_dir / "denials_prevention_scenarios_v1.csv"
+    forecast_df, forecast_lines = (
+        run_forecast(forecast_totals, week_id(current_week), PRIORITY_DECIMALS, args, out_dir / "denials_prevention_forecast_v1.csv")
+        if forecast_totals is not None
+        else (None, [])
+    )
     md_path = docs_dir / "denials_prevention_brief_v1.md"
     html_path = docs_dir / "denials_prevention_brief_v1.html"
     teaching_html_path = private_dir / "denials_prevention_brief_v1_teaching.html"
 
     summary_df.to_csv(summary_path, index=False)
-    md_text = _build_brief_markdown(source_fqn, summary_df, scenarios_df, current_week, prior_week if prior_week else "NONE", top2_overlap, workqueue_size_used)
+    scenario_cube_df.to_csv(scenarios_path, index=False)
+    md_text = _build_brief_markdown(source_fqn, summary_df, scenarios_df, current_week, prior_week if prior_week else "NONE", top2_overlap, workqueue_size_used, forecast_df)
     md_path.write_text(md_text, encoding="utf-8")
 
     if args.write_html:
-        body_html = _build_public_html(summary_df, scenarios_df, current_week, prior_week if prior_week else "NONE", top2_overlap, workqueue_size_used)
+        body_html = _build_public_html(summary_df, scenarios_df, current_week, prior_week if prior_week else "NONE", top2_overlap, workqueue_size_used, forecast_df)
         html_doc = """<!doctype html>
 <html lang=\"en\"><head><meta charset=\"utf-8\"><meta name=\"viewport\" content=\"width=device-width, initial-scale=1\"><title>Denials Prevention Opportunity Brief v1</title>
 <style>body{max-width:960px;margin:24px auto;padding:0 16px 40px 16px;font-family:'Segoe UI',Arial,sans-serif;line-height:1.5;color:#111}table{border-collapse:collapse;width:100%;margin:12px 0;font-size:14px}th,td{border:1px solid #ddd;padding:6px 8px;text-align:left;vertical-align:top}th{background:#f5f6f7}.impact-card{background:#f8fafc;border:1px solid #cbd5e1;border-radius:8px;padding:12px;margin:12px 0 16px 0}</style></head><body>""" + body_html + "</body></html>"
@@ -509,6 +695,9 @@ def main() -> int:
 
     print(f"SOURCE_RELATION={source_fqn}")
     print(f"SOURCE_GRAIN=claim-level ({args.relation})")
+    for line in engine_summary_lines(engine):
+        print(line)
+    print(f"MIN_AGING_DAYS={min_aging_days}")
     print(f"PREV_WEEK_CURRENT={current_week}")
     print(f"PREV_TOTAL_DENIED_PROXY={total_denied:.2f}")
     print(f"PREV_TOTAL_PREVENTED_EXPOSURE_PROXY={total_prevented:.2f}")
@@ -516,7 +705,11 @@ def main() -> int:
     print(f"PREV_TOP2_PREVENTED_SHARE={top2_share * 100.0:.4f}%")
     print(f"PREV_STABILITY_CONFIDENCE={_stability_confidence(top2_overlap)}")
     print(f"TOP2_OVERLAP={top2_overlap}/2")
+    print(f"SCENARIO_CELLS={len(scenario_cube_df)}")
     print(f"WROTE={summary_path}")
+    print(f"WROTE={scenarios_path}")
+    for line in forecast_lines:
+        print(line)
     print(f"WROTE={md_path}")
     if args.write_html:
         print(f"WROTE={html_path}")
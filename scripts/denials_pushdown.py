@@ -0,0 +1,131 @@
+"""Aggregation push-down queries built around the denials scripts' DETAIL_SQL."""
+
+from __future__ import annotations
+
+import re
+from typing import Any
+
+import pandas as pd
+
+from denials_money import parse_fixed, units_to_float
+
+
+WEEK_START_SQL = "DATE_TRUNC(service_date, WEEK(MONDAY))"
+ROLLUP_KEYS = ("denial_bucket", "denial_reason")
+
+
+def fixed_sum(expr: str, decimals: int) -> str:
+    """SUM of expr as int64 units of 10**-decimals (see denials_money); decode_exact_sums converts back once."""
+    return f"CAST(SUM(CAST(ROUND({expr} * {10**decimals}) AS INT64)) AS STRING)"
+
+
+def measure_sql(expr: str, how: str) -> str:
+    """SQL aggregate for a (expr, how) measure: how is a fixed_how() name or a plain aggregate such as "count"."""
+    fixed = parse_fixed(how)
+    if fixed is None:
+        return f"{how.upper()}({expr})"
+    if fixed[1]:
+        raise RuntimeError(f"Push-down measures do not support fixed-point means: {how}")
+    return fixed_sum(expr, fixed[0])
+
+
+def decode_exact_sums(df: pd.DataFrame, measures: dict[str, tuple[str, str]]) -> pd.DataFrame:
+    out = df.copy()
+    for name, (_, how) in measures.items():
+        fixed = parse_fixed(how)
+        if fixed:
+            out[name] = [units_to_float(int(str(value)), fixed[0]) if pd.notna(value) else float("nan") for value in out[name]]
+    return out
+
+
+def in_window(expr: str) -> str:
+    return f"CASE WHEN in_window THEN {expr} END"
+
+
+def _scoped_sql(detail_sql: str, week_expr: str, windowed: bool) -> str:
+    detail_body = re.sub(r"\s*ORDER BY[^\n]*\s*$", "", detail_sql.strip())
+    window_expr = "service_date >= DATE_SUB(bounds.max_service_date, INTERVAL @lookback_days DAY)" if windowed else "TRUE"
+    return f"""
+WITH detail AS (
+{detail_body}
+),
+bounds AS (
+  SELECT MAX(service_date) AS max_service_date
+  FROM detail
+),
+scoped AS (
+  SELECT
+    detail.*,
+    {week_expr} AS dataset_week_start,
+    {window_expr} AS in_window
+  FROM detail
+  CROSS JOIN bounds
+)"""
+
+
+def rollup_sql(detail_sql: str, measures: dict[str, tuple[str, str]], week_expr: str = WEEK_START_SQL, windowed: bool = True) -> str:
+    """Week > bucket > reason rollup; every level carries detail_rows and window_rows (rows inside the lookback window)."""
+    group_cols = ["dataset_week_start", *ROLLUP_KEYS]
+    select_cols = ",\n  ".join(
+        [
+            *group_cols,
+            "MIN(min_aging_days) AS min_aging_days",
+            "COUNT(*) AS detail_rows",
+            "COUNTIF(in_window) AS window_rows",
+            *[f"{measure_sql(expr, how)} AS {name}" for name, (expr, how) in measures.items()],
+        ]
+    )
+    return f"""{_scoped_sql(detail_sql, week_expr, windowed)}
+SELECT
+  {select_cols}
+FROM scoped
+GROUP BY ROLLUP({", ".join(group_cols)})
+"""
+
+
+def grouped_sql(detail_sql: str, keys: dict[str, str], measures: dict[str, tuple[str, str]], week_expr: str = WEEK_START_SQL, windowed: bool = True) -> str:
+    """In-window rows grouped by week and the given key expressions."""
+    select_cols = ",\n  ".join(
+        [
+            "dataset_week_start",
+            *[f"{expr} AS {name}" for name, expr in keys.items()],
+            *[f"{measure_sql(expr, how)} AS {name}" for name, (expr, how) in measures.items()],
+        ]
+    )
+    return f"""{_scoped_sql(detail_sql, week_expr, windowed)}
+SELECT
+  {select_cols}
+FROM scoped
+WHERE in_window
+GROUP BY {", ".join(["dataset_week_start", *keys])}
+"""
+
+
+def top_k_sql(detail_sql: str, order_by: str, week_expr: str = WEEK_START_SQL, windowed: bool = True) -> str:
+    """Per-week top @workqueue_size rows inside the window, ordered like the pandas workqueue sort."""
+    return f"""{_scoped_sql(detail_sql, week_expr, windowed)}
+SELECT *
+FROM scoped
+WHERE in_window
+QUALIFY ROW_NUMBER() OVER (PARTITION BY dataset_week_start ORDER BY {order_by}) <= @workqueue_size
+"""
+
+
+def rollup_min_aging_days(rollup_df: pd.DataFrame) -> int:
+    return int(rollup_df.loc[rollup_df["dataset_week_start"].isna(), "min_aging_days"].iloc[0])
+
+
+def rollup_weeks(rollup_df: pd.DataFrame, count_column: str) -> list[Any]:
+    weeks = rollup_df[rollup_df["dataset_week_start"].notna() & rollup_df["denial_bucket"].isna()]
+    return sorted(weeks.loc[weeks[count_column] > 0, "dataset_week_start"].tolist())
+
+
+def rollup_level(rollup_df: pd.DataFrame, week: Any, depth: int) -> pd.DataFrame:
+    """Groups of one week (every week if None) at the given key depth that hold in-window rows, i.e. what a pandas
+    groupby would emit."""
+    weeks = rollup_df["dataset_week_start"]
+    rows = rollup_df[(weeks.notna() if week is None else weeks == week) & (rollup_df["window_rows"] > 0)]
+    for i, key in enumerate(ROLLUP_KEYS):
+        rows = rows[rows[key].notna()] if i < depth else rows[rows[key].isna()]
+    keys = (["dataset_week_start"] if week is None else []) + list(ROLLUP_KEYS[:depth])
+    return rows.sort_values(keys, kind="mergesort").reset_index(drop=True)
@@ -3,30 +3,45 @@
 import argparse
 import hashlib
 import re
+import time
 from datetime import date
 from html import escape
 from pathlib import Path
+from typing import Any
 
+import numpy as np
 import pandas as pd
-from google.cloud import bigquery
-
-
-MIN_AGING_SQL = """
-SELECT
-  MIN(CAST(COALESCE(aging_days, 0) AS INT64)) AS min_aging_days
-FROM `{source_fqn}`
-WHERE
-  COALESCE(p_denial, 0.0) > 0
-  OR COALESCE(top_denial_prcsg, '') != ''
-  OR COALESCE(top_denial_group, 'UNSPECIFIED') != 'UNSPECIFIED'
-  OR COALESCE(denied_potential_allowed_proxy_amt, 0.0) > 0
-"""
 
+from denials_anchor import anchor_estimates, anchor_script, anchored
+from denials_backfill import WeekSlice, add_backfill_args, backfill_lookback_days, backfill_summary_lines, run_backfill, week_slices
+from denials_cache import add_cache_args, with_cache
+from denials_classify import BUCKET_CLASSIFIER, DENIAL_BUCKET_SQL, RuleClassifier
+from denials_compute import add_compute_args, group_agg
+from denials_engine import QueryEngine, QueryParam, add_engine_args, check_scan_budget, engine_summary_lines, make_engine
+from denials_frame import compact_detail, intern_text, week_start
+from denials_itemsets import add_itemset_args, mine_itemsets
+from denials_minhash import add_cluster_args, cluster_texts, signature_agreement
+from denials_money import AMOUNT_MEAN, AMOUNT_SUM, PRIORITY_SUM
+from denials_topk import top_k_rows
+
+
+PREVENTABILITY_WEIGHT_SQL = BUCKET_CLASSIFIER.case_sql(
+    "denial_reason_text",
+    {
+        "AUTH_ELIG": "1.0",
+        "CODING_DOC": "1.0",
+        "TIMELY_FILING": "1.0",
+        "DUPLICATE": "1.0",
+        "CONTRACTUAL": "0.2",
+        "OTHER_PROXY": "0.6",
+    },
+)
 
-DETAIL_SQL = """
+DETAIL_SQL = f"""
 WITH base AS (
   SELECT
     CAST(clm_id AS STRING) AS claim_id,
+    anchor_min_aging_days AS min_aging_days,
     DATE_SUB(@anchor_date, INTERVAL CAST(COALESCE(aging_days, 0) AS INT64) DAY) AS service_date,
     DATE_TRUNC(
       DATE_SUB(@anchor_date, INTERVAL CAST(COALESCE(aging_days, 0) AS INT64) DAY),
@@ -48,8 +63,9 @@ WITH base AS (
         COALESCE(top_next_best_action, '')
       )
     ) AS denial_reason_text
-  FROM `{source_fqn}`
-  WHERE CAST(COALESCE(aging_days, 0) AS INT64) BETWEEN @min_aging_days AND (@min_aging_days + @lookback_days)
+  FROM `{{source_fqn}}`
+  -- Constant bounds prune partitions; undated rows stay in, as they did under the aging_days window.
+  WHERE min_svc_dt BETWEEN DATE_SUB(anchor_max_svc_dt, INTERVAL @lookback_days DAY) AND anchor_max_svc_dt OR min_svc_dt IS NULL
 ),
 denied AS (
   SELECT
@@ -65,27 +81,14 @@ denied AS (
 bucketed AS (
   SELECT
     *,
-    CASE
-      WHEN REGEXP_CONTAINS(denial_reason_text, r'auth|authorization|precert|elig|eligibility|coverage|member') THEN 'AUTH_ELIG'
-      WHEN REGEXP_CONTAINS(denial_reason_text, r'coding|modifier|dx|icd|cpt|documentation|medical record|bundl') THEN 'CODING_DOC'
-      WHEN REGEXP_CONTAINS(denial_reason_text, r'timely|filing|limit|late') THEN 'TIMELY_FILING'
-      WHEN REGEXP_CONTAINS(denial_reason_text, r'duplicate|dup') THEN 'DUPLICATE'
-      WHEN REGEXP_CONTAINS(denial_reason_text, r'contract|noncovered|non-covered|bundled per contract|write off') THEN 'CONTRACTUAL'
-      ELSE 'OTHER_PROXY'
-    END AS denial_bucket,
-    CASE
-      WHEN REGEXP_CONTAINS(denial_reason_text, r'auth|authorization|precert|elig|eligibility|coverage|member') THEN 1.0
-      WHEN REGEXP_CONTAINS(denial_reason_text, r'coding|modifier|dx|icd|cpt|documentation|medical record|bundl') THEN 1.0
-      WHEN REGEXP_CONTAINS(denial_reason_text, r'timely|filing|limit|late') THEN 1.0
-      WHEN REGEXP_CONTAINS(denial_reason_text, r'duplicate|dup') THEN 1.0
-      WHEN REGEXP_CONTAINS(denial_reason_text, r'contract|noncovered|non-covered|bundled per contract|write off') THEN 0.2
-      ELSE 0.6
-    END AS preventability_weight
+    {DENIAL_BUCKET_SQL} AS denial_bucket,
+    {PREVENTABILITY_WEIGHT_SQL} AS preventability_weight
   FROM denied
   WHERE denial_flag
 )
 SELECT
   claim_id,
+  min_aging_days,
   service_date,
   dataset_week_key,
   aging_days,
@@ -112,15 +115,18 @@ ORDER BY dataset_week_key DESC, denied_amount_proxy DESC, claim_id
 """
 
 
-ACTION_CATEGORY_RULES: list[tuple[str, re.Pattern[str]]] = [
-    ("AUTH_REQUIRED", re.compile(r"auth|authorization|precert")),
-    ("ELIGIBILITY", re.compile(r"elig|eligibility|coverage|member")),
-    ("CODING_MODIFIER", re.compile(r"coding|modifier|dx|icd|cpt")),
-    ("MEDICAL_RECORDS", re.compile(r"medical|record|documentation|op note")),
-    ("TIMELY_FILING", re.compile(r"timely|filing|limit|late")),
-    ("DUPLICATE", re.compile(r"duplicate|dup")),
-    ("CONTRACTUAL", re.compile(r"contract|noncovered|non-covered|write off|allow")),
+ACTION_CATEGORY_RULES: list[tuple[str, str]] = [
+    ("AUTH_REQUIRED", r"auth|authorization|precert"),
+    ("ELIGIBILITY", r"elig|eligibility|coverage|member"),
+    ("CODING_MODIFIER", r"coding|modifier|dx|icd|cpt"),
+    ("MEDICAL_RECORDS", r"medical|record|documentation|op note"),
+    ("TIMELY_FILING", r"timely|filing|limit|late"),
+    ("DUPLICATE", r"duplicate|dup"),
+    ("CONTRACTUAL", r"contract|noncovered|non-covered|write off|allow"),
 ]
+ACTION_CATEGORY_CLASSIFIER = RuleClassifier(ACTION_CATEGORY_RULES, "OTHER_ACTION")
+SUMMARY_ORDER = (("priority_score", False), ("denied_amount_sum", False), ("denial_bucket", True))
+TICKET_ORDER = (("denied_amount_sum", False), ("denial_count", False), ("pattern_text", True), ("denial_bucket", True))
 
 OWNER_MAP = {
     "AUTH_REQUIRED": "Eligibility/Auth team",
@@ -191,17 +197,19 @@ def _safe_md_cell(value: object) -> str:
     return text.replace("|", " / ").replace("\n", " ").strip()
 
 
-def _run_query(client: bigquery.Client, sql: str, params: list[bigquery.ScalarQueryParameter]) -> pd.DataFrame:
-    cfg = bigquery.QueryJobConfig(query_parameters=params)
-    return client.query(sql, job_config=cfg).result().to_dataframe()
+def _run_query(engine: QueryEngine, sql: str, params: list[QueryParam]) -> pd.DataFrame:
+    return engine.query_df(sql, params)
 
 
-def _assign_action_category(action_text: str, pattern_text: str) -> str:
-    text = f"{action_text or ''} {pattern_text or ''}"
-    for label, pattern in ACTION_CATEGORY_RULES:
-        if pattern.search(text):
-            return label
-    return "OTHER_ACTION"
+def _assign_action_categories(action_text: pd.Series, pattern_text: pd.Series, workers: int = 1) -> pd.Series:
+    """Categorical action category per row; each distinct (action, pattern) pair is classified once and mapped back by code."""
+    action_codes, actions = pd.factorize(action_text, use_na_sentinel=False)
+    pattern_codes, patterns = pd.factorize(pattern_text, use_na_sentinel=False)
+    width = max(len(patterns), 1)
+    pair_codes, pairs = pd.factorize(action_codes.astype(np.int64) * width + pattern_codes)
+    texts = [f"{action} {pattern}" for action, pattern in zip(actions.take(pairs // width), patterns.take(pairs % width))]
+    label_codes, labels = pd.factorize(np.array(ACTION_CATEGORY_CLASSIFIER.classify_unique(texts, workers), dtype=object), sort=True)
+    return pd.Series(pd.Categorical.from_codes(label_codes[pair_codes], categories=labels), index=action_text.index)
 
 
 def _markdown_to_html(md: str) -> str:
@@ -366,7 +374,7 @@ def _build_visual_html(
     )
     mix_base = pattern_grouped[pattern_grouped["denial_bucket"].isin(top_buckets)].copy()
     mix_agg = (
-        mix_base.groupby(["denial_bucket", "action_category"], as_index=False)
+        mix_base.groupby(["denial_bucket", "action_category"], as_index=False, observed=True)
         .agg(denied_amount_sum=("denied_amount_sum", "sum"))
         .sort_values(["denied_amount_sum", "action_category"], ascending=[False, True], kind="mergesort")
     )
@@ -459,17 +467,13 @@ def _evidence_readiness_pct(evidence_text: str) -> int:
     return min(100, len(parts) * 50)
 
 
-def _build_ticket_pack(ticket_patterns: pd.DataFrame) -> pd.DataFrame:
+def _build_ticket_pack(ticket_patterns: pd.DataFrame, pack_size: int) -> pd.DataFrame:
     out = ticket_patterns.copy()
     if out.empty:
         return out
 
     total = float(out["denied_amount_sum"].sum())
-    out = out.sort_values(
-        ["denied_amount_sum", "denial_count", "pattern_text", "denial_bucket"],
-        ascending=[False, False, True, True],
-        kind="mergesort",
-    ).reset_index(drop=True)
+    out = top_k_rows(out, TICKET_ORDER, pack_size).reset_index(drop=True)
     out["ticket_rank"] = out.index + 1
     out["operational_lever"] = out["action_category"].map(LEVER_MAP).fillna(LEVER_MAP["OTHER_ACTION"])
     out["kpi"] = out["action_category"].map(KPI_MAP).fillna(KPI_MAP["OTHER_ACTION"])
@@ -479,6 +483,7 @@ def _build_ticket_pack(ticket_patterns: pd.DataFrame) -> pd.DataFrame:
         lambda x: "READY" if x >= 100 else ("PARTIAL" if x >= 50 else "WEAK")
     )
     out["payer_dim_status"] = "MISSING_IN_MART"
+    out["pattern_text"] = out["pattern_text"].astype(str)
     return out[
         [
             "ticket_rank",
@@ -620,77 +625,28 @@ def _build_ticket_pack_visual_html(tickets_df: pd.DataFrame) -> str:
     )
 
 
-def parse_args() -> argparse.Namespace:
-    p = argparse.ArgumentParser(description="Generate Denials Root Cause Intelligence (RCI) brief from dbt BigQuery mart.")
-    p.add_argument("--project", default="rcm-flagship")
-    p.add_argument("--dataset", default="rcm")
-    p.add_argument("--relation", default="mart_workqueue_claims")
-    p.add_argument("--out", default="exports")
-    p.add_argument("--workqueue-size", type=int, default=200)
-    p.add_argument("--summary-limit", type=int, default=50)
-    p.add_argument("--patterns-per-bucket", type=int, default=5)
-    p.add_argument("--ticket-pack-size", type=int, default=10)
-    p.add_argument("--lookback-days", type=int, default=14)
-    p.add_argument("--as-of-date", default="", help="Optional YYYY-MM-DD anchor")
-    p.add_argument("--dry-run-sql", action="store_true")
-    p.add_argument("--determinism-check", action="store_true")
-    return p.parse_args()
-
-
-def main() -> int:
-    args = parse_args()
-    source_fqn = f"{args.project}.{args.dataset}.{args.relation}"
-    anchor_date = date.fromisoformat(args.as_of_date) if args.as_of_date else date.today()
-
-    min_sql = MIN_AGING_SQL.format(source_fqn=source_fqn)
-    detail_sql = DETAIL_SQL.format(source_fqn=source_fqn)
-
-    if args.dry_run_sql:
-        print(f"RCI_SOURCE={source_fqn}")
-        print("-- MIN_AGING_SQL --")
-        print(min_sql)
-        print("-- DETAIL_SQL --")
-        print(detail_sql)
-        return 0
-
-    client = bigquery.Client(project=args.project)
-    min_df = _run_query(client, min_sql, [])
-    min_aging_days = int(min_df.iloc[0]["min_aging_days"]) if not min_df.empty and pd.notna(min_df.iloc[0]["min_aging_days"]) else 0
-
-    detail_df = _run_query(
-        client,
-        detail_sql,
-        [
-            bigquery.ScalarQueryParameter("anchor_date", "DATE", anchor_date.isoformat()),
-            bigquery.ScalarQueryParameter("min_aging_days", "INT64", min_aging_days),
-            bigquery.ScalarQueryParameter("lookback_days", "INT64", args.lookback_days),
-        ],
+def _build_pattern_tables(
+    current_df: pd.DataFrame, summary_limit: int, patterns_per_bucket: int, classify_workers: int = 1, backend: str = "pandas"
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """Bucket summary, every ranked pattern, and the top patterns per bucket for one week of detail rows."""
+    current_df = current_df.copy()
+    current_df["action_category"] = _assign_action_categories(
+        current_df["next_action_text"], current_df["pattern_text"], classify_workers
     )
-    if detail_df.empty:
-        raise RuntimeError("No denied rows returned for selected window.")
-
-    detail_df["dataset_week_key"] = pd.to_datetime(detail_df["dataset_week_key"]).dt.date
-    week_keys = sorted(detail_df["dataset_week_key"].unique())
-    current_week = week_keys[-1]
-    current_df = detail_df[detail_df["dataset_week_key"] == current_week].copy()
-
-    current_df["action_category"] = [
-        _assign_action_category(str(a), str(p))
-        for a, p in zip(current_df["next_action_text"], current_df["pattern_text"])
-    ]
-    current_df["owner"] = current_df["action_category"].map(OWNER_MAP).fillna("RCM analyst review")
-    current_df["evidence_checklist"] = current_df["action_category"].map(EVIDENCE_MAP).fillna(EVIDENCE_MAP["OTHER_ACTION"])
     current_df["priority_component"] = current_df["denied_amount_proxy"] * current_df["preventability_weight"]
 
     summary_df = (
-        current_df.groupby("denial_bucket", as_index=False)
-        .agg(
-            denied_amount_sum=("denied_amount_proxy", "sum"),
-            denial_count=("claim_id", "size"),
-            priority_score=("priority_component", "sum"),
+        group_agg(
+            current_df,
+            ["denial_bucket"],
+            {
+                "denied_amount_sum": ("denied_amount_proxy", AMOUNT_SUM),
+                "denial_count": ("claim_id", "size"),
+                "priority_score": ("priority_component", PRIORITY_SUM),
+            },
+            backend,
         )
-        .sort_values(["priority_score", "denied_amount_sum", "denial_bucket"], ascending=[False, False, True], kind="mergesort")
-        .head(args.summary_limit)
+        .pipe(top_k_rows, SUMMARY_ORDER, summary_limit)
         .reset_index(drop=True)
     )
     total_priority = float(summary_df["priority_score"].sum()) if not summary_df.empty else 0.0
@@ -709,28 +665,38 @@ def main() -> int:
         ]
     ].copy()
 
+    # Owner and evidence follow from the action category, so patterns group on three categorical codes and the
+    # owner/evidence text is attached per pattern afterwards.
     pattern_grouped = (
-        current_df.groupby(["denial_bucket", "pattern_text", "action_category", "owner", "evidence_checklist"], as_index=False)
-        .agg(
-            denied_amount_sum=("denied_amount_proxy", "sum"),
-            denial_count=("claim_id", "size"),
-            avg_denied=("denied_amount_proxy", "mean"),
+        group_agg(
+            current_df,
+            ["denial_bucket", "pattern_text", "action_category"],
+            {
+                "denied_amount_sum": ("denied_amount_proxy", AMOUNT_SUM),
+                "denial_count": ("claim_id", "size"),
+                "avg_denied": ("denied_amount_proxy", AMOUNT_MEAN),
+            },
+            backend,
         )
         .sort_values(["denial_bucket", "denied_amount_sum", "pattern_text"], ascending=[True, False, True], kind="mergesort")
         .reset_index(drop=True)
     )
 
-    bucket_totals = pattern_grouped.groupby("denial_bucket", as_index=False).agg(bucket_total=("denied_amount_sum", "sum"))
-    pattern_grouped = pattern_grouped.merge(bucket_totals, on="denial_bucket", how="left")
+    action = pattern_grouped["action_category"]
+    pattern_grouped.insert(3, "owner", _map_categories(action, OWNER_MAP, "RCM analyst review"))
+    pattern_grouped.insert(4, "evidence_checklist", _map_categories(action, EVIDENCE_MAP, EVIDENCE_MAP["OTHER_ACTION"]))
+    pattern_grouped["action_category"] = action.astype(object)
+
+    bucket_totals = group_agg(pattern_grouped, ["denial_bucket"], {"bucket_total": ("denied_amount_sum", AMOUNT_SUM)})
+    pattern_grouped["bucket_total"] = _by_bucket(pattern_grouped["denial_bucket"], bucket_totals, "bucket_total")
     pattern_grouped["share_within_bucket"] = pattern_grouped["denied_amount_sum"] / pattern_grouped["bucket_total"].replace(0, pd.NA)
     pattern_grouped["share_within_bucket"] = pd.to_numeric(
         pattern_grouped["share_within_bucket"], errors="coerce"
     ).fillna(0.0)
 
-    rank_map = summary_out[["denial_bucket", "rank"]].copy()
-    pattern_grouped = pattern_grouped.merge(rank_map, on="denial_bucket", how="left")
+    pattern_grouped["rank"] = _by_bucket(pattern_grouped["denial_bucket"], summary_out, "rank")
     pattern_grouped = pattern_grouped.sort_values(["rank", "denied_amount_sum", "pattern_text"], ascending=[True, False, True], kind="mergesort")
-    patterns_top = pattern_grouped.groupby("denial_bucket", as_index=False, group_keys=False).head(args.patterns_per_bucket).copy()
+    patterns_top = pattern_grouped.groupby("denial_bucket", as_index=False, observed=True, group_keys=False).head(patterns_per_bucket).copy()
     patterns_top = patterns_top.sort_values(["rank", "denied_amount_sum", "pattern_text"], ascending=[True, False, True], kind="mergesort")
     patterns_out = patterns_top[
         [
@@ -744,7 +710,235 @@ def main() -> int:
             "share_within_bucket",
             "evidence_checklist",
         ]
-    ].reset_index(drop=True)
+    ].astype({"pattern_text": str}).reset_index(drop=True)
+    return summary_out, pattern_grouped, patterns_out
+
+
+def _map_categories(values: pd.Series, mapping: dict[str, str], default: str) -> np.ndarray:
+    """mapping applied once per category and spread by code, instead of one dict lookup per row."""
+    mapped = np.array([mapping.get(category, default) for category in values.cat.categories] + [default], dtype=object)
+    return mapped[values.cat.codes.to_numpy()]
+
+
+def _by_bucket(buckets: pd.Series, per_bucket: pd.DataFrame, column: str) -> np.ndarray:
+    """per_bucket[column] looked up by each categorical bucket's code (a left merge without hashing keys)."""
+    values = per_bucket.set_index("denial_bucket")[column].reindex(buckets.cat.categories)
+    out = np.append(values.to_numpy(dtype=float), np.nan)[buckets.cat.codes.to_numpy()]
+    return out.astype(per_bucket[column].dtype) if not np.isnan(out).any() else out
+
+
+TICKET_CANDIDATE_COLUMNS = [
+    "denial_bucket",
+    "pattern_text",
+    "action_category",
+    "owner",
+    "denied_amount_sum",
+    "denial_count",
+    "share_within_bucket",
+    "evidence_checklist",
+]
+
+
+def _ticket_candidates(pattern_grouped: pd.DataFrame) -> pd.DataFrame:
+    return pattern_grouped[TICKET_CANDIDATE_COLUMNS].copy()
+
+
+def _itemset_candidates(itemsets: pd.DataFrame, itemset_buckets: pd.DataFrame, current_df: pd.DataFrame) -> pd.DataFrame:
+    """Closed recurring itemsets seen this week, one candidate ticket per (denial bucket, itemset), shaped like _ticket_candidates."""
+    closed = itemsets.loc[itemsets["closed"] == "Y", ["itemset", "action"]]
+    out = itemset_buckets.merge(closed, on="itemset").rename(columns={"itemset": "pattern_text"})
+    if out.empty:
+        return pd.DataFrame(columns=TICKET_CANDIDATE_COLUMNS)
+    out["action_category"] = _assign_action_categories(out["action"].str.lower(), out["pattern_text"]).astype(object)
+    out["owner"] = out["action_category"].map(OWNER_MAP).fillna("RCM analyst review")
+    out["evidence_checklist"] = out["action_category"].map(EVIDENCE_MAP).fillna(EVIDENCE_MAP["OTHER_ACTION"])
+    bucket_totals = group_agg(current_df, ["denial_bucket"], {"bucket_total": ("denied_amount_proxy", AMOUNT_SUM)})
+    out["share_within_bucket"] = out["denied_amount_sum"] / _by_bucket(out["denial_bucket"], bucket_totals, "bucket_total")
+    out["share_within_bucket"] = out["share_within_bucket"].replace([np.inf, -np.inf], np.nan).fillna(0.0)
+    return _ticket_candidates(out)
+
+
+PATTERN_CLUSTER_COLUMNS = [
+    "denial_bucket",
+    "cluster_id",
+    "cluster_pattern_text",
+    "pattern_text",
+    "action_category",
+    "denied_amount_sum",
+    "denial_count",
+]
+
+
+def _clustered_candidates(
+    pattern_grouped: pd.DataFrame, clustering: tuple[float, int, int], backend: str = "pandas"
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Ticket candidates rolled up per (denial bucket, near-duplicate pattern cluster), plus members of merged clusters.
+
+    Each cluster ticket carries its largest member's text and action; amounts and counts are cluster totals. Every
+    member's signature agrees with that text's on at least the threshold share of rows.
+    """
+    threshold, perms, bands = clustering
+    codes = pattern_grouped["pattern_text"].cat.codes.to_numpy()
+    observed, inverse = np.unique(codes, return_inverse=True)
+    labels, signatures = cluster_texts(pattern_grouped["pattern_text"].cat.categories.take(observed).tolist(), threshold, perms, bands)
+    head_order = ["denied_amount_sum", "denial_count", "pattern_text"]
+    head_ascending = [False, False, True]
+    grouped = pattern_grouped.assign(cluster_label=labels[inverse], text_index=inverse, position=np.arange(len(pattern_grouped)))
+    raw_keys = ["denial_bucket", "cluster_label"]
+    heads = grouped.sort_values([*raw_keys, *head_order], ascending=[True, True, *head_ascending], kind="mergesort").drop_duplicates(raw_keys)
+    head_index = grouped.join(heads.set_index(raw_keys)["text_index"].rename("head_index"), on=raw_keys)["head_index"].to_numpy()
+    # Union-find chains links across bands; a member too far from the ticket's text leaves as its own cluster.
+    far = np.zeros(len(grouped), dtype=bool)
+    others = np.flatnonzero(head_index != inverse)
+    far[others] = signature_agreement(signatures, inverse[others], head_index[others]) < threshold
+    cluster_labels = np.where(far, len(observed) + inverse, labels[inverse])
+    grouped = grouped.drop(columns=["cluster_label", "text_index"]).assign(cluster_id=np.unique(cluster_labels, return_inverse=True)[1] + 1)
+    keys = ["denial_bucket", "cluster_id"]
+    totals = group_agg(
+        grouped,
+        keys,
+        {
+            "denied_amount_sum": ("denied_amount_sum", AMOUNT_SUM),
+            "denial_count": ("denial_count", "sum"),
+            "cluster_patterns": ("pattern_text", "size"),
+        },
+        backend,
+    )
+    heads = grouped.sort_values([*keys, *head_order], ascending=[True, True, *head_ascending], kind="mergesort").drop_duplicates(keys)
+    # Candidates keep pattern_grouped's order, so a run with nothing merged builds exactly the unclustered ticket pack.
+    out = heads.drop(columns=["denied_amount_sum", "denial_count"]).merge(totals, on=keys).sort_values("position", kind="mergesort")
+    out["share_within_bucket"] = pd.to_numeric(out["denied_amount_sum"] / out["bucket_total"].replace(0, pd.NA), errors="coerce").fillna(0.0)
+
+    merged = out.loc[out["cluster_patterns"] > 1, [*keys, "pattern_text"]].rename(columns={"pattern_text": "cluster_pattern_text"})
+    members = grouped.merge(merged, on=keys).sort_values(
+        [*keys, "denied_amount_sum", "pattern_text"], ascending=[True, True, False, True], kind="mergesort"
+    )
+    members = members[PATTERN_CLUSTER_COLUMNS].astype({"pattern_text": str, "cluster_pattern_text": str}).reset_index(drop=True)
+    return _ticket_candidates(out), members
+
+
+def _render_backfill_week(week: WeekSlice, week_dir: Path, options: dict[str, Any]) -> list[Path]:
+    summary_out, pattern_grouped, patterns_out = _build_pattern_tables(
+        week.current, options["summary_limit"], options["patterns_per_bucket"], backend=options["compute_backend"]
+    )
+    written = []
+    candidates = _ticket_candidates(pattern_grouped)
+    if options["clustering"]:
+        candidates, members = _clustered_candidates(pattern_grouped, options["clustering"], options["compute_backend"])
+        clusters_path = week_dir / "denials_rci_pattern_clusters_v1.csv"
+        members.to_csv(clusters_path, index=False)
+        written.append(clusters_path)
+    ticket_df = _build_ticket_pack(candidates, options["ticket_pack_size"])
+    summary_path = week_dir / "denials_rci_summary_v1.csv"
+    patterns_path = week_dir / "denials_rci_patterns_v1.csv"
+    tickets_path = week_dir / "denials_rci_tickets_v1.csv"
+    ticket_md_path = week_dir / "denials_rci_ticket_pack_v1.md"
+    summary_out.to_csv(summary_path, index=False)
+    patterns_out.to_csv(patterns_path, index=False)
+    ticket_df.to_csv(tickets_path, index=False)
+    ticket_md_path.write_text(
+        _ticket_pack_markdown(options["source_fqn"], date.fromisoformat(week.week_key), ticket_df), encoding="utf-8"
+    )
+    return [summary_path, patterns_path, tickets_path, ticket_md_path, *written]
+
+
+def parse_args() -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Generate Denials Root Cause Intelligence (RCI) brief from dbt BigQuery mart.")
+    p.add_argument("--project", default="rcm-flagship")
+    p.add_argument("--dataset", default="rcm")
+    p.add_argument("--relation", default="mart_workqueue_claims")
+    p.add_argument("--out", default="exports")
+    p.add_argument("--workqueue-size", type=int, default=200)
+    p.add_argument("--summary-limit", type=int, default=50)
+    p.add_argument("--patterns-per-bucket", type=int, default=5)
+    p.add_argument("--ticket-pack-size", type=int, default=10)
+    p.add_argument("--lookback-days", type=int, default=14)
+    p.add_argument("--as-of-date", default="", help="Optional YYYY-MM-DD anchor")
+    p.add_argument(
+        "--classify-workers",
+        type=int,
+        default=1,
+        help="Processes for action-category classification; only used when distinct action/pattern pairs are numerous.",
+    )
+    p.add_argument("--dry-run-sql", action="store_true")
+    p.add_argument("--determinism-check", action="store_true")
+    add_backfill_args(p)
+    add_compute_args(p)
+    add_engine_args(p)
+    add_cache_args(p)
+    add_itemset_args(p)
+    add_cluster_args(p)
+    return p.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    source_fqn = f"{args.project}.{args.dataset}.{args.relation}"
+    anchor_date = date.fromisoformat(args.as_of_date) if args.as_of_date else date.today()
+
+    detail_sql = DETAIL_SQL.format(source_fqn=source_fqn)
+
+    if args.dry_run_sql:
+        print(f"RCI_SOURCE={source_fqn}")
+        print("-- ANCHOR_SCRIPT (runs ahead of DETAIL_SQL, in the same job) --")
+        print(anchor_script(source_fqn))
+        print("-- DETAIL_SQL --")
+        print(detail_sql)
+        return 0
+
+    if args.mine_itemsets and args.backfill_weeks:
+        raise RuntimeError("--mine-itemsets mines the whole lookback for the current week's ticket pack; drop --backfill-weeks.")
+
+    clustering = (args.cluster_threshold, args.minhash_perms, args.lsh_bands) if args.cluster_patterns else None
+
+    engine = with_cache(make_engine(args, source_fqn), args)
+    lookback_days = backfill_lookback_days(args.backfill_weeks, args.lookback_days) if args.backfill_weeks else args.lookback_days
+    params = [
+        QueryParam("anchor_date", "DATE", anchor_date.isoformat()),
+        QueryParam("lookback_days", "INT64", lookback_days),
+    ]
+    if args.estimate_cost or args.max_bytes_billed:
+        for line in check_scan_budget(engine, anchor_estimates([(detail_sql, params)], source_fqn, anchor_date), args.max_bytes_billed):
+            print(line)
+        if args.estimate_cost:
+            return 0
+    detail_sql = anchored(detail_sql, source_fqn)
+
+    detail_df = _run_query(engine, detail_sql, params)
+    if detail_df.empty:
+        raise RuntimeError("No denied rows returned for selected window.")
+    min_aging_days = int(detail_df.pop("min_aging_days").iloc[0])
+
+    detail_df = compact_detail(detail_df)
+    detail_df["pattern_text"] = intern_text(detail_df["pattern_text"])
+    if args.backfill_weeks:
+        backfill_dir = Path(args.out) / "backfill" / "rci"
+        written, skipped = run_backfill(
+            _render_backfill_week,
+            week_slices(detail_df, args.backfill_weeks),
+            backfill_dir,
+            {
+                "source_fqn": source_fqn,
+                "summary_limit": args.summary_limit,
+                "patterns_per_bucket": args.patterns_per_bucket,
+                "ticket_pack_size": args.ticket_pack_size,
+                "compute_backend": args.compute_backend,
+                "clustering": clustering,
+            },
+            args.backfill_workers,
+        )
+        print(f"RCI_SOURCE={source_fqn}")
+        for line in [*engine_summary_lines(engine), *backfill_summary_lines(backfill_dir, written, skipped)]:
+            print(line)
+        return 0
+
+    current_week_id = int(detail_df["dataset_week_id"].max())
+    current_week = week_start(current_week_id)
+    current_df = detail_df[detail_df["dataset_week_id"] == current_week_id]
+
+    summary_out, pattern_grouped, patterns_out = _build_pattern_tables(
+        current_df, args.summary_limit, args.patterns_per_bucket, args.classify_workers, args.compute_backend
+    )
 
     top_bucket_names = ", ".join(summary_out.head(2)["denial_bucket"].tolist()) if not summary_out.empty else "NONE"
     top2_share = float(summary_out.head(2)["share"].sum()) if not summary_out.empty else 0.0
@@ -840,19 +1034,19 @@ def main() -> int:
 
     markdown = "\n".join(md_lines).strip() + "\n"
 
-    ticket_candidates = pattern_grouped[
-        [
-            "denial_bucket",
-            "pattern_text",
-            "action_category",
-            "owner",
-            "denied_amount_sum",
-            "denial_count",
-            "share_within_bucket",
-            "evidence_checklist",
+    candidates = _ticket_candidates(pattern_grouped)
+    cluster_members = None
+    cluster_lines: list[str] = []
+    if clustering:
+        started = time.perf_counter()
+        candidates, cluster_members = _clustered_candidates(pattern_grouped, clustering, args.compute_backend)
+        cluster_lines = [
+            f"PATTERNS_DISTINCT={pattern_grouped['pattern_text'].nunique()}",
+            f"PATTERN_CLUSTERS_MERGED={cluster_members['cluster_id'].nunique()}",
+            f"PATTERNS_IN_MERGED_CLUSTERS={cluster_members['pattern_text'].nunique()}",
+            f"CLUSTER_SECONDS={time.perf_counter() - started:.3f}",
         ]
-    ].copy()
-    ticket_df = _build_ticket_pack(ticket_candidates).head(args.ticket_pack_size).reset_index(drop=True)
+    ticket_df = _build_ticket_pack(candidates, args.ticket_pack_size)
     ticket_markdown = _ticket_pack_markdown(source_fqn, current_week, ticket_df)
     ticket_visual_html = _build_ticket_pack_visual_html(ticket_df)
     ticket_body_html = _markdown_to_html(ticket_markdown)
@@ -868,6 +1062,42 @@ def main() -> int:
     docs_dir = Path("docs")
     docs_dir.mkdir(parents=True, exist_ok=True)
 
+    if cluster_members is not None:
+        clusters_path = out_dir / "denials_rci_pattern_clusters_v1.csv"
+        cluster_members.to_csv(clusters_path, index=False)
+        cluster_lines.append(f"WROTE={clusters_path}")
+
+    itemset_lines: list[str] = []
+    if args.mine_itemsets:
+        started = time.perf_counter()
+        itemsets_df, itemset_buckets, frequent_items = mine_itemsets(
+            detail_df,
+            "denied_amount_proxy",
+            current_week_id,
+            args.itemset_min_support,
+            args.itemset_min_weeks,
+            args.itemset_min_size,
+            args.compute_backend,
+        )
+        recurring_df = _build_ticket_pack(
+            _itemset_candidates(itemsets_df, itemset_buckets, current_df), args.ticket_pack_size
+        )
+        itemsets_path = out_dir / "denials_rci_itemsets_v1.csv"
+        recurring_path = out_dir / "denials_rci_recurring_tickets_v1.csv"
+        itemsets_df.to_csv(itemsets_path, index=False)
+        recurring_df.to_csv(recurring_path, index=False)
+        itemset_lines = [
+            f"ITEMSET_ROWS={len(detail_df)}",
+            f"ITEMSET_WEEKS={detail_df['dataset_week_id'].nunique()}",
+            f"ITEMSET_FREQUENT_ITEMS={frequent_items}",
+            f"ITEMSETS_FOUND={len(itemsets_df)}",
+            f"ITEMSETS_CLOSED={int((itemsets_df['closed'] == 'Y').sum())}",
+            f"ITEMSET_TICKETS={len(recurring_df)}",
+            f"ITEMSET_SECONDS={time.perf_counter() - started:.3f}",
+            f"WROTE={itemsets_path}",
+            f"WROTE={recurring_path}",
+        ]
+
     summary_path = out_dir / "denials_rci_summary_v1.csv"
     patterns_path = out_dir / "denials_rci_patterns_v1.csv"
     tickets_path = out_dir / "denials_rci_tickets_v1.csv"
@@ -902,6 +1132,9 @@ def main() -> int:
             raise RuntimeError("Determinism check failed: HTML hash mismatch.")
 
     print(f"RCI_SOURCE={source_fqn}")
+    for line in engine_summary_lines(engine):
+        print(line)
+    print(f"MIN_AGING_DAYS={min_aging_days}")
     print(f"RCI_WEEK_KEY={pd.to_datetime(current_week).strftime('%Y-%m-%d')}")
     print(f"RCI_TOP_BUCKETS={top_bucket_names}")
     print(f"RCI_TOP_PATTERNS_WRITTEN={len(patterns_out)}")
@@ -912,6 +1145,8 @@ def main() -> int:
     print(f"WROTE={html_path}")
     print(f"WROTE={ticket_md_path}")
     print(f"WROTE={ticket_html_path}")
+    for line in [*cluster_lines, *itemset_lines]:
+        print(line)
     return 0
 
 
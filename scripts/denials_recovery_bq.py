@@ -7,27 +7,41 @@ import re
 from datetime import date
 from html import escape
 from pathlib import Path
+from typing import Any
 
+import numpy as np
 import pandas as pd
-from google.cloud import bigquery
 
-
-MIN_AGING_SQL = """
-SELECT
-  MIN(CAST(COALESCE(aging_days, 0) AS INT64)) AS min_aging_days
-FROM `{source_fqn}`
-WHERE
-  COALESCE(p_denial, 0.0) > 0
-  OR COALESCE(top_denial_prcsg, '') != ''
-  OR COALESCE(top_denial_group, 'UNSPECIFIED') != 'UNSPECIFIED'
-  OR COALESCE(denied_potential_allowed_proxy_amt, 0.0) > 0
-"""
+from denials_anchor import anchor_estimates, anchor_script, anchored
+from denials_backfill import WeekSlice, add_backfill_args, backfill_lookback_days, backfill_summary_lines, run_backfill, week_slices
+from denials_cache import add_cache_args, with_cache
+from denials_classify import BUCKET_CLASSIFIER, DENIAL_BUCKET_SQL
+from denials_compute import add_compute_args, group_agg
+from denials_engine import (
+    QueryEngine,
+    QueryParam,
+    add_engine_args,
+    check_scan_budget,
+    engine_summary_lines,
+    iter_frames,
+    make_engine,
+    query_frames,
+)
+from denials_frame import compact_detail, week_id, week_labels, week_start
+from denials_money import AMOUNT_DECIMALS, AMOUNT_MEAN, AMOUNT_SUM, RECOVERY_PRIORITY_DECIMALS, RECOVERY_PRIORITY_SUM, fixed_total
+from denials_pushdown import decode_exact_sums, grouped_sql, rollup_level, rollup_min_aging_days, rollup_sql, rollup_weeks, top_k_sql
+from denials_spill import add_spill_args, make_top_k
+from denials_stability import backfill_trend, trend_summary_lines
+from denials_stream import GroupedTotals, StreamRollup, TopK
+from denials_topk import top_k_rows
+from denials_whatif import WeightFactor, add_whatif_args, run_whatif
 
 
-DETAIL_SQL = """
+DETAIL_SQL = f"""
 WITH base AS (
   SELECT
     CAST(clm_id AS STRING) AS claim_id,
+    anchor_min_aging_days AS min_aging_days,
     DATE_SUB(@anchor_date, INTERVAL CAST(COALESCE(aging_days, 0) AS INT64) DAY) AS service_date,
     DATE_TRUNC(
       DATE_SUB(@anchor_date, INTERVAL CAST(COALESCE(aging_days, 0) AS INT64) DAY),
@@ -49,8 +63,9 @@ WITH base AS (
     COALESCE(top_next_best_action, '') AS top_next_best_action,
     COALESCE(denied_potential_allowed_proxy_amt, 0.0) AS denied_amount_proxy,
     COALESCE(p_denial, 0.0) AS p_denial
-  FROM `{source_fqn}`
-  WHERE CAST(COALESCE(aging_days, 0) AS INT64) BETWEEN @min_aging_days AND (@min_aging_days + @lookback_days)
+  FROM `{{source_fqn}}`
+  -- Constant bounds prune partitions; undated rows stay in, as they did under the aging_days window.
+  WHERE min_svc_dt BETWEEN DATE_SUB(anchor_max_svc_dt, INTERVAL @lookback_days DAY) AND anchor_max_svc_dt OR min_svc_dt IS NULL
 ),
 denied AS (
   SELECT
@@ -66,14 +81,7 @@ denied AS (
 bucketed AS (
   SELECT
     *,
-    CASE
-      WHEN REGEXP_CONTAINS(denial_reason_text, r'auth|authorization|precert|elig|eligibility|coverage|member') THEN 'AUTH_ELIG'
-      WHEN REGEXP_CONTAINS(denial_reason_text, r'coding|modifier|dx|icd|cpt|documentation|medical record|bundl') THEN 'CODING_DOC'
-      WHEN REGEXP_CONTAINS(denial_reason_text, r'timely|filing|limit|late') THEN 'TIMELY_FILING'
-      WHEN REGEXP_CONTAINS(denial_reason_text, r'duplicate|dup') THEN 'DUPLICATE'
-      WHEN REGEXP_CONTAINS(denial_reason_text, r'contract|noncovered|non-covered|bundled per contract|write off') THEN 'CONTRACTUAL'
-      ELSE 'OTHER_PROXY'
-    END AS denial_bucket
+    {DENIAL_BUCKET_SQL} AS denial_bucket
   FROM denied
   WHERE denial_flag
 ),
@@ -95,6 +103,7 @@ scored AS (
 )
 SELECT
   claim_id,
+  min_aging_days,
   service_date,
   dataset_week_key,
   aging_days,
@@ -108,6 +117,55 @@ FROM scored
 ORDER BY dataset_week_key DESC, recovery_priority_score DESC, claim_id
 """
 
+ROLLUP_MEASURES = {
+    "denied_amount_sum": ("denied_amount_proxy", AMOUNT_SUM),
+    "denial_count": ("*", "count"),
+    "recoverability_weight": ("recoverability_weight", "max"),
+    "priority_score": ("recovery_priority_score", RECOVERY_PRIORITY_SUM),
+}
+AGING_BAND_SQL = """CASE
+    WHEN aging_days BETWEEN 0 AND 30 THEN '<=30'
+    WHEN aging_days BETWEEN 31 AND 60 THEN '31-60'
+    WHEN aging_days BETWEEN 61 AND 90 THEN '61-90'
+    WHEN aging_days BETWEEN 91 AND 10000 THEN '>90'
+  END"""
+AGING_BAND_MEASURES = {
+    "denial_count": ("*", "count"),
+    "denied_amount_sum": ("denied_amount_proxy", AMOUNT_SUM),
+    "priority_score_sum": ("recovery_priority_score", RECOVERY_PRIORITY_SUM),
+}
+WORKQUEUE_ORDER_SQL = "recovery_priority_score DESC, denied_amount_proxy DESC, claim_id"
+STREAM_MEASURES = {
+    "denied_amount_sum": ("denied_amount_proxy", AMOUNT_SUM),
+    "denial_count": ("claim_id", "size"),
+    "recoverability_weight": ("recoverability_weight", "max"),
+    "priority_score": ("recovery_priority_score", RECOVERY_PRIORITY_SUM),
+}
+STREAM_AGING_BAND_MEASURES = {
+    "denial_count": ("claim_id", "size"),
+    "denied_amount_sum": ("denied_amount_proxy", AMOUNT_SUM),
+    "priority_score_sum": ("recovery_priority_score", RECOVERY_PRIORITY_SUM),
+}
+SUMMARY_AGGS = {
+    "denied_amount_sum": ("denied_amount_proxy", AMOUNT_SUM),
+    "denial_count": ("claim_id", "size"),
+    "recoverability_weight": ("recoverability_weight", "max"),
+    "priority_score": ("recovery_priority_score", RECOVERY_PRIORITY_SUM),
+}
+AGING_BAND_AGGS = {
+    "denial_count": ("claim_id", "size"),
+    "denied_amount_sum": ("denied_amount_proxy", AMOUNT_SUM),
+    "priority_score_sum": ("recovery_priority_score", RECOVERY_PRIORITY_SUM),
+}
+WORKQUEUE_ORDER = (("recovery_priority_score", False), ("denied_amount_proxy", False), ("claim_id", True))
+# time_weight bands of DETAIL_SQL (upper aging_days bound -> what-if profile column); the last band is open-ended.
+TIME_WEIGHT_BANDS = {30: "time_le_30", 60: "time_31_60", 90: "time_61_90", None: "time_gt_90"}
+WHATIF_FACTORS = [
+    WeightFactor("denial_bucket", "recoverability_weight", {bucket: bucket for bucket in BUCKET_CLASSIFIER.labels}),
+    WeightFactor("time_band", "time_weight", {column: column for column in TIME_WEIGHT_BANDS.values()}),
+]
+SUMMARY_ORDER = (("priority_score", False), ("denied_amount_sum", False), ("denial_bucket", True), ("denial_reason", True))
+
 
 OWNER_MAP = {
     "AUTH_ELIG": "Eligibility/Auth team",
@@ -855,37 +913,108 @@ def _build_brief_markdown(
     return "\n".join(lines).strip() + "\n"
 
 
-def _build_aging_bands(df_current: pd.DataFrame) -> pd.DataFrame:
+def _build_summary(current_df: pd.DataFrame, summary_limit: int, backend: str = "pandas") -> pd.DataFrame:
+    grouped = group_agg(current_df, ["denial_bucket", "denial_reason"], SUMMARY_AGGS, backend)
+    return _rank_summary(grouped, summary_limit)
+
+
+def _rank_summary(grouped: pd.DataFrame, summary_limit: int) -> pd.DataFrame:
+    summary_df = (
+        top_k_rows(
+            grouped.assign(avg_denied_amount=grouped["denied_amount_sum"] / grouped["denial_count"]),
+            SUMMARY_ORDER,
+            summary_limit,
+        )
+        .reset_index(drop=True)
+    )
+    summary_df["payer_dim_status"] = "MISSING_IN_MART"
+    return summary_df[
+        [
+            "denial_bucket",
+            "denial_reason",
+            "denied_amount_sum",
+            "denial_count",
+            "avg_denied_amount",
+            "recoverability_weight",
+            "priority_score",
+            "payer_dim_status",
+        ]
+    ]
+
+
+def _build_workqueue(current_df: pd.DataFrame, workqueue_size: int) -> pd.DataFrame:
+    workqueue_df = top_k_rows(current_df, WORKQUEUE_ORDER, workqueue_size).copy()
+    workqueue_df["owner"] = workqueue_df["denial_bucket"].astype(str).map(OWNER_MAP).fillna("RCM analyst review")
+    workqueue_df["next_action"] = workqueue_df["denial_bucket"].astype(str).map(NEXT_ACTION_MAP).fillna("Manual triage")
+    workqueue_df["evidence_needed"] = workqueue_df["denial_bucket"].astype(str).map(EVIDENCE_MAP).fillna("Manual evidence collection")
+    workqueue_df["payer_dim_status"] = "MISSING_IN_MART"
+    workqueue_df["dataset_week_key"] = week_labels(workqueue_df["dataset_week_id"])
+    workqueue_df["service_date"] = workqueue_df["service_date"].dt.strftime("%Y-%m-%d")
+    workqueue_df = workqueue_df.rename(
+        columns={
+            "denied_amount_proxy": "denied_amount",
+        }
+    )
+    return workqueue_df[
+        [
+            "claim_id",
+            "dataset_week_key",
+            "service_date",
+            "denial_reason",
+            "denial_bucket",
+            "aging_days",
+            "denied_amount",
+            "recoverability_weight",
+            "time_weight",
+            "recovery_priority_score",
+            "owner",
+            "next_action",
+            "evidence_needed",
+            "payer_dim_status",
+        ]
+    ]
+
+
+def _time_bands(df: pd.DataFrame) -> pd.DataFrame:
+    """Adds time_band, the TIME_WEIGHT_BANDS column each row's time_weight came from."""
+    bounds = [bound for bound in TIME_WEIGHT_BANDS if bound is not None]
+    labels = np.array(list(TIME_WEIGHT_BANDS.values()))
+    return df.assign(time_band=labels[np.searchsorted(bounds, df["aging_days"].to_numpy(), side="left")])
+
+
+def _aging_band_labels(aging_days: pd.Series) -> pd.Series:
+    return pd.cut(aging_days, bins=[-1, 30, 60, 90, 10_000], labels=["<=30", "31-60", "61-90", ">90"])
+
+
+def _build_aging_bands(df_current: pd.DataFrame, backend: str = "pandas") -> pd.DataFrame:
     if df_current.empty:
         return pd.DataFrame(
             columns=["aging_band", "denial_count", "denied_amount_sum", "priority_score_sum", "priority_share"]
         )
-    bands = pd.cut(
-        df_current["aging_days"],
-        bins=[-1, 30, 60, 90, 10_000],
-        labels=["<=30", "31-60", "61-90", ">90"],
-    )
-    grouped = (
-        df_current.assign(aging_band=bands)
-        .groupby("aging_band", observed=True, as_index=False)
-        .agg(
-            denial_count=("claim_id", "size"),
-            denied_amount_sum=("denied_amount_proxy", "sum"),
-            priority_score_sum=("recovery_priority_score", "sum"),
-        )
+    grouped = group_agg(
+        df_current.assign(aging_band=_aging_band_labels(df_current["aging_days"])), ["aging_band"], AGING_BAND_AGGS, backend
     )
-    total = float(grouped["priority_score_sum"].sum())
-    grouped["priority_share"] = grouped["priority_score_sum"] / total if total > 0 else 0.0
+    return _aging_bands_from_groups(grouped)
+
+
+def _aging_bands_from_groups(grouped: pd.DataFrame) -> pd.DataFrame:
     order = {"<=30": 0, "31-60": 1, "61-90": 2, ">90": 3}
+    grouped = grouped[["aging_band", "denial_count", "denied_amount_sum", "priority_score_sum"]].copy()
     grouped["order"] = grouped["aging_band"].astype(str).map(order).fillna(99)
     grouped = grouped.sort_values(["order", "aging_band"]).drop(columns=["order"]).reset_index(drop=True)
+    total = float(grouped["priority_score_sum"].sum())
+    grouped["priority_share"] = grouped["priority_score_sum"] / total if total > 0 else 0.0
     return grouped
 
 
-def _compute_stability(current_df: pd.DataFrame, prior_df: pd.DataFrame) -> tuple[pd.DataFrame, int]:
-    current = current_df.groupby("denial_bucket", as_index=False).agg(current_priority_score=("recovery_priority_score", "sum"))
-    prior = prior_df.groupby("denial_bucket", as_index=False).agg(prior_priority_score=("recovery_priority_score", "sum"))
-    merged = current.merge(prior, on="denial_bucket", how="outer").fillna(0.0)
+def _compute_stability(current_df: pd.DataFrame, prior_df: pd.DataFrame, backend: str = "pandas") -> tuple[pd.DataFrame, int]:
+    current = group_agg(current_df, ["denial_bucket"], {"current_priority_score": ("recovery_priority_score", RECOVERY_PRIORITY_SUM)}, backend)
+    prior = group_agg(prior_df, ["denial_bucket"], {"prior_priority_score": ("recovery_priority_score", RECOVERY_PRIORITY_SUM)}, backend)
+    return _stability_from_totals(current, prior)
+
+
+def _stability_from_totals(current: pd.DataFrame, prior: pd.DataFrame) -> tuple[pd.DataFrame, int]:
+    merged = current.merge(prior, on="denial_bucket", how="outer").fillna({"current_priority_score": 0.0, "prior_priority_score": 0.0})
 
     current_total = float(merged["current_priority_score"].sum())
     prior_total = float(merged["prior_priority_score"].sum())
@@ -989,8 +1118,8 @@ def _build_outcomes_export(
     resolved_mask = matched["is_resolved"] & resolved_within_window.fillna(False)
     false_positive_mask = resolved_mask & (~recovered_mask)
 
-    matched_denied_sum = float(matched["denied_amount"].sum()) if not matched.empty else 0.0
-    realized_sum = float(matched.loc[recovered_mask, "realized_recovery_amt"].sum()) if not matched.empty else 0.0
+    matched_denied_sum = fixed_total(matched["denied_amount"], AMOUNT_DECIMALS)
+    realized_sum = fixed_total(matched.loc[recovered_mask, "realized_recovery_amt"], AMOUNT_DECIMALS)
     resolved_rate = (float(resolved_mask.mean()) if len(matched) > 0 else 0.0)
     false_positive_rate = (float(false_positive_mask.mean()) if len(matched) > 0 else 0.0)
     recovery_realized_rate = (realized_sum / matched_denied_sum) if matched_denied_sum > 0 else 0.0
@@ -1043,13 +1172,18 @@ def _build_outcomes_export(
 def _build_opportunity_sizing(
     workqueue_out: pd.DataFrame,
     outcomes_export: pd.DataFrame | None,
+    backend: str = "pandas",
 ) -> pd.DataFrame:
     base = (
-        workqueue_out.groupby("denial_bucket", as_index=False)
-        .agg(
-            workqueue_denied_sum=("denied_amount", "sum"),
-            workqueue_count=("claim_id", "size"),
-            avg_denied=("denied_amount", "mean"),
+        group_agg(
+            workqueue_out,
+            ["denial_bucket"],
+            {
+                "workqueue_denied_sum": ("denied_amount", AMOUNT_SUM),
+                "workqueue_count": ("claim_id", "size"),
+                "avg_denied": ("denied_amount", AMOUNT_MEAN),
+            },
+            backend,
         )
         .sort_values(["workqueue_denied_sum", "denial_bucket"], ascending=[False, True])
         .reset_index(drop=True)
@@ -1081,11 +1215,15 @@ def _build_opportunity_sizing(
     ).fillna(0.0)
 
     by_bucket = (
-        matched.groupby("denial_bucket", as_index=False)
-        .agg(
-            resolved_rate=("is_resolved_bool", "mean"),
-            recovered_rate=("is_recovered_bool", "mean"),
-            avg_realized_recovery_amt=("realized_recovery_amt", "mean"),
+        group_agg(
+            matched,
+            ["denial_bucket"],
+            {
+                "resolved_rate": ("is_resolved_bool", "mean"),
+                "recovered_rate": ("is_recovered_bool", "mean"),
+                "avg_realized_recovery_amt": ("realized_recovery_amt", AMOUNT_MEAN),
+            },
+            backend,
         )
         .sort_values(["denial_bucket"], ascending=[True])
         .reset_index(drop=True)
@@ -1130,11 +1268,50 @@ def _parse_touch_minutes_by_bucket(raw: str) -> dict[str, float]:
     return clean
 
 
+def _pushdown_rollup_sql(detail_query: str) -> str:
+    return rollup_sql(detail_query, ROLLUP_MEASURES, week_expr="dataset_week_key", windowed=False)
+
+
+def _pushdown_top_k_sql(detail_query: str) -> str:
+    return top_k_sql(detail_query, WORKQUEUE_ORDER_SQL, week_expr="dataset_week_key", windowed=False)
+
+
+def _pushdown_aging_bands_sql(detail_query: str) -> str:
+    return grouped_sql(detail_query, {"aging_band": AGING_BAND_SQL}, AGING_BAND_MEASURES, week_expr="dataset_week_key", windowed=False)
+
+
+def _stream_aggregates(
+    engine: QueryEngine, detail_query: str, params: list[QueryParam], top: TopK
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    rollup = StreamRollup(STREAM_MEASURES, WORKQUEUE_ORDER, top.k, top)
+    bands = GroupedTotals(["dataset_week_start", "aging_band"], STREAM_AGING_BAND_MEASURES)
+    try:
+        for batch_df in iter_frames(engine, detail_query, params):
+            rollup.add(batch_df)
+            bands.add(batch_df.assign(dataset_week_start=batch_df["dataset_week_key"], aging_band=_aging_band_labels(batch_df["aging_days"])))
+        return rollup.rollup_frame(), rollup.top_k_frame(), bands.frame()
+    finally:
+        top.cleanup()
+
+
 def _write_csv(df: pd.DataFrame, path: Path) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     df.to_csv(path, index=False)
 
 
+def _render_backfill_week(week: WeekSlice, week_dir: Path, options: dict[str, Any]) -> list[Path]:
+    stability_df, _ = _compute_stability(week.current, week.prior, options["compute_backend"])
+    outputs = {
+        "denials_recovery_summary_v1.csv": _build_summary(week.current, options["summary_limit"], options["compute_backend"]),
+        "denials_recovery_workqueue_v1.csv": _build_workqueue(week.current, options["workqueue_size"]),
+        "denials_recovery_aging_bands_v1.csv": _build_aging_bands(week.current, options["compute_backend"]),
+        "denials_recovery_stability_v1.csv": stability_df,
+    }
+    for name, df in outputs.items():
+        _write_csv(df, week_dir / name)
+    return [week_dir / name for name in outputs]
+
+
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Generate denials recovery brief outputs from BigQuery dbt mart.")
     parser.add_argument("--project", default="rcm-flagship")
@@ -1157,10 +1334,27 @@ def parse_args() -> argparse.Namespace:
     )
     parser.add_argument("--weekly-touch-budget-minutes", type=float, default=600.0, help="Weekly touch budget in minutes.")
     parser.add_argument("--dry-run-sql", action="store_true", help="Print SQL statements only; do not execute.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--pushdown",
+        action="store_true",
+        help="Aggregate summary/stability/aging bands in SQL and fetch only the top workqueue rows per week.",
+    )
+    mode.add_argument(
+        "--stream",
+        action="store_true",
+        help="Aggregate DETAIL_SQL pages as they arrive instead of holding the full detail frame.",
+    )
     parser.add_argument("--write-html", dest="write_html", action="store_true")
     parser.add_argument("--no-write-html", dest="write_html", action="store_false")
     parser.add_argument("--determinism-check", action="store_true", help="Write public HTML twice and compare SHA256.")
     parser.set_defaults(write_html=True)
+    add_backfill_args(parser)
+    add_spill_args(parser)
+    add_compute_args(parser)
+    add_whatif_args(parser)
+    add_engine_args(parser)
+    add_cache_args(parser)
     return parser.parse_args()
 
 
@@ -1172,109 +1366,129 @@ def main() -> int:
 
     if args.dry_run_sql:
         print(f"SOURCE={source_fqn}")
-        print("\n-- MIN_AGING_SQL --")
-        print(MIN_AGING_SQL.format(source_fqn=source_fqn))
-        print("\n-- DETAIL_SQL --")
-        print(DETAIL_SQL.format(source_fqn=source_fqn))
+        print("\n-- ANCHOR_SCRIPT (runs ahead of each query below, in the same job) --")
+        print(anchor_script(source_fqn))
+        if args.pushdown:
+            detail_query = DETAIL_SQL.format(source_fqn=source_fqn)
+            print("\n-- ROLLUP_SQL --")
+            print(_pushdown_rollup_sql(detail_query))
+            print("\n-- AGING_BANDS_SQL --")
+            print(_pushdown_aging_bands_sql(detail_query))
+            print("\n-- WORKQUEUE_TOP_K_SQL --")
+            print(_pushdown_top_k_sql(detail_query))
+        else:
+            print("\n-- DETAIL_SQL --")
+            print(DETAIL_SQL.format(source_fqn=source_fqn))
         return 0
 
-    client = bigquery.Client(project=args.project)
+    if args.backfill_weeks and (args.pushdown or args.stream):
+        raise RuntimeError("--backfill-weeks reads the detail rows; drop --pushdown/--stream.")
+    if args.weight_profiles and (args.pushdown or args.stream or args.backfill_weeks):
+        raise RuntimeError("--weight-profiles scores the current week's detail rows; drop --pushdown/--stream/--backfill-weeks.")
 
-    min_aging_query = MIN_AGING_SQL.format(source_fqn=source_fqn)
-    min_df = client.query(min_aging_query).result().to_dataframe()
-    min_aging_days = int(min_df.iloc[0]["min_aging_days"]) if not min_df.empty and pd.notna(min_df.iloc[0]["min_aging_days"]) else 0
+    engine = with_cache(make_engine(args, source_fqn), args)
 
     detail_query = DETAIL_SQL.format(source_fqn=source_fqn)
-    params = bigquery.QueryJobConfig(
-        query_parameters=[
-            bigquery.ScalarQueryParameter("anchor_date", "DATE", anchor_date.isoformat()),
-            bigquery.ScalarQueryParameter("min_aging_days", "INT64", min_aging_days),
-            bigquery.ScalarQueryParameter("lookback_days", "INT64", args.lookback_days),
+    lookback_days = backfill_lookback_days(args.backfill_weeks, args.lookback_days) if args.backfill_weeks else args.lookback_days
+    params = [
+        QueryParam("anchor_date", "DATE", anchor_date.isoformat()),
+        QueryParam("lookback_days", "INT64", lookback_days),
+    ]
+    if args.pushdown:
+        queries = [
+            (_pushdown_rollup_sql(detail_query), params),
+            (_pushdown_top_k_sql(detail_query), [*params, QueryParam("workqueue_size", "INT64", args.workqueue_size)]),
+            (_pushdown_aging_bands_sql(detail_query), params),
         ]
-    )
-    detail_df = client.query(detail_query, job_config=params).result().to_dataframe()
-    if detail_df.empty:
-        raise RuntimeError("No denied rows found for the configured window.")
+    else:
+        queries = [(detail_query, params)]
+    if args.estimate_cost or args.max_bytes_billed:
+        for line in check_scan_budget(engine, anchor_estimates(queries, source_fqn, anchor_date), args.max_bytes_billed):
+            print(line)
+        if args.estimate_cost:
+            return 0
+    queries = [(anchored(sql, source_fqn), query_params) for sql, query_params in queries]
+    detail_query = anchored(detail_query, source_fqn)
+
+    if args.backfill_weeks:
+        (detail_df,) = query_frames(engine, queries)
+        if detail_df.empty:
+            raise RuntimeError("No denied rows found for the configured window.")
+        detail_df = compact_detail(detail_df.drop(columns="min_aging_days"))
+        backfill_dir = Path(args.out) / "backfill" / "recovery"
+        trend_df = backfill_trend(detail_df, "recovery_priority_score", args.backfill_weeks, how=RECOVERY_PRIORITY_SUM)
+        written, skipped = run_backfill(
+            _render_backfill_week,
+            week_slices(detail_df, args.backfill_weeks),
+            backfill_dir,
+            {"summary_limit": args.summary_limit, "workqueue_size": args.workqueue_size, "compute_backend": args.compute_backend},
+            args.backfill_workers,
+        )
+        trend_path = backfill_dir / "denials_stability_trend_v1.csv"
+        trend_df.to_csv(trend_path, index=False)
+        print(f"SOURCE={source_fqn}")
+        for line in [*engine_summary_lines(engine), *backfill_summary_lines(backfill_dir, written, skipped), *trend_summary_lines(trend_df)]:
+            print(line)
+        print(f"WROTE={trend_path}")
+        return 0
 
-    detail_df["dataset_week_key"] = pd.to_datetime(detail_df["dataset_week_key"]).dt.date
-    detail_df["service_date"] = pd.to_datetime(detail_df["service_date"]).dt.date
+    spill_lines: list[str] = []
+    if args.pushdown or args.stream:
+        if args.pushdown:
+            rollup_df, top_df, bands_df = query_frames(engine, queries)
+            rollup_df = decode_exact_sums(rollup_df, ROLLUP_MEASURES)
+            bands_df = decode_exact_sums(bands_df, AGING_BAND_MEASURES)
+        else:
+            top_k = make_top_k(args, WORKQUEUE_ORDER, args.workqueue_size)
+            rollup_df, top_df, bands_df = _stream_aggregates(engine, detail_query, params, top_k)
+            spill_lines = top_k.summary_lines()
+        if rollup_df.empty or int(rollup_df["detail_rows"].max()) == 0:
+            raise RuntimeError("No denied rows found for the configured window.")
+        min_aging_days = rollup_min_aging_days(rollup_df)
+        week_keys = [wk.date() for wk in rollup_weeks(rollup_df, "detail_rows")]
+    else:
+        (detail_df,) = query_frames(engine, queries)
+        if detail_df.empty:
+            raise RuntimeError("No denied rows found for the configured window.")
+        min_aging_days = int(detail_df.pop("min_aging_days").iloc[0])
 
-    week_keys = sorted(detail_df["dataset_week_key"].unique())
+        detail_df = compact_detail(detail_df)
+        week_keys = [week_start(wk) for wk in np.unique(detail_df["dataset_week_id"])]
     current_dataset_week_key = week_keys[-1]
     prior_dataset_week_key = week_keys[-2] if len(week_keys) > 1 else None
     anchor_mode = "AS_OF_DATE_FILTERED" if args.as_of_date else "DATASET_MAX_WEEK"
 
-    current_df = detail_df[detail_df["dataset_week_key"] == current_dataset_week_key].copy()
-    prior_df = (
-        detail_df[detail_df["dataset_week_key"] == prior_dataset_week_key].copy()
-        if prior_dataset_week_key is not None
-        else detail_df.iloc[0:0].copy()
-    )
+    if args.pushdown or args.stream:
+        current_week = pd.Timestamp(current_dataset_week_key)
+        summary_out = _rank_summary(rollup_level(rollup_df, current_week, 2), args.summary_limit)
 
-    summary_df = (
-        current_df.groupby(["denial_bucket", "denial_reason"], as_index=False)
-        .agg(
-            denied_amount_sum=("denied_amount_proxy", "sum"),
-            denial_count=("claim_id", "size"),
-            avg_denied_amount=("denied_amount_proxy", "mean"),
-            recoverability_weight=("recoverability_weight", "max"),
-            priority_score=("recovery_priority_score", "sum"),
+        top_df = compact_detail(top_df)
+        workqueue_out = _build_workqueue(top_df[top_df["dataset_week_id"] == week_id(current_dataset_week_key)], args.workqueue_size)
+
+        aging_df = _aging_bands_from_groups(
+            bands_df[(bands_df["dataset_week_start"] == current_week) & bands_df["aging_band"].notna()]
         )
-        .sort_values(["priority_score", "denied_amount_sum", "denial_bucket", "denial_reason"], ascending=[False, False, True, True])
-        .head(args.summary_limit)
-        .reset_index(drop=True)
-    )
-    summary_df["payer_dim_status"] = "MISSING_IN_MART"
-    summary_out = summary_df[
-        [
-            "denial_bucket",
-            "denial_reason",
-            "denied_amount_sum",
-            "denial_count",
-            "avg_denied_amount",
-            "recoverability_weight",
-            "priority_score",
-            "payer_dim_status",
-        ]
-    ]
 
-    workqueue_df = (
-        current_df.sort_values(
-            ["recovery_priority_score", "denied_amount_proxy", "claim_id"],
-            ascending=[False, False, True],
+        current_totals = rollup_level(rollup_df, current_week, 1)
+        prior_totals = (
+            rollup_level(rollup_df, pd.Timestamp(prior_dataset_week_key), 1) if prior_dataset_week_key is not None else current_totals.head(0)
         )
-        .head(args.workqueue_size)
-        .copy()
-    )
-    workqueue_df["owner"] = workqueue_df["denial_bucket"].map(OWNER_MAP).fillna("RCM analyst review")
-    workqueue_df["next_action"] = workqueue_df["denial_bucket"].map(NEXT_ACTION_MAP).fillna("Manual triage")
-    workqueue_df["evidence_needed"] = workqueue_df["denial_bucket"].map(EVIDENCE_MAP).fillna("Manual evidence collection")
-    workqueue_df["payer_dim_status"] = "MISSING_IN_MART"
-    workqueue_df["dataset_week_key"] = workqueue_df["dataset_week_key"].astype(str)
-    workqueue_df["service_date"] = workqueue_df["service_date"].astype(str)
-    workqueue_df = workqueue_df.rename(
-        columns={
-            "denied_amount_proxy": "denied_amount",
-        }
-    )
-    workqueue_out = workqueue_df[
-        [
-            "claim_id",
-            "dataset_week_key",
-            "service_date",
-            "denial_reason",
-            "denial_bucket",
-            "aging_days",
-            "denied_amount",
-            "recoverability_weight",
-            "time_weight",
-            "recovery_priority_score",
-            "owner",
-            "next_action",
-            "evidence_needed",
-            "payer_dim_status",
-        ]
-    ]
+        stability_df, top2_overlap = _stability_from_totals(
+            current_totals[["denial_bucket", "priority_score"]].rename(columns={"priority_score": "current_priority_score"}),
+            prior_totals[["denial_bucket", "priority_score"]].rename(columns={"priority_score": "prior_priority_score"}),
+        )
+    else:
+        current_df = detail_df[detail_df["dataset_week_id"] == week_id(current_dataset_week_key)].copy()
+        prior_df = (
+            detail_df[detail_df["dataset_week_id"] == week_id(prior_dataset_week_key)].copy()
+            if prior_dataset_week_key is not None
+            else detail_df.iloc[0:0].copy()
+        )
+
+        summary_out = _build_summary(current_df, args.summary_limit, args.compute_backend)
+        workqueue_out = _build_workqueue(current_df, args.workqueue_size)
+        aging_df = _build_aging_bands(current_df, args.compute_backend)
+        stability_df, top2_overlap = _compute_stability(current_df, prior_df, args.compute_backend)
 
     out_dir = Path(args.out)
     docs_dir = Path("docs")
@@ -1289,22 +1503,24 @@ def main() -> int:
     opportunity_sizing_path = out_dir / "denials_recovery_opportunity_sizing_v1.csv"
     teaching_html_path = private_dir / "denials_recovery_defense_simulator.html"
 
-    aging_df = _build_aging_bands(current_df)
-    stability_df, top2_overlap = _compute_stability(current_df, prior_df)
-
     _write_csv(summary_out, summary_path)
     _write_csv(workqueue_out, workqueue_path)
     _write_csv(aging_df, aging_path)
     _write_csv(stability_df, stability_path)
+    whatif_lines = (
+        run_whatif(_time_bands(current_df), "denied_amount_proxy", WHATIF_FACTORS, args.weight_profiles, args.workqueue_size, out_dir, "denials_recovery")
+        if args.weight_profiles
+        else []
+    )
 
     current_key_str = _dataset_week_from_value(current_dataset_week_key)
     prior_key_str = _dataset_week_from_value(prior_dataset_week_key) if prior_dataset_week_key else "NONE"
     top2_buckets = set(summary_out.head(2)["denial_bucket"].tolist())
     top2_rows = summary_out.head(2).copy()
-    current_total_denied_amount_sum = float(summary_out["denied_amount_sum"].sum()) if not summary_out.empty else 0.0
-    current_total_priority_score_sum = float(summary_out["priority_score"].sum()) if not summary_out.empty else 0.0
-    top2_priority_sum = float(top2_rows["priority_score"].sum()) if not top2_rows.empty else 0.0
-    top2_denied_sum = float(top2_rows["denied_amount_sum"].sum()) if not top2_rows.empty else 0.0
+    current_total_denied_amount_sum = fixed_total(summary_out["denied_amount_sum"], AMOUNT_DECIMALS)
+    current_total_priority_score_sum = fixed_total(summary_out["priority_score"], RECOVERY_PRIORITY_DECIMALS)
+    top2_priority_sum = fixed_total(top2_rows["priority_score"], RECOVERY_PRIORITY_DECIMALS)
+    top2_denied_sum = fixed_total(top2_rows["denied_amount_sum"], AMOUNT_DECIMALS)
     top2_priority_share_pct = (top2_priority_sum / current_total_priority_score_sum * 100.0) if current_total_priority_score_sum > 0 else 0.0
     top2_denied_amount_share_pct = (top2_denied_sum / current_total_denied_amount_sum * 100.0) if current_total_denied_amount_sum > 0 else 0.0
     top2_bucket_names = ", ".join(top2_rows["denial_bucket"].astype(str).tolist()) if not top2_rows.empty else "NONE"
@@ -1343,7 +1559,7 @@ def main() -> int:
             print(f"OUTCOMES_WARNING=File not found: {outcomes_csv_path}")
 
     touch_map = _parse_touch_minutes_by_bucket(args.touch_minutes_by_bucket)
-    touch_series = workqueue_out["denial_bucket"].map(lambda b: touch_map.get(str(b), float(args.touch_minutes_default)))
+    touch_series = workqueue_out["denial_bucket"].astype(str).map(lambda b: touch_map.get(b, float(args.touch_minutes_default)))
     effective_touch_minutes = float(touch_series.mean()) if len(touch_series) > 0 else float(args.touch_minutes_default)
     weekly_touch_budget_minutes = float(args.weekly_touch_budget_minutes)
     expected_touches = weekly_touch_budget_minutes / effective_touch_minutes if effective_touch_minutes > 0 else 0.0
@@ -1379,7 +1595,7 @@ def main() -> int:
         "has_outcomes": has_outcomes,
     }
 
-    opportunity_sizing_df = _build_opportunity_sizing(workqueue_out, outcomes_export)
+    opportunity_sizing_df = _build_opportunity_sizing(workqueue_out, outcomes_export, args.compute_backend)
     _write_csv(opportunity_sizing_df, opportunity_sizing_path)
 
     markdown = _build_brief_markdown(
@@ -1398,7 +1614,7 @@ def main() -> int:
     )
 
     shares_df = (
-        summary_out.groupby("denial_bucket", as_index=False)["priority_score"].sum().sort_values(["priority_score", "denial_bucket"], ascending=[False, True])
+        summary_out.groupby("denial_bucket", as_index=False, observed=True)["priority_score"].sum().sort_values(["priority_score", "denial_bucket"], ascending=[False, True])
     )
     total_share = float(shares_df["priority_score"].sum())
     shares: list[tuple[str, float]] = []
@@ -1458,6 +1674,9 @@ def main() -> int:
                 raise RuntimeError("Determinism check failed: HTML SHA mismatch.")
 
     print(f"SOURCE={source_fqn}")
+    for line in [*engine_summary_lines(engine), *spill_lines]:
+        print(line)
+    print(f"MIN_AGING_DAYS={min_aging_days}")
     print(f"ANCHOR_MODE={anchor_mode}")
     print(f"CURRENT_DATASET_WEEK_KEY={current_key_str}")
     print(f"PRIOR_DATASET_WEEK_KEY={prior_key_str}")
@@ -1506,6 +1725,8 @@ def main() -> int:
     if args.write_html:
         print(f"WROTE={brief_html_path}")
     print(f"WROTE={teaching_html_path}")
+    for line in whatif_lines:
+        print(line)
     print(f"PRIVATE_ARTIFACT_PATH={(Path(args.out) / 'private' / 'denials_recovery_defense_simulator.html').as_posix()}")
     print("PRIVATE_ARTIFACT_TRACKED=FALSE")
 
@@ -0,0 +1,110 @@
+"""Prevention scenario cube: every (summary row, prevention rate, ramp curve, week) evaluated in one broadcast product.
+
+The cube is tidy (one row per cell) so briefs and tables take slices of it instead of recomputing scenarios.
+"""
+
+from __future__ import annotations
+
+import argparse
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+
+RAMPS = ("step", "linear", "smooth")
+DEFAULT_RATES = "0.1,0.2,0.3"
+
+
+def add_scenario_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--scenario-rates",
+        default=DEFAULT_RATES,
+        help="Prevention rates for the scenario cube: comma list (0.1,0.2) or start:stop:count (0.01:1:100).",
+    )
+    parser.add_argument(
+        "--scenario-brief-rates",
+        default=DEFAULT_RATES,
+        help="Rates shown in the brief's scenario table (added to the cube if missing).",
+    )
+    parser.add_argument("--scenario-weeks", type=int, default=1, help="Weeks of the scenario horizon.")
+    parser.add_argument(
+        "--scenario-ramp",
+        nargs="+",
+        choices=RAMPS,
+        default=["step"],
+        help="Adoption curves: step (full rate from week 1), linear or smooth (smoothstep) over --scenario-ramp-weeks.",
+    )
+    parser.add_argument("--scenario-ramp-weeks", type=int, default=4, help="Weeks a linear/smooth ramp takes to reach the full rate.")
+
+
+def parse_rates(text: str) -> np.ndarray:
+    if ":" in text:
+        parts = text.split(":")
+        if len(parts) != 3:
+            raise RuntimeError(f"Scenario rate range must be start:stop:count, got {text!r}.")
+        rates = np.linspace(float(parts[0]), float(parts[1]), int(parts[2]))
+    else:
+        rates = np.array([float(part) for part in text.split(",") if part.strip()], dtype=float)
+    if not len(rates) or not np.isfinite(rates).all() or (rates < 0).any() or (rates > 1).any():
+        raise RuntimeError(f"Scenario rates must be fractions in [0, 1], got {text!r}.")
+    _, first = np.unique(rates, return_index=True)
+    return rates[np.sort(first)]
+
+
+def merge_rates(rates: np.ndarray, extra: np.ndarray) -> np.ndarray:
+    """rates plus any of extra not already present (to within float noise), in the original order."""
+    missing = [rate for rate in extra if not np.isclose(rates, rate, rtol=0, atol=1e-12).any()]
+    return np.concatenate([rates, missing]) if missing else rates
+
+
+def ramp_curves(ramps: Sequence[str], weeks: int, ramp_weeks: int) -> np.ndarray:
+    """ramps x weeks share of the full prevention rate reached in each week (week 1 first)."""
+    progress = np.clip(np.arange(1, weeks + 1) / max(ramp_weeks, 1), 0.0, 1.0)
+    shapes = {
+        "step": np.ones(weeks),
+        "linear": progress,
+        "smooth": progress * progress * (3.0 - 2.0 * progress),
+    }
+    return np.stack([shapes[ramp] for ramp in ramps]) if ramps else np.empty((0, weeks))
+
+
+def scenario_cube(
+    units: pd.DataFrame,
+    exposure: str,
+    rates: np.ndarray,
+    weeks: int = 1,
+    ramps: Sequence[str] = ("step",),
+    ramp_weeks: int = 4,
+) -> pd.DataFrame:
+    """units' columns repeated per (rate, ramp, week) cell; prevented = exposure x rate x ramp factor, plus running total."""
+    if weeks < 1:
+        raise RuntimeError("--scenario-weeks must be at least 1.")
+    curves = ramp_curves(ramps, weeks, ramp_weeks)
+    base = units[exposure].to_numpy(dtype=float)
+    prevented = base[:, None, None, None] * rates[None, :, None, None] * curves[None, None, :, :]
+    shape = prevented.shape
+    cube = units.iloc[np.arange(len(units)).repeat(np.prod(shape[1:], dtype=int))].reset_index(drop=True)
+    cube["prevention_rate"] = np.broadcast_to(rates[None, :, None, None], shape).ravel()
+    cube["ramp"] = np.broadcast_to(np.asarray(ramps, dtype=object)[None, None, :, None], shape).ravel()
+    cube["week"] = np.broadcast_to(np.arange(1, weeks + 1)[None, None, None, :], shape).ravel()
+    cube["ramp_factor"] = np.broadcast_to(curves[None, None, :, :], shape).ravel()
+    cube["prevented_amount"] = prevented.ravel()
+    cube["cumulative_prevented_amount"] = np.cumsum(prevented, axis=3).ravel()
+    return cube
+
+
+def rate_column(rate: float) -> str:
+    return f"prevent_{rate * 100:g}"
+
+
+def scenario_slice(
+    cube: pd.DataFrame, keys: Sequence[str], exposure: str, rates: np.ndarray, week: int = 1, ramp: str = "step"
+) -> pd.DataFrame:
+    """One row per unit in cube order, with prevent_<pct> columns for rates at (week, ramp); no recomputation."""
+    cells = cube[(cube["week"] == week) & (cube["ramp"] == ramp)]
+    out = cells.drop_duplicates(list(keys))[[*keys, exposure]].reset_index(drop=True)
+    for rate in rates:
+        picked = cells[np.isclose(cells["prevention_rate"].to_numpy(), rate, rtol=0, atol=1e-12)]
+        out[rate_column(rate)] = picked["prevented_amount"].to_numpy()
+    return out
@@ -0,0 +1,144 @@
+"""Out-of-core top-K ranking: buffered rows are sorted into Arrow IPC runs on disk and k-way merged on the sort key."""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import tempfile
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from denials_stream import TopK
+
+
+SEQ_COLUMN = "_spill_seq"
+# Rows per record batch in a run file; the merge holds one decoded batch per run.
+RUN_BATCH_ROWS = 8192
+
+
+def add_spill_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--spill-mb",
+        type=int,
+        default=0,
+        help="Cap streamed workqueue ranking at this many MiB of buffered rows, spilling sorted runs to disk (0 keeps it in memory).",
+    )
+    parser.add_argument("--spill-dir", default=None, help="Directory for spilled runs (system temp dir if unset).")
+
+
+def make_top_k(args: argparse.Namespace, order: Sequence[tuple[str, bool]], k: int, partition: str = "service_date") -> TopK:
+    if args.spill_mb > 0:
+        return SpilledTopK(k, order, partition, args.spill_mb, args.spill_dir)
+    return TopK(k, order, partition)
+
+
+def _sort_keys(df: pd.DataFrame, order: Sequence[tuple[str, bool]]) -> list[tuple[Any, ...]]:
+    """Tuples that compare like sort_values(order, na_position="last") followed by SEQ_COLUMN."""
+    parts: list[Iterable[Any]] = []
+    for column, ascending in order:
+        values = df[column]
+        missing = values.isna().to_numpy()
+        if ascending:
+            filled = values.astype(object).where(~missing, "").tolist()
+        else:
+            filled = (-values.to_numpy(dtype=float, na_value=0.0)).tolist()
+        parts.append(zip(missing.tolist(), filled))
+    parts.append(df[SEQ_COLUMN].tolist())
+    return list(zip(*parts))
+
+
+class SpilledTopK(TopK):
+    """Same rows as TopK, but candidates wait in a bounded buffer and are spilled as sorted runs instead of heaps.
+
+    Each run keeps at most k rows per partition (no run can hold more than k winners for one partition); frame() k-way
+    merges the runs and stops once every requested partition has k rows.
+    """
+
+    def __init__(
+        self, k: int, order: Sequence[tuple[str, bool]], partition: str, memory_mb: int, spill_dir: str | None = None
+    ) -> None:
+        super().__init__(k, order, partition)
+        self.memory_bytes = memory_mb * (1 << 20)
+        self.spill_dir = spill_dir
+        self.tmp: tempfile.TemporaryDirectory[str] | None = None
+        self.runs: list[Path] = []
+        self.seen: set[Any] = set()
+        self.buffer: list[pd.DataFrame] = []
+        self.buffer_bytes = 0
+        self.rows_spilled = 0
+        self.bytes_spilled = 0
+
+    def add(self, df: pd.DataFrame, first_seq: int) -> None:
+        if self.k <= 0 or df.empty:
+            return
+        self.seen.update(df[self.partition].dropna().unique().tolist())
+        batch = df.assign(**{SEQ_COLUMN: first_seq + df.index.to_numpy(dtype=np.int64)})
+        self.buffer.append(batch)
+        self.buffer_bytes += int(batch.memory_usage(deep=True).sum())
+        if self.buffer_bytes > self.memory_bytes:
+            self._spill()
+
+    def partitions(self) -> Iterable[Any]:
+        return self.seen
+
+    def _spill(self) -> None:
+        if not self.buffer:
+            return
+        columns = [column for column, _ in self.order] + [SEQ_COLUMN]
+        ascending = [asc for _, asc in self.order] + [True]
+        run = pd.concat(self.buffer, ignore_index=True)
+        self.buffer.clear()
+        self.buffer_bytes = 0
+        run = run.sort_values(columns, ascending=ascending, kind="mergesort").groupby(self.partition, sort=False).head(self.k)
+        if self.tmp is None:
+            self.tmp = tempfile.TemporaryDirectory(prefix="denials_spill_", dir=self.spill_dir)
+        path = Path(self.tmp.name) / f"run_{len(self.runs):05d}.arrow"
+        table = pa.Table.from_pandas(run, preserve_index=False)
+        with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=RUN_BATCH_ROWS)
+        self.runs.append(path)
+        self.rows_spilled += len(run)
+        self.bytes_spilled += path.stat().st_size
+
+    def _run_rows(self, path: Path) -> Iterator[tuple[tuple[Any, ...], dict[str, Any]]]:
+        with pa.OSFile(str(path), "rb") as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i).to_pandas()
+                yield from zip(_sort_keys(batch, self.order), batch.to_dict("records"))
+
+    def frame(self, partitions: Sequence[Any], columns: Sequence[str]) -> pd.DataFrame:
+        self._spill()
+        kept: dict[Any, list[dict[str, Any]]] = {p: [] for p in partitions}
+        open_partitions = len(kept) if self.k > 0 else 0
+        runs = [self._run_rows(path) for path in self.runs]
+        try:
+            # Keys end in the row sequence number, so they are unique and the merge never compares rows.
+            for _, row in heapq.merge(*runs):
+                if not open_partitions:
+                    break
+                rows = kept.get(row[self.partition])
+                if rows is not None and len(rows) < self.k:
+                    rows.append(row)
+                    open_partitions -= len(rows) == self.k
+        finally:
+            for run in runs:
+                run.close()
+        return pd.DataFrame([row for p in partitions for row in kept[p]], columns=list(columns))
+
+    def summary_lines(self) -> list[str]:
+        return [
+            f"SPILL_BUDGET_MB={self.memory_bytes >> 20}",
+            f"SPILL_RUNS={len(self.runs)}",
+            f"SPILL_ROWS={self.rows_spilled}",
+            f"SPILL_MB={self.bytes_spilled / (1 << 20):.1f}",
+        ]
+
+    def cleanup(self) -> None:
+        if self.tmp is not None:
+            self.tmp.cleanup()
+            self.tmp = None
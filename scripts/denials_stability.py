@@ -0,0 +1,107 @@
+"""Week x bucket priority matrix and rank stability for every adjacent week pair, computed in one vectorized pass."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from denials_compute import group_agg
+from denials_frame import week_key, week_labels
+
+
+TREND_COLUMNS = [
+    "dataset_week_key",
+    "prior_dataset_week_key",
+    "top2_overlap",
+    "rank_correlation",
+    "rank_changes",
+    "max_share_shift",
+    "leader_bucket",
+    "leader_share",
+]
+
+
+def weekly_bucket_totals(detail_df: pd.DataFrame, value: str, how: str = "fsum") -> pd.DataFrame:
+    """Exact per (dataset_week_key, denial_bucket) sums of value over compact detail rows; how is a group_agg sum."""
+    totals = group_agg(detail_df, ["dataset_week_id", "denial_bucket"], {value: (value, how)})
+    totals.insert(0, "dataset_week_key", week_labels(totals.pop("dataset_week_id")))
+    return totals
+
+
+def week_bucket_matrix(totals: pd.DataFrame, value: str) -> pd.DataFrame:
+    """Pivot (dataset_week_key, denial_bucket, value) rows into weeks x buckets, both sorted; missing cells are 0."""
+    keys = totals.assign(denial_bucket=totals["denial_bucket"].astype(str))
+    matrix = keys.set_index(["dataset_week_key", "denial_bucket"])[value].unstack(fill_value=0.0)
+    return matrix.sort_index().sort_index(axis=1).astype(float)
+
+
+def bucket_ranks(values: np.ndarray) -> np.ndarray:
+    """1-based rank per row, highest value first; ties go to the earlier column (buckets are sorted by name)."""
+    order = np.argsort(-values, axis=1, kind="stable")
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.broadcast_to(np.arange(1, values.shape[1] + 1), values.shape), axis=1)
+    return ranks
+
+
+def _spearman(current: np.ndarray, prior: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Row-wise rank correlation over masked buckets, re-ranked within the mask; NaN with fewer than two buckets."""
+    def rerank(ranks: np.ndarray) -> np.ndarray:
+        return ((ranks[:, None, :] <= ranks[:, :, None]) & mask[:, None, :]).sum(axis=2).astype(float)
+
+    x, y = rerank(current), rerank(prior)
+    n = mask.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dx = (x - (x * mask).sum(axis=1, keepdims=True) / n[:, None]) * mask
+        dy = (y - (y * mask).sum(axis=1, keepdims=True) / n[:, None]) * mask
+        corr = (dx * dy).sum(axis=1) / np.sqrt((dx * dx).sum(axis=1) * (dy * dy).sum(axis=1))
+    return np.where(n >= 2, corr, np.nan)
+
+
+def top_k_overlap(current: np.ndarray, prior: np.ndarray, k: int = 2) -> np.ndarray:
+    """Buckets in both weeks' top k, counting only buckets with a positive score; rows are week pairs."""
+    current_top = (current > 0) & (bucket_ranks(current) <= k)
+    prior_top = (prior > 0) & (bucket_ranks(prior) <= k)
+    return (current_top & prior_top).sum(axis=1)
+
+
+def stability_trend(matrix: pd.DataFrame) -> pd.DataFrame:
+    """One row per adjacent pair of matrix weeks: top-2 overlap, rank correlation, rank moves, share shift, leader."""
+    values = matrix.to_numpy(dtype=float)
+    if len(values) < 2:
+        return pd.DataFrame(columns=TREND_COLUMNS)
+    ranks = bucket_ranks(values)
+    totals = values.sum(axis=1, keepdims=True)
+    shares = np.divide(values, totals, out=np.zeros_like(values), where=totals > 0)
+    current, prior = slice(1, None), slice(None, -1)
+    active = (values[current] > 0) | (values[prior] > 0)
+    leader = np.argmin(ranks[current], axis=1)
+    return pd.DataFrame(
+        {
+            "dataset_week_key": matrix.index[current],
+            "prior_dataset_week_key": matrix.index[prior],
+            "top2_overlap": top_k_overlap(values[current], values[prior]),
+            "rank_correlation": _spearman(ranks[current], ranks[prior], active),
+            "rank_changes": ((ranks[current] != ranks[prior]) & active).sum(axis=1),
+            "max_share_shift": np.abs(shares[current] - shares[prior]).max(axis=1),
+            "leader_bucket": matrix.columns[leader],
+            "leader_share": shares[current][np.arange(len(leader)), leader],
+        }
+    )
+
+
+def backfill_trend(
+    detail_df: pd.DataFrame, value: str, weeks: int, last_week_id: int | None = None, how: str = "fsum"
+) -> pd.DataFrame:
+    """Trend rows for the latest `weeks` dataset weeks up to last_week_id, from one pass over the compact detail."""
+    totals = weekly_bucket_totals(detail_df, value, how)
+    if last_week_id is not None:
+        totals = totals[totals["dataset_week_key"] <= week_key(last_week_id)]
+    return stability_trend(week_bucket_matrix(totals, value)).tail(weeks).reset_index(drop=True)
+
+
+def trend_summary_lines(trend_df: pd.DataFrame) -> list[str]:
+    correlation = trend_df["rank_correlation"].dropna() if len(trend_df) else pd.Series(dtype=float)
+    return [
+        f"STABILITY_TREND_PAIRS={len(trend_df)}",
+        f"STABILITY_TREND_MEAN_RANK_CORRELATION={f'{correlation.mean():.4f}' if len(correlation) else 'NONE'}",
+    ]
@@ -0,0 +1,252 @@
+"""Single-pass aggregation over streamed query batches, shaped like the push-down rollup and top-K results."""
+
+from __future__ import annotations
+
+import heapq
+import math
+from typing import Any, Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+
+from denials_money import fixed_units, parse_fixed, units_to_float
+from denials_pushdown import ROLLUP_KEYS
+
+
+# measure name -> (source column, how); how is one of sum, size, count, first, min, max, or a fixed-point sum (fixed<d>).
+Measures = dict[str, tuple[str, str]]
+
+
+class ExactSum:
+    """Running float sum kept as non-overlapping partials, so value() equals math.fsum over every input."""
+
+    __slots__ = ("partials",)
+
+    def __init__(self) -> None:
+        self.partials: list[float] = []
+
+    def add_many(self, values: Iterable[float]) -> None:
+        partials = self.partials
+        for x in values:
+            i = 0
+            for y in partials:
+                if abs(x) < abs(y):
+                    x, y = y, x
+                hi = x + y
+                lo = y - (hi - x)
+                if lo:
+                    partials[i] = lo
+                    i += 1
+                x = hi
+            partials[i:] = [x]
+
+    def value(self) -> float:
+        return math.fsum(self.partials)
+
+
+def _initial(how: str) -> Any:
+    if how == "sum":
+        return ExactSum()
+    if how in ("size", "count"):
+        return 0
+    return None
+
+
+def _update(how: str, state: Any, values: np.ndarray, first_seq: int) -> Any:
+    if how == "sum":
+        state.add_many(values.tolist())
+        return state
+    fixed = parse_fixed(how)
+    if fixed:
+        return state if not len(values) else (state or 0) + int(fixed_units(values, fixed[0]).sum())
+    if how == "size":
+        return state + len(values)
+    present = values[pd.notna(values)]
+    if how == "count":
+        return state + len(present)
+    if not len(present):
+        return state
+    if how == "first":
+        return state if state is not None else (first_seq, present[0])
+    if how == "min":
+        value = present.min()
+        return value if state is None else min(state, value)
+    if how == "max":
+        value = present.max()
+        return value if state is None else max(state, value)
+    raise ValueError(f"Unsupported stream measure: {how}")
+
+
+def _merge(how: str, state: Any, other: Any) -> Any:
+    if how == "sum":
+        state.add_many(other.partials)
+        return state
+    if how in ("size", "count"):
+        return state + other
+    if other is None:
+        return state
+    if state is None:
+        return other
+    if parse_fixed(how):
+        return state + other
+    if how == "first":
+        return min(state, other, key=lambda item: item[0])
+    if how == "min":
+        return min(state, other)
+    return max(state, other)
+
+
+def _final(how: str, state: Any) -> Any:
+    if how == "sum":
+        return state.value() if state.partials else float("nan")
+    fixed = parse_fixed(how)
+    if fixed:
+        return units_to_float(state, fixed[0]) if state is not None else float("nan")
+    if how == "first":
+        return state[1] if state is not None else float("nan")
+    if state is None:
+        return float("nan")
+    return state
+
+
+class GroupedTotals:
+    """Per-group running totals over streamed frames; memory grows with the number of groups, not rows."""
+
+    def __init__(self, keys: Sequence[str], measures: Measures) -> None:
+        self.keys = list(keys)
+        self.measures = measures
+        self.groups: dict[tuple[Any, ...], list[Any]] = {}
+        self.rows_seen = 0
+
+    def add(self, df: pd.DataFrame) -> None:
+        if not df.empty:
+            columns = {column: df[column].to_numpy() for column, _ in self.measures.values()}
+            for key, idx in df.groupby(self.keys, observed=True, sort=False).indices.items():
+                key = key if isinstance(key, tuple) else (key,)
+                state = self.groups.get(key)
+                if state is None:
+                    state = self.groups[key] = [_initial(how) for _, how in self.measures.values()]
+                for i, (column, how) in enumerate(self.measures.values()):
+                    state[i] = _update(how, state[i], columns[column][idx], self.rows_seen + int(idx[0]))
+        self.rows_seen += len(df)
+
+    def frame(self) -> pd.DataFrame:
+        rows = [
+            [*key, *(_final(how, state[i]) for i, (_, how) in enumerate(self.measures.values()))]
+            for key, state in self.groups.items()
+        ]
+        return pd.DataFrame(rows, columns=[*self.keys, *self.measures])
+
+
+class _Ranked:
+    __slots__ = ("key", "row")
+
+    def __init__(self, key: tuple[Any, ...], row: dict[str, Any]) -> None:
+        self.key = key
+        self.row = row
+
+    def __lt__(self, other: _Ranked) -> bool:
+        # Inverted so the heap top is the worst kept row.
+        return self.key > other.key
+
+
+class TopK:
+    """Best k rows per partition under a pandas-style sort (descending columns must be numeric); ties keep stream order."""
+
+    def __init__(self, k: int, order: Sequence[tuple[str, bool]], partition: str) -> None:
+        self.k = k
+        self.order = list(order)
+        self.partition = partition
+        self.heaps: dict[Any, list[_Ranked]] = {}
+
+    def add(self, df: pd.DataFrame, first_seq: int) -> None:
+        if self.k <= 0 or df.empty:
+            return
+        columns = [column for column, _ in self.order]
+        ascending = [asc for _, asc in self.order]
+        candidates = df.sort_values(columns, ascending=ascending, kind="mergesort").groupby(self.partition, sort=False).head(self.k)
+        for pos, row in zip(candidates.index, candidates.to_dict("records")):
+            key = (*(row[c] if asc else -row[c] for c, asc in self.order), first_seq + int(pos))
+            entry = _Ranked(key, row)
+            heap = self.heaps.setdefault(row[self.partition], [])
+            if len(heap) < self.k:
+                heapq.heappush(heap, entry)
+            elif key < heap[0].key:
+                heapq.heapreplace(heap, entry)
+
+    def rows(self, partitions: Iterable[Any]) -> list[dict[str, Any]]:
+        return [entry.row for p in partitions for entry in sorted(self.heaps.get(p, []), key=lambda e: e.key)]
+
+    def partitions(self) -> Iterable[Any]:
+        return self.heaps.keys()
+
+    def frame(self, partitions: Sequence[Any], columns: Sequence[str]) -> pd.DataFrame:
+        return pd.DataFrame(self.rows(partitions), columns=list(columns))
+
+    def summary_lines(self) -> list[str]:
+        return []
+
+    def cleanup(self) -> None:
+        pass
+
+
+def _week_start(day: pd.Timestamp) -> pd.Timestamp:
+    return day - pd.Timedelta(days=day.weekday())
+
+
+class StreamRollup:
+    """Daily (service_date, bucket, reason) totals plus per-day top-K rows, folded into the rollup_sql/top_k_sql shapes."""
+
+    def __init__(self, measures: Measures, order: Sequence[tuple[str, bool]], k: int, top: TopK | None = None) -> None:
+        self.measures = measures
+        self.daily = GroupedTotals(["service_date", *ROLLUP_KEYS], {"detail_rows": ("service_date", "size"), **measures})
+        self.top = top if top is not None else TopK(k, order, "service_date")
+        self.columns: list[str] = []
+        self.min_aging_days: int | None = None
+
+    def add(self, df: pd.DataFrame) -> None:
+        if not self.columns:
+            self.columns = list(df.columns)
+        if self.min_aging_days is None and "min_aging_days" in df.columns and not df.empty:
+            self.min_aging_days = int(df["min_aging_days"].iloc[0])
+        self.top.add(df, self.daily.rows_seen)
+        self.daily.add(df)
+
+    def _window_start(self, lookback_days: int | None) -> pd.Timestamp | None:
+        if lookback_days is None or not self.daily.groups:
+            return None
+        return max(key[0] for key in self.daily.groups) - pd.Timedelta(days=lookback_days)
+
+    def rollup_frame(self, lookback_days: int | None = None) -> pd.DataFrame:
+        """Same columns and levels as rollup_sql(); measures cover days inside the lookback window (all days if None)."""
+        window_start = self._window_start(lookback_days)
+        hows = [how for _, how in self.measures.values()]
+        levels: dict[tuple[Any, ...], list[Any]] = {}
+        for (day, bucket, reason), (detail_rows, *state) in self.daily.groups.items():
+            in_window = window_start is None or day >= window_start
+            week = _week_start(day)
+            for key in ((week, bucket, reason), (week, bucket, None), (week, None, None), (None, None, None)):
+                level = levels.get(key)
+                if level is None:
+                    level = levels[key] = [0, 0, *(_initial(how) for how in hows)]
+                level[0] += detail_rows
+                if in_window:
+                    level[1] += detail_rows
+                    for i, how in enumerate(hows):
+                        level[2 + i] = _merge(how, level[2 + i], state[i])
+        rows = [
+            [*key, self.min_aging_days, detail_rows, window_rows, *(_final(how, s) for how, s in zip(hows, state))]
+            for key, (detail_rows, window_rows, *state) in levels.items()
+        ]
+        df = pd.DataFrame(
+            rows,
+            columns=["dataset_week_start", *ROLLUP_KEYS, "min_aging_days", "detail_rows", "window_rows", *self.measures],
+        )
+        df["dataset_week_start"] = pd.to_datetime(df["dataset_week_start"])
+        return df
+
+    def top_k_frame(self, lookback_days: int | None = None) -> pd.DataFrame:
+        """Kept rows from days inside the lookback window; at least the top k per week, like top_k_sql()."""
+        window_start = self._window_start(lookback_days)
+        days = sorted(day for day in self.top.partitions() if window_start is None or day >= window_start)
+        return self.top.frame(days, self.columns)
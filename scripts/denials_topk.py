@@ -0,0 +1,27 @@
+"""Top-K row selection shared by the denials brief scripts."""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+import pandas as pd
+
+
+def top_k_rows(df: pd.DataFrame, order: Sequence[tuple[str, bool]], k: int) -> pd.DataFrame:
+    """Same rows, order and index as df.sort_values(..., kind="mergesort").head(k), without sorting all of df.
+
+    order is [(column, ascending), ...]. When the leading column is numeric, a partition finds the k-th key and only
+    rows at or above it are stable-sorted; ties at the cut-off are all kept, so tie-breaking is unchanged.
+    """
+    columns = [column for column, _ in order]
+    ascending = [asc for _, asc in order]
+    lead, lead_ascending = order[0]
+    if 0 < k < len(df) and pd.api.types.is_numeric_dtype(df[lead]):
+        key = df[lead].to_numpy(dtype=float, na_value=np.nan)
+        if not lead_ascending:
+            key = -key
+        kth = np.partition(key, k - 1)[k - 1]
+        if not np.isnan(kth):
+            df = df[key <= kth]
+    return df.sort_values(columns, ascending=ascending, kind="mergesort").head(k)
@@ -2,21 +2,50 @@ from __future__ import annotations
 
 import argparse
 import hashlib
+import itertools
 import os
 import re
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator
 from html import escape
 from datetime import date
 
+import numpy as np
 import pandas as pd
-from google.cloud import bigquery
+import pyarrow as pa
+
+from denials_anchor import anchor_estimates, anchor_script, anchored
+from denials_backfill import WeekSlice, add_backfill_args, backfill_lookback_days, backfill_summary_lines, run_backfill, week_slices
+from denials_cache import add_cache_args, with_cache
+from denials_classify import BUCKET_CLASSIFIER, DENIAL_BUCKET_SQL
+from denials_compute import add_compute_args, group_agg
+from denials_forecast import add_forecast_args, bucket_outlook, detail_week_totals, rollup_week_totals, run_forecast
+from denials_engine import (
+    QueryEngine,
+    QueryParam,
+    add_engine_args,
+    check_scan_budget,
+    engine_summary_lines,
+    iter_frames,
+    make_engine,
+    query_frames,
+    to_frame,
+)
+from denials_frame import compact_detail, frame_mb, peak_rss_mb, week_id, week_key, week_labels
+from denials_money import AMOUNT_SUM, PRIORITY_DECIMALS, PRIORITY_SUM
+from denials_pushdown import decode_exact_sums, in_window, rollup_level, rollup_min_aging_days, rollup_sql, rollup_weeks, top_k_sql
+from denials_spill import add_spill_args, make_top_k
+from denials_stability import backfill_trend, stability_trend, top_k_overlap, trend_summary_lines, week_bucket_matrix, weekly_bucket_totals
+from denials_stream import StreamRollup, TopK
+from denials_topk import top_k_rows
+from denials_whatif import WeightFactor, add_whatif_args, run_whatif
 
 
-DETAIL_SQL = """
+DETAIL_SQL = f"""
 WITH base AS (
   SELECT
     CAST(clm_id AS STRING) AS claim_id,
+    anchor_min_aging_days AS min_aging_days,
     DATE_SUB(@as_of_date, INTERVAL CAST(COALESCE(aging_days, 0) AS INT64) DAY) AS service_date,
     COALESCE(top_denial_group, top_denial_prcsg, 'UNSPECIFIED') AS denial_reason_raw,
     LOWER(
@@ -32,8 +61,9 @@ WITH base AS (
     COALESCE(top_denial_prcsg, '') AS denial_code,
     COALESCE(denied_potential_allowed_proxy_amt, 0.0) AS denied_amount,
     COALESCE(p_denial, 0.0) AS p_denial
-  FROM `{source_fqn}`
-  WHERE CAST(COALESCE(aging_days, 0) AS INT64) BETWEEN @min_aging_days AND (@min_aging_days + @lookback_days)
+  FROM `{{source_fqn}}`
+  -- Constant bounds prune partitions; undated rows stay in, as they did under the aging_days window.
+  WHERE min_svc_dt BETWEEN DATE_SUB(anchor_max_svc_dt, INTERVAL @lookback_days DAY) AND anchor_max_svc_dt OR min_svc_dt IS NULL
 ),
 denied AS (
   SELECT
@@ -49,14 +79,7 @@ denied AS (
 bucketed AS (
   SELECT
     *,
-    CASE
-      WHEN REGEXP_CONTAINS(denial_reason_text, r'auth|authorization|precert|elig|eligibility|coverage|member') THEN 'AUTH_ELIG'
-      WHEN REGEXP_CONTAINS(denial_reason_text, r'coding|modifier|dx|icd|cpt|documentation|medical record|bundl') THEN 'CODING_DOC'
-      WHEN REGEXP_CONTAINS(denial_reason_text, r'timely|filing|limit|late') THEN 'TIMELY_FILING'
-      WHEN REGEXP_CONTAINS(denial_reason_text, r'duplicate|dup') THEN 'DUPLICATE'
-      WHEN REGEXP_CONTAINS(denial_reason_text, r'contract|noncovered|non-covered|bundled per contract|write off') THEN 'CONTRACTUAL'
-      ELSE 'OTHER_PROXY'
-    END AS denial_bucket
+    {DENIAL_BUCKET_SQL} AS denial_bucket
   FROM denied
   WHERE denial_flag
 ),
@@ -72,6 +95,7 @@ weighted AS (
 )
 SELECT
   claim_id,
+  min_aging_days,
   service_date,
   denial_reason_raw AS denial_reason,
   denial_bucket,
@@ -82,17 +106,33 @@ FROM weighted
 ORDER BY service_date DESC, row_priority DESC
 """
 
-
-MIN_AGING_SQL = """
-SELECT
-  MIN(CAST(COALESCE(aging_days, 0) AS INT64)) AS min_aging_days
-FROM `{source_fqn}`
-WHERE
-  COALESCE(p_denial, 0.0) > 0
-  OR COALESCE(top_denial_prcsg, '') != ''
-  OR COALESCE(top_denial_group, 'UNSPECIFIED') != 'UNSPECIFIED'
-  OR COALESCE(denied_potential_allowed_proxy_amt, 0.0) > 0
-"""
+ROLLUP_MEASURES = {
+    "denied_amount_sum": (in_window("denied_amount"), AMOUNT_SUM),
+    "denial_count": (in_window("claim_id"), "count"),
+    "preventability_weight": (in_window("preventability_weight"), "min"),
+    "priority_score": (in_window("row_priority"), PRIORITY_SUM),
+}
+WORKQUEUE_ORDER_SQL = "row_priority DESC, denied_amount DESC, claim_id"
+STREAM_MEASURES = {
+    "denied_amount_sum": ("denied_amount", AMOUNT_SUM),
+    "denial_count": ("claim_id", "count"),
+    "preventability_weight": ("preventability_weight", "first"),
+    "priority_score": ("row_priority", PRIORITY_SUM),
+}
+SUMMARY_AGGS = {
+    "denied_amount_sum": ("denied_amount", AMOUNT_SUM),
+    "denial_count": ("claim_id", "count"),
+    "preventability_weight": ("preventability_weight", "first"),
+    "priority_score": ("row_priority", PRIORITY_SUM),
+}
+WORKQUEUE_ORDER = (("row_priority", False), ("denied_amount", False), ("claim_id", True))
+WHATIF_FACTORS = [WeightFactor("denial_bucket", "preventability_weight", {bucket: bucket for bucket in BUCKET_CLASSIFIER.labels})]
+# Peak memory of the detail path as a multiple of the fetched pages: pages, the converted frame and its compact
+# copy overlap briefly.
+DETAIL_PEAK_FACTOR = 3
+# Adjacent week pairs shown in the brief; the trend CSV keeps all of them.
+TREND_BRIEF_PAIRS = 8
+SUMMARY_ORDER = (("priority_score", False), ("denied_amount_sum", False), ("denial_bucket", True), ("denial_reason", True))
 
 
 def _fmt_money(value: float) -> str:
@@ -397,6 +437,8 @@ def _brief_markdown(
     current_dataset_week_key: str,
     prior_dataset_week_key: str,
     workqueue_size: int,
+    trend_df: pd.DataFrame | None = None,
+    forecast_df: pd.DataFrame | None = None,
 ) -> str:
     top2 = summary_df.head(2)
     top5 = summary_df.head(5)
@@ -480,6 +522,43 @@ def _brief_markdown(
     else:
         lines.append("| N/A | - | - | - | 0.0% | 0.0% | 0.0% | $0 |")
 
+    if trend_df is not None and not trend_df.empty:
+        lines.extend(
+            [
+                "",
+                f"## Stability trend (last {min(len(trend_df), TREND_BRIEF_PAIRS)} adjacent dataset-week pairs)",
+                f"- Full table: [`exports/denials_stability_trend_v1.csv`](../exports/denials_stability_trend_v1.csv)",
+                "",
+                "| dataset_week | top2_overlap | rank_correlation | rank_changes | max_share_shift | leader |",
+                "|---|---:|---:|---:|---:|---|",
+            ]
+        )
+        for _, row in trend_df.tail(TREND_BRIEF_PAIRS).iterrows():
+            correlation = "-" if pd.isna(row["rank_correlation"]) else f"{float(row['rank_correlation']):.2f}"
+            lines.append(
+                f"| {row['dataset_week_key']} | {int(row['top2_overlap'])}/2 | {correlation} | {int(row['rank_changes'])} | "
+                f"{_fmt_pct(float(row['max_share_shift']))} | {row['leader_bucket']} ({_fmt_pct(float(row['leader_share']))}) |"
+            )
+
+    outlook = bucket_outlook(forecast_df)
+    if not outlook.empty:
+        lines.extend(
+            [
+                "",
+                f"## Next-week outlook (dataset-week {outlook['forecast_week'].iloc[0]})",
+                f"- Full table: [`exports/denials_triage_forecast_v1.csv`](../exports/denials_triage_forecast_v1.csv) (every bucket and reason)",
+                "- Exponential-smoothing projection of weekly priority score; directional, not a commitment.",
+                "",
+                f"| denial_bucket | last_week_priority | expected_priority | {float(outlook['interval'].iloc[0]) * 100:.0f}% interval | model |",
+                "|---|---:|---:|---:|---|",
+            ]
+        )
+        for _, row in outlook.iterrows():
+            lines.append(
+                f"| {row['denial_bucket']} | {_fmt_money(float(row['last_week_priority']))} | {_fmt_money(float(row['expected_priority']))} | "
+                f"{_fmt_money(float(row['lower_priority']))} - {_fmt_money(float(row['upper_priority']))} | {row['model']} |"
+            )
+
     lines.extend(
         [
             "",
@@ -839,30 +918,18 @@ EVIDENCE_MAP = {
 }
 
 
-def _with_dataset_week_keys(df: pd.DataFrame) -> pd.DataFrame:
-    out = df.copy()
-    out["service_date"] = pd.to_datetime(out["service_date"])
-    out["dataset_week_start"] = out["service_date"] - pd.to_timedelta(out["service_date"].dt.weekday, unit="D")
-    out["dataset_week_key"] = out["dataset_week_start"].dt.strftime("%Y-%m-%d")
-    return out
+def _build_summary(current_df: pd.DataFrame, summary_limit: int, backend: str = "pandas") -> pd.DataFrame:
+    grouped = group_agg(current_df, ["denial_bucket", "denial_reason"], SUMMARY_AGGS, backend)
+    return _rank_summary(grouped, summary_limit)
 
 
-def _build_summary(current_df: pd.DataFrame, summary_limit: int) -> pd.DataFrame:
+def _rank_summary(grouped: pd.DataFrame, summary_limit: int) -> pd.DataFrame:
     grouped = (
-        current_df.groupby(["denial_bucket", "denial_reason"], as_index=False)
-        .agg(
-            denied_amount_sum=("denied_amount", "sum"),
-            denial_count=("claim_id", "count"),
-            avg_denied_amount=("denied_amount", "mean"),
-            preventability_weight=("preventability_weight", "first"),
-            priority_score=("row_priority", "sum"),
+        top_k_rows(
+            grouped.assign(avg_denied_amount=grouped["denied_amount_sum"] / grouped["denial_count"]),
+            SUMMARY_ORDER,
+            summary_limit,
         )
-        .sort_values(
-            ["priority_score", "denied_amount_sum", "denial_bucket", "denial_reason"],
-            ascending=[False, False, True, True],
-            kind="mergesort",
-        )
-        .head(summary_limit)
     )
     grouped["payer_dim_status"] = "MISSING_IN_MART"
     return grouped[
@@ -880,18 +947,11 @@ def _build_summary(current_df: pd.DataFrame, summary_limit: int) -> pd.DataFrame
 
 
 def _build_workqueue(current_df: pd.DataFrame, workqueue_size: int) -> pd.DataFrame:
-    workqueue = (
-        current_df.sort_values(
-            ["row_priority", "denied_amount", "claim_id"],
-            ascending=[False, False, True],
-            kind="mergesort",
-        )
-        .head(workqueue_size)
-        .copy()
-    )
-    workqueue["owner"] = workqueue["denial_bucket"].map(OWNER_MAP).fillna("RCM analyst review")
-    workqueue["next_action"] = workqueue["denial_bucket"].map(ACTION_MAP).fillna("Manual triage; classify reason; assign owner")
-    workqueue["evidence_needed"] = workqueue["denial_bucket"].map(EVIDENCE_MAP).fillna("Denial reason detail, line notes, routing owner")
+    workqueue = top_k_rows(current_df, WORKQUEUE_ORDER, workqueue_size).copy()
+    workqueue["dataset_week_key"] = week_labels(workqueue["dataset_week_id"])
+    workqueue["owner"] = workqueue["denial_bucket"].astype(str).map(OWNER_MAP).fillna("RCM analyst review")
+    workqueue["next_action"] = workqueue["denial_bucket"].astype(str).map(ACTION_MAP).fillna("Manual triage; classify reason; assign owner")
+    workqueue["evidence_needed"] = workqueue["denial_bucket"].astype(str).map(EVIDENCE_MAP).fillna("Denial reason detail, line notes, routing owner")
     workqueue["payer_dim_status"] = "MISSING_IN_MART"
     return workqueue[
         [
@@ -911,11 +971,14 @@ def _build_workqueue(current_df: pd.DataFrame, workqueue_size: int) -> pd.DataFr
     ]
 
 
-def _build_stability(current_df: pd.DataFrame, prior_df: pd.DataFrame) -> tuple[pd.DataFrame, str]:
-    current = current_df.groupby("denial_bucket", as_index=False).agg(current_priority_score=("row_priority", "sum"))
-    prior = prior_df.groupby("denial_bucket", as_index=False).agg(prior_priority_score=("row_priority", "sum"))
+def _build_stability(current_df: pd.DataFrame, prior_df: pd.DataFrame, backend: str = "pandas") -> tuple[pd.DataFrame, str]:
+    current = group_agg(current_df, ["denial_bucket"], {"current_priority_score": ("row_priority", PRIORITY_SUM)}, backend)
+    prior = group_agg(prior_df, ["denial_bucket"], {"prior_priority_score": ("row_priority", PRIORITY_SUM)}, backend)
+    return _stability_from_totals(current, prior)
 
-    merged = current.merge(prior, on="denial_bucket", how="outer").fillna(0.0)
+
+def _stability_from_totals(current: pd.DataFrame, prior: pd.DataFrame) -> tuple[pd.DataFrame, str]:
+    merged = current.merge(prior, on="denial_bucket", how="outer").fillna({"current_priority_score": 0.0, "prior_priority_score": 0.0})
     merged["delta_priority_score"] = merged["current_priority_score"] - merged["prior_priority_score"]
 
     current_rank_map = (
@@ -939,19 +1002,11 @@ def _build_stability(current_df: pd.DataFrame, prior_df: pd.DataFrame) -> tuple[
 
     merged = merged.sort_values(["current_priority_score", "denial_bucket"], ascending=[False, True], kind="mergesort")
 
-    current_top2 = set(
-        merged[merged["current_priority_score"] > 0]
-        .sort_values(["current_priority_score", "denial_bucket"], ascending=[False, True], kind="mergesort")
-        .head(2)["denial_bucket"]
-        .tolist()
-    )
-    prior_top2 = set(
-        merged[merged["prior_priority_score"] > 0]
-        .sort_values(["prior_priority_score", "denial_bucket"], ascending=[False, True], kind="mergesort")
-        .head(2)["denial_bucket"]
-        .tolist()
+    # Columns in bucket-name order, so ties rank the same way as the name tie-break in the sorts above.
+    scores = merged.sort_values("denial_bucket", key=lambda s: s.astype(str), kind="mergesort")
+    overlap = int(
+        top_k_overlap(scores[["current_priority_score"]].to_numpy().T, scores[["prior_priority_score"]].to_numpy().T)[0]
     )
-    overlap = len(current_top2.intersection(prior_top2))
     overlap_text = f"TOP2_OVERLAP={overlap}/2"
 
     return (
@@ -973,9 +1028,74 @@ def _build_stability(current_df: pd.DataFrame, prior_df: pd.DataFrame) -> tuple[
     )
 
 
-def _run_query(client: bigquery.Client, sql: str, params: list[bigquery.ScalarQueryParameter]) -> pd.DataFrame:
-    job_config = bigquery.QueryJobConfig(query_parameters=params)
-    return client.query(sql, job_config=job_config).result().to_dataframe()
+def _stream_rollup(batches: Iterable[pd.DataFrame], top: TopK, lookback_days: int) -> tuple[pd.DataFrame, pd.DataFrame]:
+    rollup = StreamRollup(STREAM_MEASURES, WORKQUEUE_ORDER, top.k, top)
+    try:
+        for batch_df in batches:
+            rollup.add(batch_df)
+        return rollup.rollup_frame(lookback_days), rollup.top_k_frame(lookback_days)
+    finally:
+        top.cleanup()
+
+
+def _render_backfill_week(week: WeekSlice, week_dir: Path, options: dict[str, Any]) -> list[Path]:
+    summary_df = _build_summary(week.current, options["summary_limit"], options["compute_backend"])
+    workqueue_df = _build_workqueue(week.current, options["workqueue_size"])
+    stability_df, _ = _build_stability(week.current, week.prior, options["compute_backend"])
+    summary_path = week_dir / "denials_triage_summary_v1.csv"
+    workqueue_path = week_dir / "denials_workqueue_v1.csv"
+    stability_path = week_dir / "denials_stability_v1.csv"
+    brief_path = week_dir / "denials_triage_brief_v1.md"
+    summary_df.to_csv(summary_path, index=False)
+    workqueue_df.to_csv(workqueue_path, index=False)
+    stability_df.to_csv(stability_path, index=False)
+    brief_path.write_text(
+        _brief_markdown(
+            options["source_fqn"],
+            summary_df,
+            workqueue_df,
+            stability_df,
+            week.week_key,
+            week.prior_week_key,
+            options["workqueue_size"],
+            options["trend_df"][options["trend_df"]["dataset_week_key"] <= week.week_key],
+        ),
+        encoding="utf-8",
+    )
+    return [summary_path, workqueue_path, stability_path, brief_path]
+
+
+def _drain_frames(tables: list[pa.Table]) -> Iterator[pd.DataFrame]:
+    """Frames for held pages, releasing each page once converted."""
+    tables.reverse()
+    while tables:
+        yield to_frame(tables.pop())
+
+
+def _fetch_detail(
+    engine: QueryEngine, detail_sql: str, params: list[QueryParam], args: argparse.Namespace, top: TopK
+) -> tuple[pd.DataFrame | None, pd.DataFrame | None, pd.DataFrame | None]:
+    """Detail frame, or (None, rollup, top-K) once held pages would push the detail path past --memory-budget-mb."""
+    budget_bytes = args.memory_budget_mb * (1 << 20)
+    pages = engine.iter_arrow(detail_sql, params)
+    held: list[pa.Table] = []
+    held_bytes = 0
+    for table in pages:
+        held.append(table)
+        held_bytes += table.nbytes
+        if budget_bytes and held_bytes * DETAIL_PEAK_FACTOR > budget_bytes:
+            if args.memory_budget_action == "fail":
+                pages.close()
+                raise RuntimeError(
+                    f"Detail rows exceed --memory-budget-mb={args.memory_budget_mb} after {held_bytes} fetched bytes; "
+                    "rerun with --stream or --pushdown."
+                )
+            # Replay the pages already held, then keep consuming the same result; nothing is queried twice.
+            batches = itertools.chain(_drain_frames(held), map(to_frame, pages))
+            return (None, *_stream_rollup(batches, top, args.lookback_days))
+    table = pa.concat_tables(held)
+    held.clear()
+    return to_frame(table), None, None
 
 
 def parse_args() -> argparse.Namespace:
@@ -993,6 +1113,29 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--workqueue-size", type=int, default=25)
     parser.add_argument("--summary-limit", type=int, default=50)
     parser.add_argument("--dry-run-sql", action="store_true", help="Print SQL statements only; do not execute.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--pushdown",
+        action="store_true",
+        help="Aggregate summary/stability in SQL and fetch only the top workqueue rows per week.",
+    )
+    mode.add_argument(
+        "--stream",
+        action="store_true",
+        help="Aggregate DETAIL SQL pages as they arrive instead of holding the full detail frame.",
+    )
+    parser.add_argument(
+        "--memory-budget-mb",
+        type=int,
+        default=0,
+        help="Cap on memory for the full detail frame (0 = no cap); checked as pages arrive.",
+    )
+    parser.add_argument(
+        "--memory-budget-action",
+        choices=("stream", "fail"),
+        default="stream",
+        help="When the detail frame would exceed --memory-budget-mb: finish with --stream aggregation, or stop.",
+    )
     parser.add_argument("--write-html", dest="write_html", action="store_true", default=True, help="Write docs HTML brief.")
     parser.add_argument("--no-write-html", dest="write_html", action="store_false", help="Skip docs HTML brief.")
     parser.add_argument(
@@ -1013,6 +1156,13 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Write public HTML twice and fail if SHA256 changes between writes.",
     )
+    add_backfill_args(parser)
+    add_spill_args(parser)
+    add_compute_args(parser)
+    add_whatif_args(parser)
+    add_forecast_args(parser)
+    add_engine_args(parser)
+    add_cache_args(parser)
     return parser.parse_args()
 
 
@@ -1022,7 +1172,6 @@ def main() -> int:
     as_of_date = pd.to_datetime(args.as_of_date).date() if args.as_of_date else None
     query_anchor_date = as_of_date or date.today()
 
-    min_aging_sql = MIN_AGING_SQL.format(source_fqn=source_fqn)
     detail_sql = DETAIL_SQL.format(source_fqn=source_fqn)
 
     if args.dry_run_sql:
@@ -1033,14 +1182,53 @@ def main() -> int:
         if as_of_date:
             print(f"\n-- AS_OF_DATE_FILTER --\n{as_of_date}")
         print(f"\n-- LOOKBACK_DAYS --\n{args.lookback_days}")
-        print("\n-- MIN AGING SQL --")
-        print(min_aging_sql)
-        print("\n-- DETAIL SQL --")
-        print(detail_sql)
-        print("\n-- OUTPUTS --")
-        print("summary/workqueue/stability are derived in Python from DETAIL SQL result.")
+        print("\n-- ANCHOR SCRIPT (runs ahead of each query below, in the same job) --")
+        print(anchor_script(source_fqn))
+        if args.pushdown:
+            print("\n-- ROLLUP SQL --")
+            print(rollup_sql(detail_sql, ROLLUP_MEASURES))
+            print("\n-- WORKQUEUE TOP-K SQL --")
+            print(top_k_sql(detail_sql, WORKQUEUE_ORDER_SQL))
+            print("\n-- OUTPUTS --")
+            print("summary/stability are ranked in Python from ROLLUP SQL; workqueue from the TOP-K slice.")
+        else:
+            print("\n-- DETAIL SQL --")
+            print(detail_sql)
+            print("\n-- OUTPUTS --")
+            if args.stream:
+                print("summary/workqueue/stability are aggregated page by page from the DETAIL SQL stream.")
+            else:
+                print("summary/workqueue/stability are derived in Python from DETAIL SQL result.")
         return 0
 
+    if args.backfill_weeks and (args.pushdown or args.stream):
+        raise RuntimeError("--backfill-weeks reads the detail rows; drop --pushdown/--stream.")
+    if args.weight_profiles and (args.pushdown or args.stream or args.backfill_weeks):
+        raise RuntimeError("--weight-profiles scores the current week's detail rows; drop --pushdown/--stream/--backfill-weeks.")
+    if args.forecast and args.backfill_weeks:
+        raise RuntimeError("--forecast projects the week after the current one; drop --backfill-weeks.")
+
+    engine = with_cache(make_engine(args, source_fqn), args)
+    lookback_days = backfill_lookback_days(args.backfill_weeks, args.lookback_days) if args.backfill_weeks else args.lookback_days
+    params = [
+        QueryParam("as_of_date", "DATE", query_anchor_date),
+        QueryParam("lookback_days", "INT64", lookback_days),
+    ]
+    if args.pushdown:
+        queries = [
+            (rollup_sql(detail_sql, ROLLUP_MEASURES), params),
+            (top_k_sql(detail_sql, WORKQUEUE_ORDER_SQL), [*params, QueryParam("workqueue_size", "INT64", args.workqueue_size)]),
+        ]
+    else:
+        queries = [(detail_sql, params)]
+    if args.estimate_cost or args.max_bytes_billed:
+        for line in check_scan_budget(engine, anchor_estimates(queries, source_fqn, query_anchor_date), args.max_bytes_billed):
+            print(line)
+        if args.estimate_cost:
+            return 0
+    queries = [(anchored(sql, source_fqn), query_params) for sql, query_params in queries]
+    detail_sql = anchored(detail_sql, source_fqn)
+
     out_dir = Path(args.out)
     out_dir.mkdir(parents=True, exist_ok=True)
     private_dir = out_dir / "private"
@@ -1048,36 +1236,76 @@ def main() -> int:
     docs_dir = Path("docs")
     docs_dir.mkdir(parents=True, exist_ok=True)
 
-    client = bigquery.Client(project=args.project)
-    min_aging_df = _run_query(client, min_aging_sql, [])
-    min_aging_days = int(min_aging_df.iloc[0]["min_aging_days"]) if not min_aging_df.empty else None
-    if min_aging_days is None:
-        raise RuntimeError("No denied rows found to anchor current period.")
+    if args.backfill_weeks:
+        (detail_df,) = query_frames(engine, queries)
+        if detail_df.empty:
+            raise RuntimeError("No denied rows returned for the selected anchored window.")
+        detail_df = compact_detail(detail_df.drop(columns="min_aging_days"))
+        backfill_dir = out_dir / "backfill" / "triage"
+        last_week_id = week_id(as_of_date) if as_of_date else None
+        trend_df = backfill_trend(detail_df, "row_priority", args.backfill_weeks, last_week_id, PRIORITY_SUM)
+        written, skipped = run_backfill(
+            _render_backfill_week,
+            week_slices(detail_df, args.backfill_weeks, last_week_id),
+            backfill_dir,
+            {
+                "source_fqn": source_fqn,
+                "summary_limit": args.summary_limit,
+                "workqueue_size": args.workqueue_size,
+                "compute_backend": args.compute_backend,
+                "trend_df": trend_df,
+            },
+            args.backfill_workers,
+        )
+        trend_path = backfill_dir / "denials_stability_trend_v1.csv"
+        trend_df.to_csv(trend_path, index=False)
+        print(f"SOURCE_RELATION={source_fqn}")
+        for line in [*engine_summary_lines(engine), *backfill_summary_lines(backfill_dir, written, skipped), *trend_summary_lines(trend_df)]:
+            print(line)
+        print(f"WROTE={trend_path}")
+        return 0
+
+    detail_df = None
+    top_k = make_top_k(args, WORKQUEUE_ORDER, args.workqueue_size)
+    if args.pushdown:
+        rollup_df, top_df = query_frames(engine, queries)
+        rollup_df = decode_exact_sums(rollup_df, ROLLUP_MEASURES)
+    elif args.stream:
+        rollup_df, top_df = _stream_rollup(iter_frames(engine, detail_sql, params), top_k, args.lookback_days)
+    else:
+        detail_df, rollup_df, top_df = _fetch_detail(engine, detail_sql, params, args, top_k)
+    aggregated = detail_df is None
+    detail_mb = 0.0
+    if aggregated and args.weight_profiles:
+        raise RuntimeError("--weight-profiles needs the detail rows, but they exceeded --memory-budget-mb; raise the budget.")
+    whatif_lines: list[str] = []
+
+    if aggregated:
+        if rollup_df.empty or int(rollup_df["detail_rows"].max()) == 0:
+            raise RuntimeError("No denied rows returned for the selected anchored window.")
+        min_aging_days = rollup_min_aging_days(rollup_df)
+        window_week_keys = [wk.strftime("%Y-%m-%d") for wk in rollup_weeks(rollup_df, "window_rows")]
+        all_week_keys = [wk.strftime("%Y-%m-%d") for wk in rollup_weeks(rollup_df, "detail_rows")]
+    else:
+        if detail_df.empty:
+            raise RuntimeError("No denied rows returned for the selected anchored window.")
+        min_aging_days = int(detail_df.pop("min_aging_days").iloc[0])
+
+        # One frame plus boolean masks; current/prior are the only row subsets materialized.
+        detail_df = compact_detail(detail_df)
+        detail_mb = frame_mb(detail_df)
+        detail_week_ids = detail_df["dataset_week_id"].to_numpy()
+        max_service_date = detail_df["service_date"].max()
+        window_start = max_service_date - pd.Timedelta(days=args.lookback_days)
+        window_mask = detail_df["service_date"].between(window_start, max_service_date).to_numpy()
+        if not window_mask.any():
+            window_mask = np.ones(len(detail_df), dtype=bool)
+
+        window_week_keys = [week_key(wk) for wk in np.unique(detail_week_ids[window_mask])]
+        all_week_keys = [week_key(wk) for wk in np.unique(detail_week_ids)]
 
-    detail_df = _run_query(
-        client,
-        detail_sql,
-        [
-            bigquery.ScalarQueryParameter("as_of_date", "DATE", query_anchor_date),
-            bigquery.ScalarQueryParameter("min_aging_days", "INT64", min_aging_days),
-            bigquery.ScalarQueryParameter("lookback_days", "INT64", args.lookback_days),
-        ],
-    )
-    if detail_df.empty:
-        raise RuntimeError("No denied rows returned for the selected anchored window.")
-
-    detail_df = _with_dataset_week_keys(detail_df)
-    all_detail_df = detail_df.copy()
-    max_service_date = detail_df["service_date"].max()
-    window_start = max_service_date - pd.Timedelta(days=args.lookback_days)
-    window_df = detail_df[(detail_df["service_date"] >= window_start) & (detail_df["service_date"] <= max_service_date)].copy()
-    if window_df.empty:
-        window_df = detail_df.copy()
-
-    detail_df = window_df
     anchor_mode = "DATASET_MAX_WEEK"
-    week_order = detail_df[["dataset_week_start", "dataset_week_key"]].drop_duplicates().sort_values("dataset_week_start")
-    week_keys = week_order["dataset_week_key"].tolist()
+    week_keys = window_week_keys
     if as_of_date:
         as_of_week_start = pd.Timestamp(as_of_date) - pd.to_timedelta(pd.Timestamp(as_of_date).weekday(), unit="D")
         as_of_week_key = as_of_week_start.strftime("%Y-%m-%d")
@@ -1085,15 +1313,9 @@ def main() -> int:
         anchor_mode = "AS_OF_DATE_FILTERED"
 
     if len(week_keys) < 2:
-        all_week_order = (
-            all_detail_df[["dataset_week_start", "dataset_week_key"]]
-            .drop_duplicates()
-            .sort_values("dataset_week_start")
-        )
-        all_week_keys = all_week_order["dataset_week_key"].tolist()
-        if as_of_date:
-            all_week_keys = [wk for wk in all_week_keys if wk <= as_of_week_key]
         week_keys = all_week_keys
+        if as_of_date:
+            week_keys = [wk for wk in week_keys if wk <= as_of_week_key]
 
     if not week_keys:
         raise RuntimeError("No comparable dataset_week_key values found.")
@@ -1101,20 +1323,62 @@ def main() -> int:
     current_dataset_week_key = week_keys[-1]
     prior_dataset_week_key = week_keys[-2] if len(week_keys) > 1 else ""
 
-    current_df = detail_df[detail_df["dataset_week_key"] == current_dataset_week_key].copy()
-    prior_df = (
-        detail_df[detail_df["dataset_week_key"] == prior_dataset_week_key].copy()
-        if prior_dataset_week_key
-        else detail_df.head(0).copy()
-    )
+    if aggregated:
+        summary_df = _rank_summary(rollup_level(rollup_df, pd.Timestamp(current_dataset_week_key), 2), args.summary_limit)
 
-    summary_df = _build_summary(current_df, args.summary_limit)
-    workqueue_df = _build_workqueue(current_df, args.workqueue_size)
-    stability_df, top2_overlap = _build_stability(current_df, prior_df)
+        top_df = compact_detail(top_df)
+        workqueue_df = _build_workqueue(top_df[top_df["dataset_week_id"] == week_id(current_dataset_week_key)], args.workqueue_size)
+
+        current_totals = rollup_level(rollup_df, pd.Timestamp(current_dataset_week_key), 1)
+        prior_totals = (
+            rollup_level(rollup_df, pd.Timestamp(prior_dataset_week_key), 1) if prior_dataset_week_key else current_totals.head(0)
+        )
+        stability_df, top2_overlap = _stability_from_totals(
+            current_totals[["denial_bucket", "priority_score"]].rename(columns={"priority_score": "current_priority_score"}),
+            prior_totals[["denial_bucket", "priority_score"]].rename(columns={"priority_score": "prior_priority_score"}),
+        )
+        forecast_totals = rollup_week_totals(rollup_df) if args.forecast else None
+        weekly_totals = rollup_level(rollup_df, None, 1)
+        weekly_totals = pd.DataFrame(
+            {
+                "dataset_week_key": pd.to_datetime(weekly_totals["dataset_week_start"]).dt.strftime("%Y-%m-%d"),
+                "denial_bucket": weekly_totals["denial_bucket"],
+                "priority_score": weekly_totals["priority_score"],
+            }
+        )
+    else:
+        current_df = detail_df[window_mask & (detail_week_ids == week_id(current_dataset_week_key))]
+        prior_df = (
+            detail_df[window_mask & (detail_week_ids == week_id(prior_dataset_week_key))]
+            if prior_dataset_week_key
+            else detail_df.head(0)
+        )
+        weekly_totals = weekly_bucket_totals(detail_df[window_mask], "row_priority", PRIORITY_SUM).rename(columns={"row_priority": "priority_score"})
+        forecast_totals = (
+            detail_week_totals(detail_df[window_mask], "row_priority", PRIORITY_SUM, args.compute_backend) if args.forecast else None
+        )
+        del detail_df
+
+        summary_df = _build_summary(current_df, args.summary_limit, args.compute_backend)
+        workqueue_df = _build_workqueue(current_df, args.workqueue_size)
+        stability_df, top2_overlap = _build_stability(current_df, prior_df, args.compute_backend)
+        if args.weight_profiles:
+            whatif_lines = run_whatif(
+                current_df, "denied_amount", WHATIF_FACTORS, args.weight_profiles, args.workqueue_size, out_dir, "denials_triage"
+            )
+
+    weekly_totals = weekly_totals[weekly_totals["dataset_week_key"] <= current_dataset_week_key]
+    trend_df = stability_trend(week_bucket_matrix(weekly_totals, "priority_score"))
 
     summary_path = out_dir / "denials_triage_summary_v1.csv"
     workqueue_path = out_dir / "denials_workqueue_v1.csv"
     stability_path = out_dir / "denials_stability_v1.csv"
+    trend_path = out_dir / "denials_stability_trend_v1.csv"
+    forecast_df, forecast_lines = (
+        run_forecast(forecast_totals, week_id(current_dataset_week_key), PRIORITY_DECIMALS, args, out_dir / "denials_triage_forecast_v1.csv")
+        if forecast_totals is not None
+        else (None, [])
+    )
     brief_path = docs_dir / "denials_triage_brief_v1.md"
     brief_html_path = docs_dir / "denials_triage_brief_v1.html"
     teaching_html_path = private_dir / "denials_triage_defense_simulator.html"
@@ -1122,6 +1386,7 @@ def main() -> int:
     summary_df.to_csv(summary_path, index=False)
     workqueue_df.to_csv(workqueue_path, index=False)
     stability_df.to_csv(stability_path, index=False)
+    trend_df.to_csv(trend_path, index=False)
     brief_markdown = _brief_markdown(
         source_fqn,
         summary_df,
@@ -1130,6 +1395,8 @@ def main() -> int:
         current_dataset_week_key,
         prior_dataset_week_key,
         args.workqueue_size,
+        trend_df,
+        forecast_df,
     )
     brief_path.write_text(brief_markdown, encoding="utf-8")
 
@@ -1173,22 +1440,37 @@ def main() -> int:
 
     print(f"SOURCE_RELATION={source_fqn}")
     print(f"SOURCE_GRAIN=claim-level ({args.relation})")
+    for line in engine_summary_lines(engine):
+        print(line)
     print(f"MIN_AGING_DAYS={min_aging_days}")
     print(f"ANCHOR_MODE={anchor_mode}")
     print(f"QUERY_ANCHOR_DATE={query_anchor_date}")
     print(f"CURRENT_DATASET_WEEK_KEY={current_dataset_week_key}")
     print(f"PRIOR_DATASET_WEEK_KEY={prior_dataset_week_key if prior_dataset_week_key else 'NONE'}")
     print(top2_overlap)
+    for line in trend_summary_lines(trend_df):
+        print(line)
     print(f"WROTE={summary_path}")
     print(f"WROTE={workqueue_path}")
     print(f"WROTE={stability_path}")
+    print(f"WROTE={trend_path}")
     print(f"WROTE={brief_path}")
     if args.write_html:
         print(f"WROTE={brief_html_path}")
     if args.write_teaching_html:
         print(f"WROTE={teaching_html_path}")
+    for line in [*whatif_lines, *forecast_lines]:
+        print(line)
     print(f"PRIVATE_ARTIFACT_PATH={(Path(args.out) / 'private' / 'denials_triage_defense_simulator.html').as_posix()}")
     print("PRIVATE_ARTIFACT_TRACKED=FALSE")
+    if args.memory_budget_mb:
+        print(f"MEMORY_BUDGET_MB={args.memory_budget_mb}")
+        print(f"MEMORY_BUDGET_STREAMED={'TRUE' if aggregated and not (args.pushdown or args.stream) else 'FALSE'}")
+    for line in top_k.summary_lines():
+        print(line)
+    if not aggregated:
+        print(f"DETAIL_FRAME_MB={detail_mb:.1f}")
+    print(f"PEAK_RSS_MB={peak_rss_mb():.1f}")
     return 0
 
 
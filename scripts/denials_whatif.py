@@ -0,0 +1,192 @@
+"""What-if scoring: many weight profiles over the already-fetched detail rows in one vectorized pass.
+
+A profile CSV has a `profile` column plus one weight column per category (denial bucket, and for recovery the time
+bands); an absent column or blank cell keeps the current weight. Weights are fixed-point (denials_money), so scores are
+exact integers: per-row weights come from each factor's one-hot category codes times the profile x category weight
+matrix, bucket totals are the bucket one-hot matrix product with the row scores, and the built-in `current` profile
+reproduces the script's own summary totals.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+from typing import NamedTuple, Sequence
+
+import numpy as np
+import pandas as pd
+
+from denials_money import AMOUNT_DECIMALS, WEIGHT_DECIMALS, fixed_units, units_to_float
+from denials_stability import bucket_ranks
+
+
+PROFILE_COLUMN = "profile"
+CURRENT_PROFILE = "current"
+WHATIF_COLUMNS = ["profile", "denial_bucket", "priority_score", "share", "rank", "current_rank", "rank_delta"]
+WHATIF_WORKQUEUE_COLUMNS = [
+    "profile",
+    "workqueue_rank",
+    "claim_id",
+    "denial_bucket",
+    "denied_amount",
+    "priority_score",
+    "in_current_workqueue",
+]
+
+
+class WeightFactor(NamedTuple):
+    """One multiplicative weight: rows[category] picks the profile column, rows[current] is today's weight."""
+
+    category: str
+    current: str
+    columns: dict[str, str]
+
+
+def add_whatif_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--weight-profiles",
+        default=None,
+        help="CSV of what-if weight profiles (profile column plus one weight column per category); scores every profile against the current week's detail rows.",
+    )
+
+
+def load_weight_profiles(path: str | Path, factors: Sequence[WeightFactor]) -> pd.DataFrame:
+    profiles = pd.read_csv(path, dtype={PROFILE_COLUMN: str})
+    if PROFILE_COLUMN not in profiles.columns:
+        raise RuntimeError(f"Weight profiles file {path} needs a '{PROFILE_COLUMN}' column.")
+    known = {column for factor in factors for column in factor.columns.values()}
+    unknown = sorted(set(profiles.columns) - known - {PROFILE_COLUMN})
+    if unknown:
+        raise RuntimeError(f"Unknown weight columns in {path}: {', '.join(unknown)}; expected some of {', '.join(sorted(known))}.")
+    names = profiles[PROFILE_COLUMN].fillna("").str.strip()
+    if (names == "").any() or names.duplicated().any() or (names == CURRENT_PROFILE).any():
+        raise RuntimeError(f"Profile names in {path} must be unique, non-empty and not '{CURRENT_PROFILE}'.")
+    weights = profiles.drop(columns=PROFILE_COLUMN).apply(pd.to_numeric, errors="coerce")
+    bad = weights.notna() & ~(weights.ge(0) & np.isfinite(weights))
+    if bad.any().any() or (profiles.drop(columns=PROFILE_COLUMN).notna() & weights.isna()).any().any():
+        raise RuntimeError(f"Weights in {path} must be non-negative numbers.")
+    return weights.set_axis(names).rename_axis(PROFILE_COLUMN)
+
+
+def _weight_units(weights: np.ndarray) -> np.ndarray:
+    units = fixed_units(weights.ravel(), WEIGHT_DECIMALS).reshape(weights.shape)
+    if not np.allclose(units, weights * 10**WEIGHT_DECIMALS, rtol=0, atol=1e-6):
+        raise RuntimeError(f"Weights carry at most {WEIGHT_DECIMALS} decimals (money is fixed-point, see denials_money).")
+    return units
+
+
+def _factor_weights(rows: pd.DataFrame, factor: WeightFactor, profiles: pd.DataFrame) -> np.ndarray:
+    """Profile x row integer weights: the category one-hot of each row times the profile x category weight matrix."""
+    codes, categories = pd.factorize(rows[factor.category].astype(str), sort=True)
+    current = pd.Series(rows[factor.current].to_numpy(dtype=float)).groupby(codes).first().reindex(range(len(categories)))
+    matrix = np.tile(current.to_numpy(dtype=float), (len(profiles) + 1, 1))
+    for j, category in enumerate(categories):
+        column = factor.columns.get(category)
+        if column in profiles.columns:
+            chosen = profiles[column].to_numpy(dtype=float)
+            matrix[1:, j] = np.where(np.isnan(chosen), matrix[1:, j], chosen)
+    # Gathering columns by code is the one-hot product without materializing the n x categories indicator.
+    return _weight_units(matrix)[:, codes]
+
+
+def _top_rows(scores: np.ndarray, amount_units: np.ndarray, claim_codes: np.ndarray, k: int) -> np.ndarray:
+    """Row positions of the k best rows: score desc, amount desc, claim_id asc, then row order (the workqueue order)."""
+    if k <= 0 or not len(scores):
+        return np.array([], dtype=np.intp)
+    candidates = np.arange(len(scores))
+    if k < len(scores):
+        kth = np.partition(-scores, k - 1)[k - 1]
+        candidates = np.flatnonzero(-scores <= kth)
+    order = np.lexsort((candidates, claim_codes[candidates], -amount_units[candidates], -scores[candidates]))
+    return candidates[order[:k]]
+
+
+def score_profiles(
+    rows: pd.DataFrame,
+    amount: str,
+    factors: Sequence[WeightFactor],
+    profiles: pd.DataFrame,
+    workqueue_size: int,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """(profile x bucket ranking, profile x top-K workqueue) for the current weights plus every profile."""
+    names = [CURRENT_PROFILE, *profiles.index]
+    decimals = AMOUNT_DECIMALS + WEIGHT_DECIMALS * len(factors)
+    amount_units = fixed_units(rows[amount], AMOUNT_DECIMALS)
+    weights = np.ones((len(names), len(rows)), dtype=np.int64)
+    for factor in factors:
+        weights *= _factor_weights(rows, factor, profiles)
+    scores = weights * amount_units
+
+    bucket_codes, buckets = pd.factorize(rows["denial_bucket"].astype(str), sort=True)
+    one_hot = np.zeros((len(rows), len(buckets)), dtype=np.int64)
+    one_hot[np.arange(len(rows)), bucket_codes] = 1
+    totals = scores @ one_hot
+    ranks = bucket_ranks(totals)
+    order = np.argsort(ranks, axis=1)
+    ranked = np.take_along_axis(totals, order, axis=1)
+    grand = totals.sum(axis=1, keepdims=True)
+    ranking = pd.DataFrame(
+        {
+            "profile": np.repeat(np.asarray(names, dtype=object), len(buckets)),
+            "denial_bucket": np.asarray(buckets, dtype=object)[order].ravel(),
+            "priority_score": [units_to_float(units, decimals) for units in ranked.ravel().tolist()],
+            "share": (ranked / np.where(grand > 0, grand, 1)).ravel(),
+            "rank": np.tile(np.arange(1, len(buckets) + 1), len(names)),
+            "current_rank": ranks[0][order].ravel(),
+        }
+    )
+    ranking["rank_delta"] = ranking["current_rank"] - ranking["rank"]
+
+    claim_codes, _ = pd.factorize(rows["claim_id"], sort=True)
+    claim_codes = np.where(claim_codes < 0, len(rows), claim_codes)
+    queues = []
+    current_claims: set[object] = set()
+    for i, name in enumerate(names):
+        picked = _top_rows(scores[i], amount_units, claim_codes, workqueue_size)
+        queue = rows.iloc[picked]
+        claims = queue["claim_id"].tolist()
+        if i == 0:
+            current_claims = set(claims)
+        queues.append(
+            pd.DataFrame(
+                {
+                    "profile": name,
+                    "workqueue_rank": np.arange(1, len(picked) + 1),
+                    "claim_id": claims,
+                    "denial_bucket": queue["denial_bucket"].astype(str).to_numpy(),
+                    "denied_amount": queue[amount].to_numpy(dtype=float),
+                    "priority_score": [units_to_float(units, decimals) for units in scores[i][picked].tolist()],
+                    "in_current_workqueue": ["Y" if claim in current_claims else "N" for claim in claims],
+                }
+            )
+        )
+    workqueue = pd.concat(queues, ignore_index=True) if queues else pd.DataFrame(columns=WHATIF_WORKQUEUE_COLUMNS)
+    return ranking[WHATIF_COLUMNS], workqueue[WHATIF_WORKQUEUE_COLUMNS]
+
+
+def run_whatif(
+    rows: pd.DataFrame,
+    amount: str,
+    factors: Sequence[WeightFactor],
+    path: str | Path,
+    workqueue_size: int,
+    out_dir: Path,
+    prefix: str,
+) -> list[str]:
+    """Score the profiles in path, write <prefix>_whatif_v1.csv and <prefix>_whatif_workqueue_v1.csv; console lines."""
+    profiles = load_weight_profiles(path, factors)
+    started = time.perf_counter()
+    ranking, workqueue = score_profiles(rows, amount, factors, profiles, workqueue_size)
+    seconds = time.perf_counter() - started
+    ranking_path = out_dir / f"{prefix}_whatif_v1.csv"
+    workqueue_path = out_dir / f"{prefix}_whatif_workqueue_v1.csv"
+    ranking.to_csv(ranking_path, index=False)
+    workqueue.to_csv(workqueue_path, index=False)
+    return [
+        f"WHATIF_PROFILES={len(profiles)}",
+        f"WHATIF_ROWS={len(rows)}",
+        f"WHATIF_SECONDS={seconds:.3f}",
+        f"WROTE={ranking_path}",
+        f"WROTE={workqueue_path}",
+    ]
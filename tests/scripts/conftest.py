@@ -0,0 +1,98 @@
+"""Shared fixtures for the denials script tests; the scripts import their sibling modules by bare name."""
+
+from __future__ import annotations
+
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "scripts"))
+
+SOURCE_FQN = "test-project.rcm.mart_workqueue_claims"
+SNAPSHOT_DATE = date(2026, 3, 4)
+LOOKBACK_DAYS = 60
+GROUPS = [
+    ("Noncovered", "Coverage verification / ABN workflow", "C"),
+    ("Other Denial", "Specialist review", "D"),
+    ("Invalid Data", "Front-end edit / resubmit", "I"),
+    ("Medically Unnecessary", "Documentation improvement", "N"),
+    ("Timely Filing", "Appeal late filing", "P"),
+    ("Duplicate", "Duplicate - exclude", "M"),
+    ("Contract Variance", "Contract write off review", "O"),
+    ("Prior Auth", "Obtain authorization", "C"),
+    (None, None, None),
+]
+
+
+def make_mart(n: int, seed: int = 7, undated_every: int = 0) -> pd.DataFrame:
+    """Synthetic mart_workqueue_claims rows with the columns the DETAIL_SQL queries read.
+
+    Amounts repeat a handful of round values so sorts and top-K cuts see ties.
+    """
+    rng = np.random.default_rng(seed)
+    picked = [GROUPS[i] for i in rng.integers(0, len(GROUPS), n)]
+    amount = np.round(rng.gamma(2.0, 300.0, n), 2)
+    amount[rng.random(n) < 0.2] = 0.0
+    amount[rng.random(n) < 0.1] = 500.0
+    aging = rng.integers(20, 200, n)
+    df = pd.DataFrame(
+        {
+            "clm_id": [f"{542190000000000 + int(x)}" for x in rng.permutation(n * 3)[:n]],
+            "denied_potential_allowed_proxy_amt": amount,
+            "p_denial": np.where(rng.random(n) < 0.5, rng.random(n), np.nan),
+            "aging_days": aging,
+            "min_svc_dt": [SNAPSHOT_DATE - timedelta(days=int(days)) for days in aging],
+            "top_hcpcs": [f"H{int(x):04d}" for x in rng.integers(0, 40, n)],
+            "top_denial_prcsg": [g[2] for g in picked],
+            "top_denial_group": [g[0] for g in picked],
+            "top_next_best_action": [g[1] for g in picked],
+        }
+    )
+    if undated_every:
+        undated = np.arange(n) % undated_every == 0
+        df["min_svc_dt"] = df["min_svc_dt"].where(~undated, None)
+        df["aging_days"] = df["aging_days"].astype("Int64").where(~undated, pd.NA)
+    return df
+
+
+@pytest.fixture(scope="session")
+def mart_path(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    path = tmp_path_factory.mktemp("mart") / "mart_workqueue_claims.parquet"
+    make_mart(3000).to_parquet(path, index=False)
+    return path
+
+
+@pytest.fixture()
+def local_engine(mart_path: Path):
+    from denials_engine import LocalEngine
+
+    return LocalEngine(SOURCE_FQN, mart_path)
+
+
+@pytest.fixture()
+def triage_detail(local_engine):
+    """(DETAIL_SQL, params, detail rows) of the triage script over the synthetic mart; run the SQL through anchored()."""
+    from denials_anchor import anchored
+    from denials_engine import QueryParam
+    from denials_triage_bq import DETAIL_SQL
+
+    params = [QueryParam("as_of_date", "DATE", SNAPSHOT_DATE), QueryParam("lookback_days", "INT64", LOOKBACK_DAYS)]
+    detail_sql = DETAIL_SQL.format(source_fqn=SOURCE_FQN)
+    return detail_sql, params, local_engine.query_df(anchored(detail_sql, SOURCE_FQN), params)
+
+
+def windowed(detail_df: pd.DataFrame) -> pd.DataFrame:
+    """What the detail path keeps: rows within the lookback of the latest service date, keyed by Monday week start."""
+    service_date = detail_df["service_date"]
+    rows = detail_df[service_date >= service_date.max() - pd.Timedelta(days=LOOKBACK_DAYS)].copy()
+    rows["dataset_week_start"] = rows["service_date"] - pd.to_timedelta(rows["service_date"].dt.weekday, unit="D")
+    return rows
+
+
+def batches(df: pd.DataFrame, rows: int) -> list[pd.DataFrame]:
+    """Result pages as iter_frames yields them: each with its own 0-based index."""
+    return [df.iloc[start : start + rows].reset_index(drop=True) for start in range(0, len(df), rows)]
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+import pandas as pd
+import pytest
+
+from conftest import SNAPSHOT_DATE, SOURCE_FQN, make_mart
+from denials_anchor import ANCHOR_SQL, anchor_estimates, anchored
+from denials_engine import LocalEngine, QueryParam, check_scan_budget
+import denials_triage_bq as triage
+
+ANCHOR_VALUES_SQL = "SELECT anchor_min_aging_days AS min_aging_days, anchor_max_svc_dt AS max_svc_dt"
+
+
+def _engine(tmp_path, mart: pd.DataFrame) -> LocalEngine:
+    path = tmp_path / "mart_workqueue_claims.parquet"
+    mart.to_parquet(path, index=False)
+    return LocalEngine(SOURCE_FQN, path)
+
+
+def _denied(mart: pd.DataFrame) -> pd.DataFrame:
+    flag = (
+        (mart["p_denial"].fillna(0.0) > 0)
+        | (mart["top_denial_prcsg"].fillna("") != "")
+        | (mart["top_denial_group"].fillna("UNSPECIFIED") != "UNSPECIFIED")
+        | (mart["denied_potential_allowed_proxy_amt"].fillna(0.0) > 0)
+    )
+    return mart[flag]
+
+
+def _params(lookback_days: int) -> list[QueryParam]:
+    return [QueryParam("as_of_date", "DATE", SNAPSHOT_DATE), QueryParam("lookback_days", "INT64", lookback_days)]
+
+
+def _detail_rows(engine: LocalEngine, lookback_days: int) -> pd.DataFrame:
+    return engine.query_df(anchored(triage.DETAIL_SQL.format(source_fqn=SOURCE_FQN), SOURCE_FQN), _params(lookback_days))
+
+
+def test_anchor_script_sets_the_variables_in_the_same_job(local_engine):
+    mart = _denied(make_mart(3000))
+    row = local_engine.query_df(anchored(ANCHOR_VALUES_SQL, SOURCE_FQN), []).iloc[0]
+    assert int(row["min_aging_days"]) == int(mart["aging_days"].min())
+    assert pd.Timestamp(row["max_svc_dt"]).date() == max(mart["min_svc_dt"])
+    assert local_engine.stats.jobs == 1
+
+
+@pytest.mark.parametrize("lookback_days", [14, 60])
+def test_detail_keeps_the_window_and_undated_rows(tmp_path, lookback_days):
+    mart = make_mart(2000, undated_every=7)
+    detail = _detail_rows(_engine(tmp_path, mart), lookback_days)
+    denied = _denied(mart)
+    dates = pd.to_datetime(denied["min_svc_dt"])
+    latest = dates.max()
+    expected = denied[dates.isna() | dates.between(latest - timedelta(days=lookback_days), latest)]
+    assert sorted(detail["claim_id"]) == sorted(expected["clm_id"])
+    assert expected["min_svc_dt"].isna().any()
+
+
+def test_all_undated_rows_anchor_to_null(tmp_path):
+    mart = make_mart(500, undated_every=1)
+    engine = _engine(tmp_path, mart)
+    row = engine.query_df(anchored(ANCHOR_VALUES_SQL, SOURCE_FQN), []).iloc[0]
+    assert int(row["min_aging_days"]) == 0 and pd.isna(row["max_svc_dt"])
+    assert sorted(_detail_rows(engine, 14)["claim_id"]) == sorted(_denied(mart)["clm_id"])
+
+
+def test_estimates_cover_every_query_before_any_runs(local_engine):
+    detail_sql = triage.DETAIL_SQL.format(source_fqn=SOURCE_FQN)
+    estimates = anchor_estimates([(detail_sql, _params(60))], SOURCE_FQN, SNAPSHOT_DATE)
+    assert estimates[0] == (ANCHOR_SQL.format(source_fqn=SOURCE_FQN), [])
+    sql, params = estimates[1]
+    assert "@anchor_max_svc_dt" in sql and "DECLARE" not in sql
+    assert params[-2:] == [QueryParam("anchor_min_aging_days", "INT64", 0), QueryParam("anchor_max_svc_dt", "DATE", SNAPSHOT_DATE)]
+    assert len(local_engine.query_df(sql, params))
+
+    lines = check_scan_budget(local_engine, estimates, 0)
+    assert "ESTIMATED_SLOT_MS=unavailable" in lines
+    anchor_bytes = local_engine.estimate_bytes(*estimates[0])
+    with pytest.raises(RuntimeError, match="no query was run"):
+        check_scan_budget(local_engine, estimates, anchor_bytes)
+    assert local_engine.stats.jobs == 1
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+from denials_backfill import DONE_MARKER, WeekSlice, run_backfill, week_slices
+from denials_frame import compact_detail, week_key
+
+
+def _write_rows(week: WeekSlice, week_dir: Path, options: dict[str, Any]) -> list[Path]:
+    path = week_dir / "rows.txt"
+    path.write_text(f"{len(week.current)} {week.prior_week_key}\n", encoding="utf-8")
+    return [path]
+
+
+def test_week_slices_pair_each_week_with_the_one_before(triage_detail):
+    detail_df = compact_detail(triage_detail[2])
+    week_ids = sorted(detail_df["dataset_week_id"].unique())
+    slices = list(week_slices(detail_df, 3))
+    assert [week.week_key for week in slices] == [week_key(wk) for wk in week_ids[-3:]]
+    assert [week.prior_week_key for week in slices] == [week_key(wk) for wk in week_ids[-4:-1]]
+    assert sum(len(week.current) for week in week_slices(detail_df, len(week_ids) + 5)) == len(detail_df)
+    assert list(week_slices(detail_df, 1, week_ids[-2]))[0].week_key == week_key(week_ids[-2])
+
+
+def test_rerun_resumes_at_the_first_unfinished_week(triage_detail, tmp_path):
+    detail_df = compact_detail(triage_detail[2])
+    written, skipped = run_backfill(_write_rows, week_slices(detail_df, 2), tmp_path, {})
+    assert len(written) == 2 and skipped == []
+    (tmp_path / written[-1] / DONE_MARKER).unlink()
+    written, skipped = run_backfill(_write_rows, week_slices(detail_df, 3), tmp_path, {}, workers=2)
+    assert len(written) == 2 and len(skipped) == 1
+    assert all((tmp_path / key / "rows.txt").exists() for key in [*written, *skipped])
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import pandas as pd
+
+from conftest import SOURCE_FQN
+from denials_cache import CachedEngine
+from denials_engine import QueryParam
+
+SQL = f"SELECT clm_id, aging_days FROM `{SOURCE_FQN}` WHERE aging_days >= @min_days ORDER BY clm_id"
+
+
+def test_repeated_query_is_served_from_the_cache(local_engine, tmp_path):
+    engine = CachedEngine(local_engine, tmp_path / "cache", 1 << 30)
+    params = [QueryParam("min_days", "INT64", 100)]
+    first = engine.query_df(SQL, params)
+    second = engine.query_df(SQL, params)
+    pd.testing.assert_frame_equal(first, second)
+    engine.query_df(SQL, [QueryParam("min_days", "INT64", 150)])
+    assert (engine.stats.cache_hits, engine.stats.cache_misses, engine.stats.jobs) == (1, 2, 2)
+
+
+def test_source_change_misses(local_engine, tmp_path, monkeypatch):
+    params = [QueryParam("min_days", "INT64", 100)]
+    CachedEngine(local_engine, tmp_path / "cache", 1 << 30).query_df(SQL, params)
+    monkeypatch.setattr(local_engine, "source_version", lambda: "rebuilt")
+    engine = CachedEngine(local_engine, tmp_path / "cache", 1 << 30)
+    engine.query_df(SQL, params)
+    assert engine.stats.cache_misses == 2 and engine.stats.cache_hits == 0
+
+
+def test_eviction_keeps_the_cache_under_its_cap(local_engine, tmp_path):
+    engine = CachedEngine(local_engine, tmp_path / "cache", 1)
+    for min_days in (50, 100, 150):
+        engine.query_df(SQL, [QueryParam("min_days", "INT64", min_days)])
+    assert list((tmp_path / "cache").glob("*.parquet")) == []
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+import pandas as pd
+
+import denials_classify
+from denials_rci_bq import ACTION_CATEGORY_CLASSIFIER, _assign_action_categories
+
+
+def test_pairs_are_labelled_like_per_row_classification():
+    actions = pd.Series(["Obtain prior auth", None, "Resubmit corrected claim", "Obtain prior auth", "appeal"] * 3)
+    patterns = pd.Series(["CO-197", "CO-16", None, "CO-197", "timely filing"] * 3)
+    expected = [ACTION_CATEGORY_CLASSIFIER.classify_text(f"{a} {p}") for a, p in zip(actions, patterns)]
+    assert _assign_action_categories(actions, patterns).tolist() == expected
+
+
+def test_pool_keeps_text_order(monkeypatch):
+    monkeypatch.setattr(denials_classify, "PARALLEL_MIN_VALUES", 1)
+    texts = [f"{word} {i}" for i in range(40) for word in ("prior auth", "coding modifier", "refile", "misc")]
+    assert ACTION_CATEGORY_CLASSIFIER.classify_unique(texts, workers=2) == [
+        ACTION_CATEGORY_CLASSIFIER.classify_text(text) for text in texts
+    ]
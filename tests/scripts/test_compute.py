@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from denials_compute import exact_limbs, exact_total, group_agg
+from denials_money import AMOUNT_MEAN, AMOUNT_SUM, PRIORITY_SUM
+
+AGGS = {
+    "amount_sum": ("amount", AMOUNT_SUM),
+    "amount_mean": ("amount", AMOUNT_MEAN),
+    "priority_sum": ("priority", PRIORITY_SUM),
+    "ratio_fsum": ("ratio", "fsum"),
+    "ratio_mean": ("ratio", "mean"),
+    "p_mean": ("p", "mean"),
+    "rows": ("claim_id", "size"),
+    "p_count": ("p", "count"),
+    "units": ("units", "sum"),
+    "first_p": ("p", "first"),
+    "first_label": ("label", "first"),
+    "max_p": ("p", "max"),
+    "min_units": ("units", "min"),
+}
+
+
+def _frame(n: int, seed: int = 11) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    buckets = pd.Categorical(
+        rng.choice(["AUTH_ELIG", "CODING_DOC", "OTHER_PROXY", None], n, p=[0.4, 0.3, 0.25, 0.05]),
+        categories=["UNUSED", "OTHER_PROXY", "AUTH_ELIG", "CODING_DOC"],
+    )
+    amount = np.round(rng.gamma(2.0, 300.0, n), 2)
+    amount[rng.random(n) < 0.2] = 500.0
+    weight = rng.choice([0.2, 0.6, 1.0], n)
+    return pd.DataFrame(
+        {
+            "claim_id": [f"c{i}" for i in range(n)],
+            "bucket": buckets,
+            "reason": rng.choice(["Prior Auth", "Duplicate", "Timely Filing"], n),
+            "week": pd.to_datetime("2026-01-05") + pd.to_timedelta(7 * rng.integers(0, 6, n), unit="D"),
+            "amount": amount,
+            "priority": amount * weight,
+            "ratio": rng.random(n) * 10.0 ** rng.integers(-12, 12, n),
+            "p": np.where(rng.random(n) < 0.3, np.nan, rng.random(n)),
+            "units": rng.integers(-50, 50, n),
+            "label": np.where(rng.random(n) < 0.5, None, rng.choice(["a", "b"], n)).astype(object),
+        }
+    )
+
+
+@pytest.mark.parametrize("keys", [["bucket"], ["bucket", "reason"], ["week", "bucket"], ["reason", "week"]])
+@pytest.mark.parametrize("n", [1, 17, 5000])
+def test_arrow_matches_pandas(keys, n):
+    df = _frame(n)
+    expected = group_agg(df, keys, AGGS, "pandas")
+    pd.testing.assert_frame_equal(group_agg(df, keys, AGGS, "arrow"), expected)
+
+
+def test_arrow_matches_pandas_when_falling_back():
+    df = _frame(300)
+    df.loc[5, "ratio"] = np.nan
+    df.loc[6, "p"] = 1e300
+    df.loc[7, "p"] = 1e-300
+    aggs = {"ratio_fsum": ("ratio", "fsum"), "p_mean": ("p", "mean")}
+    pd.testing.assert_frame_equal(group_agg(df, ["reason"], aggs, "arrow"), group_agg(df, ["reason"], aggs, "pandas"))
+
+
+def test_arrow_keeps_negative_zero_sums():
+    df = pd.DataFrame({"k": ["a", "a", "b", "b"], "v": [-0.0, -0.0, -0.0, 0.0]})
+    out = group_agg(df, ["k"], {"v": ("v", "fsum")}, "arrow")
+    assert [math.copysign(1.0, v) for v in out["v"]] == [-1.0, 1.0]
+
+
+def test_empty_frame():
+    df = _frame(10).head(0)
+    pd.testing.assert_frame_equal(group_agg(df, ["bucket"], AGGS, "arrow"), group_agg(df, ["bucket"], AGGS, "pandas"))
+
+
+def test_exact_limbs_reproduce_fsum():
+    rng = np.random.default_rng(5)
+    values = rng.standard_normal(2000) * 10.0 ** rng.integers(-30, 30, 2000)
+    values[:4] = [1e16, 1.0, -1e16, -0.0]
+    limbs, scale_bits = exact_limbs(values)
+    assert exact_total([int(limb.sum()) for limb in limbs], scale_bits) == math.fsum(values)
+    whole = np.array([500.0, 1024.0, -3.0, 2.0**60])
+    limbs, scale_bits = exact_limbs(whole)
+    assert exact_total([int(limb.sum()) for limb in limbs], scale_bits) == math.fsum(whole)
+    assert exact_limbs(np.array([1e200, 1e-200])) is None
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+
+from conftest import SOURCE_FQN
+from denials_classify import BUCKET_CLASSIFIER, DENIAL_BUCKET_SQL
+from denials_engine import QueryParam, translate_sql
+
+
+def _scalar(engine, sql: str, params: list[QueryParam] | None = None):
+    return engine.query_arrow(sql, params or []).column(0)[0].as_py()
+
+
+def test_date_sub_with_params(local_engine):
+    params = [QueryParam("d", "DATE", "2026-03-04"), QueryParam("n", "INT64", 10)]
+    assert _scalar(local_engine, "SELECT DATE_SUB(@d, INTERVAL @n DAY) AS x", params) == date(2026, 2, 22)
+
+
+def test_date_sub_of_null_date_param(local_engine):
+    params = [QueryParam("d", "DATE", None), QueryParam("n", "INT64", 10)]
+    assert _scalar(local_engine, "SELECT DATE_SUB(@d, INTERVAL @n DAY) AS x", params) is None
+
+
+def test_date_sub_nested_expression(local_engine):
+    sql = "SELECT DATE_SUB(DATE_SUB(@d, INTERVAL 1 DAY), INTERVAL CAST(COALESCE(NULL, 3) AS INT64) DAY) AS x"
+    assert _scalar(local_engine, sql, [QueryParam("d", "DATE", date(2026, 3, 4))]) == date(2026, 2, 28)
+
+
+def test_date_trunc_week_monday(local_engine):
+    assert _scalar(local_engine, "SELECT DATE_TRUNC(DATE '2026-03-08', WEEK(MONDAY)) AS x") == date(2026, 3, 2)
+    assert _scalar(local_engine, "SELECT DATE_TRUNC(DATE '2026-03-02', WEEK(MONDAY)) AS x") == date(2026, 3, 2)
+
+
+def test_unsupported_calls_raise():
+    with pytest.raises(ValueError):
+        translate_sql("SELECT DATE_SUB(d, INTERVAL 1 MONTH)")
+    with pytest.raises(ValueError):
+        translate_sql("SELECT DATE_TRUNC(d, MONTH)")
+    with pytest.raises(ValueError):
+        translate_sql("SELECT DATE_SUB(d, INTERVAL 1 DAY")
+
+
+def test_float_literals_are_float64(local_engine):
+    # BigQuery reads 0.1 as FLOAT64; DuckDB would add two DECIMALs exactly.
+    assert _scalar(local_engine, "SELECT 0.1 + 0.2 AS x") == 0.1 + 0.2
+
+
+def test_casts(local_engine):
+    row = local_engine.query_arrow(
+        "SELECT CAST(42 AS STRING) AS s, CAST('7' AS INT64) AS i, CAST(1 AS FLOAT64) / 4 AS f", []
+    ).to_pylist()[0]
+    assert row == {"s": "42", "i": 7, "f": 0.25}
+
+
+def test_string_literals_are_left_alone():
+    sql = "SELECT 'a@b 1.5 AS STRING `x`' AS t, REGEXP_CONTAINS(t, r'1.5') FROM `p.d.t` WHERE c = @p"
+    out = translate_sql(sql)
+    assert "'a@b 1.5 AS STRING `x`'" in out
+    assert "regexp_matches(t, '1.5')" in out
+    assert '"p.d.t"' in out and "$p" in out
+
+
+def test_safe_divide(local_engine):
+    row = local_engine.query_arrow("SELECT SAFE_DIVIDE(1, 4) AS a, SAFE_DIVIDE(1, 0) AS b, SAFE_DIVIDE(3, 0.0) AS c", []).to_pylist()[0]
+    assert row == {"a": 0.25, "b": None, "c": None}
+
+
+def test_countif_qualify_rollup(local_engine):
+    sql = """
+WITH t AS (SELECT * FROM (VALUES ('a', 1), ('a', 2), ('b', 3)) AS t(k, v))
+SELECT k, COUNTIF(v > 1) AS n, SUM(v) AS s
+FROM t
+GROUP BY ROLLUP(k)
+"""
+    rows = sorted(local_engine.query_arrow(sql, []).to_pylist(), key=lambda r: (r["k"] is None, r["k"] or ""))
+    assert rows == [{"k": "a", "n": 1, "s": 3}, {"k": "b", "n": 1, "s": 3}, {"k": None, "n": 2, "s": 6}]
+    top = local_engine.query_arrow(
+        "SELECT k, v FROM (VALUES ('a', 1), ('a', 2), ('b', 3)) AS t(k, v) "
+        "QUALIFY ROW_NUMBER() OVER (PARTITION BY k ORDER BY v DESC) <= @n",
+        [QueryParam("n", "INT64", 1)],
+    ).to_pylist()
+    assert sorted(top, key=lambda r: r["k"]) == [{"k": "a", "v": 2}, {"k": "b", "v": 3}]
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "prior auth obtain authorization c",
+        "timely filing appeal late filing p",
+        "duplicate duplicate - exclude m",
+        "contract variance contract write off review o",
+        "medically unnecessary documentation improvement n",
+        "noncovered coverage verification / abn workflow c",
+        "other denial specialist review d",
+        "",
+    ],
+)
+def test_bucket_case_sql_matches_python(local_engine, text):
+    sql = f"SELECT {DENIAL_BUCKET_SQL} AS bucket FROM (SELECT @t AS denial_reason_text)"
+    assert _scalar(local_engine, sql, [QueryParam("t", "STRING", text)]) == BUCKET_CLASSIFIER.classify_text(text)
+
+
+@pytest.mark.parametrize(
+    "script, date_param",
+    [
+        ("denials_triage_bq", "as_of_date"),
+        ("denials_prevention_bq", "as_of_date"),
+        ("denials_recovery_bq", "anchor_date"),
+        ("denials_rci_bq", "anchor_date"),
+    ],
+)
+def test_detail_sql_runs_locally(local_engine, script, date_param):
+    module = __import__(script)
+    from denials_anchor import anchored
+
+    params = [QueryParam(date_param, "DATE", date(2026, 3, 4)), QueryParam("lookback_days", "INT64", 60)]
+    df = local_engine.query_df(anchored(module.DETAIL_SQL.format(source_fqn=SOURCE_FQN), SOURCE_FQN), params)
+    assert len(df) > 0
+    assert set(df["denial_bucket"].astype(str)) <= set(BUCKET_CLASSIFIER.labels)
+    assert (df["min_aging_days"] == df["min_aging_days"].iloc[0]).all()
+
+
+def test_results_arrive_typed_and_counted(local_engine):
+    sql = f"SELECT CAST(clm_id AS STRING) AS claim_id, COALESCE(top_denial_group, 'UNSPECIFIED') AS denial_bucket, aging_days FROM `{SOURCE_FQN}`"
+    df = local_engine.query_df(sql, [])
+    assert len(df) == 3000 and df["claim_id"].dtype.name.startswith("str")
+    categories = list(df["denial_bucket"].cat.categories)
+    assert categories == sorted(categories)
+    assert str(df["aging_days"].dtype) == "int64"
+    assert (local_engine.stats.jobs, local_engine.stats.rows) == (1, 3000)
+
+
+def test_query_frames_keeps_request_order_under_the_job_cap(mart_path):
+    from denials_engine import LocalEngine, query_frames
+
+    engine = LocalEngine(SOURCE_FQN, mart_path, max_concurrent_jobs=2)
+    sql = f"SELECT COUNT(*) AS n FROM `{SOURCE_FQN}` WHERE aging_days >= @min_days"
+    frames = query_frames(engine, [(sql, [QueryParam("min_days", "INT64", d)]) for d in (20, 80, 140, 199, 200)])
+    counts = [int(df["n"].iloc[0]) for df in frames]
+    assert counts[0] == 3000 and counts[-1] == 0 and counts == sorted(counts, reverse=True)
+    assert engine.stats.jobs == 5
+    assert engine.job_slots.acquire(blocking=False)
+
+
+def test_slot_time_is_reported_only_when_jobs_report_it(local_engine):
+    from denials_engine import engine_summary_lines
+
+    local_engine.query_df("SELECT 1 AS x", [])
+    assert "QUERY_SLOT_MS=unavailable" in engine_summary_lines(local_engine)
+    local_engine.stats.record(0, 0, 0.0, slot_ms=1500)
+    local_engine.stats.record(0, 0, 0.0, slot_ms=250)
+    assert "QUERY_SLOT_MS=1750" in engine_summary_lines(local_engine)
+
+
+@pytest.mark.parametrize("close", ["iter_arrow", "iter_frames"])
+def test_early_close_records_stats_and_frees_the_job_slot(mart_path, close):
+    from denials_engine import FETCH_PAGE_ROWS, LocalEngine, iter_frames
+
+    engine = LocalEngine(SOURCE_FQN, mart_path, max_concurrent_jobs=1)
+    sql = f"SELECT a.clm_id FROM `{SOURCE_FQN}` AS a CROSS JOIN `{SOURCE_FQN}` AS b LIMIT {3 * FETCH_PAGE_ROWS}"
+    pages = engine.iter_arrow(sql, []) if close == "iter_arrow" else iter_frames(engine, sql, [])
+    assert len(next(pages)) == FETCH_PAGE_ROWS
+    pages.close()
+    assert (engine.stats.jobs, engine.stats.rows, engine.stats.batches) == (1, FETCH_PAGE_ROWS, 1)
+    assert engine.job_slots.acquire(blocking=False)
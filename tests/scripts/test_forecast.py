@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+from itertools import product
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from denials_forecast import ALPHAS, BETAS, GAMMAS, fit_smoothing, forecast_table, weekly_series
+from denials_money import PRIORITY_DECIMALS
+
+
+def _scalar_fit(series: np.ndarray, season: int) -> tuple[float, float, tuple[float, float, float]]:
+    """(forecast, rmse, (alpha, beta, gamma)) of one series by looping over the grid, the textbook recursion."""
+    best = None
+    for alpha, beta, gamma in product(ALPHAS, BETAS, GAMMAS if season else (0.0,)):
+        if season:
+            level = series[:season].mean()
+            seasonal = list(series[:season] - level)
+        else:
+            level, seasonal = series[0], []
+        trend = sse = 0.0
+        start = max(season, 1)
+        for t in range(start, len(series)):
+            s = seasonal[t % season] if season else 0.0
+            err = series[t] - (level + trend + s)
+            sse += err * err
+            level = level + trend + alpha * err
+            trend = trend + alpha * beta * err
+            if season:
+                seasonal[t % season] = s + gamma * err
+        ahead = level + trend + (seasonal[len(series) % season] if season else 0.0)
+        if best is None or sse < best[0]:
+            best = (sse, ahead, np.sqrt(sse / (len(series) - start)), (alpha, beta, gamma))
+    return best[1], best[2], best[3]
+
+
+@pytest.mark.parametrize("weeks, season_weeks", [(3, 0), (12, 0), (26, 4), (7, 4)])
+def test_batched_fit_matches_scalar_recursion(weeks, season_weeks):
+    rng = np.random.default_rng(weeks)
+    t = np.arange(weeks)
+    y = np.vstack(
+        [
+            np.full(weeks, 100.0),
+            1000.0 + 40.0 * t + rng.normal(0, 30, weeks),
+            np.where(t % 4 == 0, 900.0, 300.0) + rng.normal(0, 20, weeks),
+            np.round(rng.gamma(2.0, 500.0, weeks), 4),
+            np.zeros(weeks),
+        ]
+    )
+    fit = fit_smoothing(y, season_weeks)
+    season = season_weeks if weeks >= 2 * season_weeks else 0
+    for i, series in enumerate(y):
+        expected, rmse, params = _scalar_fit(series, season)
+        assert fit["expected"][i] == pytest.approx(expected, rel=1e-12, abs=1e-9)
+        assert fit["rmse"][i] == pytest.approx(rmse, rel=1e-12, abs=1e-9)
+        assert (fit["alpha"][i], fit["beta"][i], fit["gamma"][i]) == params
+
+
+def test_weekly_series_fills_gaps_and_sums_buckets():
+    totals = pd.DataFrame(
+        {
+            "dataset_week_id": [10, 10, 12, 13, 13],
+            "denial_bucket": ["AUTH_ELIG", "AUTH_ELIG", "AUTH_ELIG", "DUPLICATE", "AUTH_ELIG"],
+            "denial_reason": ["Prior Auth", "Noncovered", "Prior Auth", "Duplicate", "Noncovered"],
+            "priority_score": [0.1, 0.2, 5.0, 7.25, 1.0001],
+        }
+    )
+    keys, y = weekly_series(totals, 13, PRIORITY_DECIMALS)
+    assert keys[["level", "denial_bucket", "denial_reason"]].values.tolist() == [
+        ["bucket", "AUTH_ELIG", ""],
+        ["bucket", "DUPLICATE", ""],
+        ["reason", "AUTH_ELIG", "Noncovered"],
+        ["reason", "AUTH_ELIG", "Prior Auth"],
+        ["reason", "DUPLICATE", "Duplicate"],
+    ]
+    assert y.tolist() == [
+        [0.3, 0.0, 5.0, 1.0001],
+        [0.0, 0.0, 0.0, 7.25],
+        [0.2, 0.0, 0.0, 1.0001],
+        [0.1, 0.0, 5.0, 0.0],
+        [0.0, 0.0, 0.0, 7.25],
+    ]
+    with pytest.raises(RuntimeError, match="at least"):
+        weekly_series(totals, 11, PRIORITY_DECIMALS)
+
+
+def test_forecast_table_bounds():
+    totals = pd.DataFrame(
+        {
+            "dataset_week_id": np.repeat(np.arange(20), 2),
+            "denial_bucket": ["AUTH_ELIG", "DUPLICATE"] * 20,
+            "denial_reason": ["Prior Auth", "Duplicate"] * 20,
+            "priority_score": np.tile([1000.0, 5.0], 20) - np.repeat(np.arange(20), 2) * np.tile([0.0, 1.0], 20),
+        }
+    )
+    out = forecast_table(totals, 19, PRIORITY_DECIMALS, 0.8)
+    assert (out["lower_priority"] >= 0).all() and (out["expected_priority"] >= 0).all()
+    assert (out["lower_priority"] <= out["expected_priority"]).all() and (out["expected_priority"] <= out["upper_priority"]).all()
+    assert out.loc[(out["level"] == "bucket") & (out["denial_bucket"] == "AUTH_ELIG"), "expected_priority"].iloc[0] == pytest.approx(1000.0)
+    with pytest.raises(RuntimeError):
+        forecast_table(totals, 19, PRIORITY_DECIMALS, 1.0)
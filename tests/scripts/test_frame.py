@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from denials_frame import compact_detail, week_id, week_key, week_labels
+
+
+def test_week_ids_follow_monday_week_starts():
+    days = pd.Series(pd.date_range("1969-12-20", "2026-03-08", freq="13D"))
+    mondays = days - pd.to_timedelta(days.dt.weekday, unit="D")
+    keys = [week_key(week_id(day)) for day in days]
+    assert keys == [monday.strftime("%Y-%m-%d") for monday in mondays]
+    assert week_labels(pd.Series([week_id("2026-03-04")] * 2)).tolist() == ["2026-03-02", "2026-03-02"]
+
+
+def test_compact_detail_keeps_rows_and_adds_week_ids(triage_detail):
+    detail_df = triage_detail[2]
+    compact = compact_detail(detail_df)
+    assert len(compact) == len(detail_df)
+    assert compact["dataset_week_id"].dtype == np.int32
+    expected = detail_df["service_date"] - pd.to_timedelta(detail_df["service_date"].dt.weekday, unit="D")
+    assert week_labels(compact["dataset_week_id"]).tolist() == expected.dt.strftime("%Y-%m-%d").tolist()
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from denials_frame import week_id, week_key
+from denials_itemsets import ITEM_FIELDS, ITEMSET_COLUMNS, mine_itemsets
+from denials_money import AMOUNT_DECIMALS, fixed_units, units_to_float
+
+CURRENT_WEEK = week_id("2026-03-02")
+
+
+def _detail(n: int, seed: int = 13) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "dataset_week_id": CURRENT_WEEK - rng.integers(0, 6, n),
+            "top_denial_group": rng.choice(["Prior Auth", "Duplicate", "Noncovered", ""], n, p=[0.5, 0.2, 0.2, 0.1]),
+            "top_denial_prcsg": rng.choice(["C", "M", "D", "Q", ""], n, p=[0.4, 0.3, 0.2, 0.05, 0.05]),
+            "top_next_best_action": rng.choice(["Obtain authorization", "Duplicate - exclude"], n),
+            "top_hcpcs": rng.choice([f"H{i:04d}" for i in range(12)] + [""], n),
+            "denial_bucket": pd.Categorical(rng.choice(["AUTH_ELIG", "DUPLICATE", "OTHER_PROXY"], n)),
+            "denied_amount_proxy": rng.choice([500.0, 125.25, 19.99, 0.0, 0.005], n),
+        }
+    )
+
+
+def _brute_force(detail: pd.DataFrame, min_support: int, min_weeks: int, min_size: int) -> pd.DataFrame:
+    """Every subset of every row's non-blank items, counted directly."""
+    names = [name for name, _ in ITEM_FIELDS]
+    stats: dict[tuple, dict] = defaultdict(lambda: {"rows": 0, "weeks": set(), "units": 0, "current_rows": 0, "current_units": 0})
+    for row in detail.itertuples(index=False):
+        items = [(name, getattr(row, column)) for name, column in ITEM_FIELDS if getattr(row, column) != ""]
+        units = int(fixed_units([row.denied_amount_proxy], AMOUNT_DECIMALS)[0])
+        for size in range(min_size, len(items) + 1):
+            for itemset in combinations(items, size):
+                entry = stats[itemset]
+                entry["rows"] += 1
+                entry["weeks"].add(row.dataset_week_id)
+                entry["units"] += units
+                if row.dataset_week_id == CURRENT_WEEK:
+                    entry["current_rows"] += 1
+                    entry["current_units"] += units
+    frequent = {k: v for k, v in stats.items() if v["rows"] >= min_support and len(v["weeks"]) >= min_weeks}
+    records = []
+    for itemset, entry in frequent.items():
+        values = dict(itemset)
+        supersets = [
+            other for other in frequent
+            if len(other) == len(itemset) + 1 and set(itemset) < set(other) and frequent[other]["rows"] == entry["rows"]
+        ]
+        records.append(
+            {
+                "itemset": " | ".join(f"{name}={value.lower()}" for name, value in itemset),
+                "itemset_size": len(itemset),
+                **{name: values.get(name, "") for name in names},
+                "support_rows": entry["rows"],
+                "support_weeks": len(entry["weeks"]),
+                "first_week": week_key(min(entry["weeks"])),
+                "last_week": week_key(max(entry["weeks"])),
+                "denied_amount_sum": units_to_float(entry["units"], AMOUNT_DECIMALS),
+                "current_week_rows": entry["current_rows"],
+                "current_week_amount": units_to_float(entry["current_units"], AMOUNT_DECIMALS),
+                "closed": "N" if supersets else "Y",
+            }
+        )
+    return pd.DataFrame(records, columns=ITEMSET_COLUMNS)
+
+
+@pytest.mark.parametrize("min_support, min_weeks, min_size", [(20, 3, 2), (60, 6, 1), (5, 1, 3)])
+@pytest.mark.parametrize("backend", ["pandas", "arrow"])
+def test_mine_itemsets_matches_brute_force(min_support, min_weeks, min_size, backend):
+    detail = _detail(3000)
+    itemsets, bucket_rows, _ = mine_itemsets(detail, "denied_amount_proxy", CURRENT_WEEK, min_support, min_weeks, min_size, backend)
+    expected = _brute_force(detail, min_support, min_weeks, min_size)
+    assert len(expected)
+    actual = itemsets.sort_values("itemset").reset_index(drop=True)
+    expected = expected.sort_values("itemset").reset_index(drop=True)
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+    current = detail[detail["dataset_week_id"] == CURRENT_WEEK]
+    per_itemset = bucket_rows.groupby("itemset")["denial_count"].sum()
+    for itemset, rows in itemsets.set_index("itemset")["current_week_rows"].items():
+        assert per_itemset.get(itemset, 0) == rows
+    assert bucket_rows["denial_bucket"].astype(str).isin(current["denial_bucket"].astype(str)).all()
+
+
+def test_mine_itemsets_none_frequent():
+    itemsets, bucket_rows, frequent_items = mine_itemsets(_detail(50), "denied_amount_proxy", CURRENT_WEEK, 1000, 1)
+    assert itemsets.empty and list(itemsets.columns) == ITEMSET_COLUMNS
+    assert bucket_rows.empty and frequent_items == 0
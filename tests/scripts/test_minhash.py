@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from denials_frame import intern_text
+from denials_minhash import cluster_texts, minhash_signatures, signature_agreement
+import denials_rci_bq as rci
+
+WORDS = [
+    "prior", "auth", "coverage", "modifier", "bundled", "timely", "filing", "appeal", "review", "duplicate", "exclude",
+    "coding", "documentation", "records", "eligibility", "noncovered", "contract", "resubmit", "edit", "specialist",
+]
+THRESHOLD = 0.8
+
+
+def drifting_patterns(chains: int, steps: int, seed: int = 4) -> list[str]:
+    """Chains of pattern texts that change one word per step: neighbours are near-duplicates, chain ends are not."""
+    rng = np.random.default_rng(seed)
+    texts = []
+    for chain in range(chains):
+        words = list(rng.choice(WORDS, 14))
+        for _ in range(steps):
+            texts.append(f"chain {chain} | {' '.join(words)}")
+            words[rng.integers(0, len(words))] = str(rng.choice(WORDS))
+    return sorted(set(texts))
+
+
+@pytest.fixture(scope="module")
+def pattern_grouped() -> pd.DataFrame:
+    texts = np.array(drifting_patterns(40, 8), dtype=object)
+    rng = np.random.default_rng(9)
+    n = 20000
+    df = pd.DataFrame(
+        {
+            "claim_id": np.arange(n).astype(str),
+            "denial_bucket": pd.Categorical(rng.choice(["AUTH_ELIG", "CODING_DOC", "OTHER_PROXY"], n)),
+            "pattern_text": intern_text(pd.Series(texts[rng.integers(0, len(texts), n)])),
+            "next_action_text": "review",
+            "denied_amount_proxy": rng.choice([500.0, 125.25, 19.99, 0.0], n),
+            "preventability_weight": 0.6,
+        }
+    )
+    return rci._build_pattern_tables(df, 50, 5)[1]
+
+
+def test_lsh_links_chain_past_the_threshold():
+    # Precondition for the ticket test below: raw union-find components do hold members far from their first text.
+    texts = drifting_patterns(40, 8)
+    labels, signatures = cluster_texts(texts, THRESHOLD)
+    agreement = signature_agreement(signatures, np.arange(len(texts)), labels)
+    assert (agreement < THRESHOLD).any()
+    assert len(set(labels.tolist())) < len(texts)
+
+
+def test_cluster_members_agree_with_ticket_text(pattern_grouped):
+    candidates, members = rci._clustered_candidates(pattern_grouped, (THRESHOLD, 64, 8))
+    assert len(members) and members["cluster_id"].nunique() < len(members)
+    texts = sorted(set(members["pattern_text"]) | set(members["cluster_pattern_text"]))
+    position = {text: i for i, text in enumerate(texts)}
+    signatures = minhash_signatures(texts, 64)
+    left = members["pattern_text"].map(position).to_numpy()
+    right = members["cluster_pattern_text"].map(position).to_numpy()
+    assert signature_agreement(signatures, left, right).min() >= THRESHOLD
+    assert members.groupby(["denial_bucket", "cluster_id"], observed=True)["cluster_pattern_text"].nunique().eq(1).all()
+
+    unclustered = rci._ticket_candidates(pattern_grouped)
+    assert candidates["denial_count"].sum() == unclustered["denial_count"].sum()
+    assert round(candidates["denied_amount_sum"].sum(), 2) == round(unclustered["denied_amount_sum"].sum(), 2)
+    for bucket, rows in candidates.groupby("denial_bucket", observed=True):
+        assert round(rows["denied_amount_sum"].sum(), 2) == round(unclustered.loc[unclustered["denial_bucket"] == bucket, "denied_amount_sum"].sum(), 2)
+
+
+def test_clustering_is_deterministic(pattern_grouped):
+    first = rci._clustered_candidates(pattern_grouped, (THRESHOLD, 64, 8))
+    second = rci._clustered_candidates(pattern_grouped, (THRESHOLD, 64, 8))
+    pd.testing.assert_frame_equal(first[0], second[0])
+    pd.testing.assert_frame_equal(first[1], second[1])
+
+
+def test_threshold_one_merges_only_identical_signatures():
+    texts = ["prior auth missing", "prior auth missing ", "duplicate claim"]
+    labels, signatures = cluster_texts(texts, 1.0)
+    assert labels.tolist()[2] == 2
+    assert (signature_agreement(signatures, np.arange(3), labels) == 1.0).all()
+
+
+def test_cluster_texts_validates_arguments():
+    with pytest.raises(RuntimeError):
+        cluster_texts(["a"], 0.0)
+    with pytest.raises(RuntimeError):
+        cluster_texts(["a"], 0.8, perms=60, bands=8)
+    labels, signatures = cluster_texts([], 0.8)
+    assert labels.shape == (0,) and signatures.shape == (0, 64)
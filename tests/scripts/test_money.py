@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from decimal import ROUND_HALF_UP, Decimal
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from denials_money import fixed_how, fixed_total, fixed_units, parse_fixed, units_to_float, units_to_floats
+
+
+def _decimal_units(value: float, decimals: int) -> int:
+    """SQL ROUND(value * 10**decimals): a float product, then half away from zero."""
+    return int(Decimal(float(value) * 10**decimals).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+@pytest.mark.parametrize(
+    "value, decimals, units",
+    [
+        (0.5, 0, 1),
+        (-0.5, 0, -1),
+        (1.5, 0, 2),
+        (2.5, 0, 3),
+        (-2.5, 0, -3),
+        (0.125, 2, 13),
+        (-0.125, 2, -13),
+        (0.005, 2, 1),
+        (1234.56, 2, 123456),
+        (-1234.56, 2, -123456),
+        (0.0, 4, 0),
+        (-0.0, 4, 0),
+        (1e13, 2, 10**15),
+    ],
+)
+def test_fixed_units_rounds_half_away_from_zero(value, decimals, units):
+    assert fixed_units([value], decimals).tolist() == [units]
+
+
+def test_fixed_units_matches_decimal_rounding():
+    rng = np.random.default_rng(2)
+    values = np.concatenate([np.round(rng.normal(0, 5000, 5000), 3), rng.integers(-10**6, 10**6, 1000) / 8])
+    for decimals in (0, 2, 4, 6):
+        assert fixed_units(values, decimals).tolist() == [_decimal_units(v, decimals) for v in values]
+
+
+def test_fixed_units_accepts_series_and_nullable():
+    series = pd.Series([1.25, 2.5], dtype="Float64")
+    assert fixed_units(series, 2).dtype == np.int64
+    assert fixed_units(series, 1).tolist() == [13, 25]
+    assert fixed_units([], 2).tolist() == []
+
+
+@pytest.mark.parametrize("bad", [np.nan, np.inf, -np.inf, None])
+def test_fixed_units_rejects_non_finite(bad):
+    with pytest.raises(RuntimeError, match="finite"):
+        fixed_units(pd.Series([1.0, bad], dtype=object), 2)
+
+
+def test_fixed_units_rejects_overflow():
+    with pytest.raises(RuntimeError, match="too large"):
+        fixed_units([1e17], 2)
+    # Each value fits int64 on its own, but their sum would not.
+    with pytest.raises(RuntimeError, match="too large"):
+        fixed_units([4e16, 4e16], 2)
+    assert fixed_units([4e16], 2).tolist() == [4 * 10**18]
+
+
+def test_units_to_floats_matches_scalar_beyond_2_53():
+    units = np.array([0, 1, -1, 2**53 - 1, 2**53 + 1, -(2**53) - 3, 2**62 + 12345, 7934184], dtype=np.int64)
+    counts = np.array([1, 3, 7, 1, 3, 1, 9, 0])
+    for decimals in (0, 2, 6):
+        expected = [units_to_float(int(u), decimals) for u in units]
+        assert units_to_floats(units, decimals).tolist() == expected
+        expected = [units_to_float(int(u), decimals, int(c)) for u, c in zip(units, counts)]
+        np.testing.assert_array_equal(units_to_floats(units, decimals, counts), expected)
+
+
+def test_exact_decimal_totals():
+    assert fixed_total([0.1] * 10, 2) == 1.0
+    assert fixed_total([2645.23, 2645.23, 2643.724], 4) == 7934.184
+    assert parse_fixed(fixed_how(4, mean=True)) == (4, True)
+    assert parse_fixed("fsum") is None
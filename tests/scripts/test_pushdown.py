@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import SOURCE_FQN, windowed
+from denials_anchor import anchored
+from denials_compute import group_agg
+from denials_engine import QueryParam
+from denials_money import fixed_how, fixed_units
+from denials_pushdown import decode_exact_sums, measure_sql, rollup_level, rollup_min_aging_days, rollup_sql, top_k_sql
+from denials_topk import top_k_rows
+import denials_triage_bq as triage
+
+
+def test_rollup_sql_matches_pandas(local_engine, triage_detail):
+    detail_sql, params, detail_df = triage_detail
+    rollup_df = decode_exact_sums(local_engine.query_df(anchored(rollup_sql(detail_sql, triage.ROLLUP_MEASURES), SOURCE_FQN), params), triage.ROLLUP_MEASURES)
+    assert rollup_min_aging_days(rollup_df) == int(detail_df["min_aging_days"].iloc[0])
+    grand = rollup_df[rollup_df["dataset_week_start"].isna()]
+    assert int(grand["detail_rows"].iloc[0]) == len(detail_df)
+
+    window_rows = windowed(detail_df)
+    for depth, keys in [(1, ["denial_bucket"]), (2, ["denial_bucket", "denial_reason"])]:
+        expected = group_agg(window_rows, ["dataset_week_start", *keys], triage.SUMMARY_AGGS)
+        actual = rollup_level(rollup_df, None, depth)
+        columns = ["dataset_week_start", *keys, *triage.SUMMARY_AGGS]
+        expected = expected[columns].astype({key: str for key in keys}).sort_values(columns[: depth + 1]).reset_index(drop=True)
+        actual = actual[columns].astype({key: str for key in keys}).sort_values(columns[: depth + 1]).reset_index(drop=True)
+        pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+
+@pytest.mark.parametrize("k", [5, 40])
+def test_top_k_sql_matches_pandas_order(local_engine, triage_detail, k):
+    # Amounts repeat 500.00 and weights are shared per bucket, so k=40 cuts through tied priorities.
+    detail_sql, params, detail_df = triage_detail
+    top = local_engine.query_df(
+        anchored(top_k_sql(detail_sql, triage.WORKQUEUE_ORDER_SQL), SOURCE_FQN), [*params, QueryParam("workqueue_size", "INT64", k)]
+    )
+    for week, rows in windowed(detail_df).groupby("dataset_week_start"):
+        expected = top_k_rows(rows, triage.WORKQUEUE_ORDER, k)["claim_id"].tolist()
+        actual = top[top["dataset_week_start"] == week]
+        actual = actual.sort_values([c for c, _ in triage.WORKQUEUE_ORDER], ascending=[a for _, a in triage.WORKQUEUE_ORDER])
+        assert actual["claim_id"].tolist() == expected
+
+
+def test_fixed_sum_rounds_like_fixed_units(local_engine):
+    values = [0.005, -0.005, 0.015, 2.675, -2.675, 1.005, 0.125, 1e9 + 0.01, 0.0]
+    rows = ", ".join(f"({value!r})" for value in values)
+    for decimals in (2, 4):
+        measures = {"s": ("v", fixed_how(decimals))}
+        sql = f"SELECT {measure_sql('v', fixed_how(decimals))} AS s FROM (VALUES {rows}) AS t(v)"
+        total = decode_exact_sums(local_engine.query_df(sql, []), measures)["s"].iloc[0]
+        assert total == int(fixed_units(values, decimals).sum()) / 10**decimals
+    with pytest.raises(RuntimeError, match="means"):
+        measure_sql("v", fixed_how(2, mean=True))
+    per_row = local_engine.query_df(f"SELECT CAST(ROUND(v * 100) AS INT64) AS u FROM (VALUES {rows}) AS t(v)", [])["u"]
+    np.testing.assert_array_equal(per_row.to_numpy(), fixed_units(values, 2))
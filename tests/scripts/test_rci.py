@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from conftest import SOURCE_FQN
+from denials_anchor import anchored
+from denials_engine import QueryParam
+from denials_frame import compact_detail, intern_text
+import denials_rci_bq as rci
+
+
+@pytest.fixture()
+def rci_week(local_engine) -> pd.DataFrame:
+    params = [QueryParam("anchor_date", "DATE", date(2026, 3, 4)), QueryParam("lookback_days", "INT64", 60)]
+    detail_df = compact_detail(local_engine.query_df(anchored(rci.DETAIL_SQL.format(source_fqn=SOURCE_FQN), SOURCE_FQN), params))
+    return detail_df[detail_df["dataset_week_id"] == detail_df["dataset_week_id"].max()].drop(columns="min_aging_days")
+
+
+def _as_text(df: pd.DataFrame) -> pd.DataFrame:
+    return df.astype({column: str for column in df.select_dtypes("category")})
+
+
+def test_interned_patterns_give_the_same_tables(rci_week):
+    assert rci_week["pattern_text"].nunique() > 5
+    interned = rci_week.assign(pattern_text=intern_text(rci_week["pattern_text"]))
+    for plain_df, interned_df in zip(rci._build_pattern_tables(rci_week, 50, 5), rci._build_pattern_tables(interned, 50, 5)):
+        pd.testing.assert_frame_equal(_as_text(interned_df), _as_text(plain_df))
+    tickets = rci._build_ticket_pack(rci._ticket_candidates(rci._build_pattern_tables(interned, 50, 5)[1]), 10)
+    assert tickets["pattern_text"].map(type).eq(str).all()
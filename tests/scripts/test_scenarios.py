@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from denials_scenarios import merge_rates, parse_rates, ramp_curves, rate_column, scenario_cube, scenario_slice
+
+
+def test_parse_rates():
+    assert parse_rates("0.1,0.2,0.1, 0.3").tolist() == [0.1, 0.2, 0.3]
+    assert parse_rates("0.01:1:100").tolist() == np.linspace(0.01, 1, 100).tolist()
+    for bad in ("", "1.5", "-0.1", "nan", "0:1"):
+        with pytest.raises(RuntimeError):
+            parse_rates(bad)
+
+
+def test_merge_rates_keeps_order_and_skips_float_noise():
+    rates = np.linspace(0.1, 0.3, 3)
+    assert merge_rates(rates, np.array([0.3, 0.05])).tolist() == [*rates.tolist(), 0.05]
+    assert merge_rates(rates, np.array([0.1 + 0.2])) is rates
+
+
+def test_cube_matches_cell_by_cell_loop():
+    units = pd.DataFrame({"denial_bucket": ["AUTH_ELIG", "DUPLICATE", "OTHER_PROXY"], "exposure": [1000.0, 250.5, 0.0]})
+    rates = np.array([0.1, 0.25, 1.0])
+    ramps = ("step", "linear", "smooth")
+    cube = scenario_cube(units, "exposure", rates, weeks=6, ramps=ramps, ramp_weeks=4)
+    assert len(cube) == len(units) * len(rates) * len(ramps) * 6
+
+    rows = []
+    for unit in units.itertuples(index=False):
+        for rate in rates:
+            for ramp in ramps:
+                total = 0.0
+                for week in range(1, 7):
+                    progress = min(week / 4, 1.0)
+                    factor = {"step": 1.0, "linear": progress, "smooth": progress * progress * (3.0 - 2.0 * progress)}[ramp]
+                    total += unit.exposure * rate * factor
+                    rows.append((unit.denial_bucket, rate, ramp, week, factor, unit.exposure * rate * factor, total))
+    expected = pd.DataFrame(
+        rows,
+        columns=["denial_bucket", "prevention_rate", "ramp", "week", "ramp_factor", "prevented_amount", "cumulative_prevented_amount"],
+    )
+    pd.testing.assert_frame_equal(cube[expected.columns], expected, check_dtype=False)
+
+    table = scenario_slice(cube, ["denial_bucket"], "exposure", rates, week=2, ramp="linear")
+    assert list(table.columns) == ["denial_bucket", "exposure", *(rate_column(rate) for rate in rates)]
+    assert table[rate_column(0.25)].tolist() == [1000.0 * 0.25 * 0.5, 250.5 * 0.25 * 0.5, 0.0]
+
+
+def test_ramp_curves_and_bad_horizon():
+    curves = ramp_curves(["step", "linear", "smooth"], 3, 2)
+    np.testing.assert_array_equal(curves, [[1.0, 1.0, 1.0], [0.5, 1.0, 1.0], [0.5, 1.0, 1.0]])
+    with pytest.raises(RuntimeError):
+        scenario_cube(pd.DataFrame({"exposure": [1.0]}), "exposure", np.array([0.1]), weeks=0)
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import argparse
+
+import pandas as pd
+import pytest
+
+from conftest import LOOKBACK_DAYS, batches, windowed
+from denials_spill import SpilledTopK, make_top_k
+from denials_stream import StreamRollup, TopK
+import denials_triage_bq as triage
+
+
+def _fill(top: TopK, df: pd.DataFrame, page_rows: int) -> TopK:
+    seen = 0
+    for batch in batches(df, page_rows):
+        top.add(batch, seen)
+        seen += len(batch)
+    return top
+
+
+@pytest.mark.parametrize("order", [triage.WORKQUEUE_ORDER, (("row_priority", False),), (("denial_bucket", True), ("denied_amount", False))])
+@pytest.mark.parametrize("k", [1, 9, 300])
+def test_spilled_top_k_matches_in_memory(triage_detail, tmp_path, order, k):
+    detail_df = windowed(triage_detail[2]).reset_index(drop=True)
+    detail_df["denial_bucket"] = detail_df["denial_bucket"].astype(str)
+    spilled = SpilledTopK(k, order, "dataset_week_start", 1, str(tmp_path))
+    # A few KiB instead of the 1 MiB minimum, so the pages spill into many runs.
+    spilled.memory_bytes = 16 << 10
+    _fill(spilled, detail_df, 61)
+    in_memory = _fill(TopK(k, order, "dataset_week_start"), detail_df, 61)
+    weeks = sorted(in_memory.partitions())
+    assert sorted(spilled.partitions()) == weeks
+    actual = spilled.frame(weeks, detail_df.columns)
+    assert len(spilled.runs) > 2
+    pd.testing.assert_frame_equal(actual, in_memory.frame(weeks, detail_df.columns))
+    spilled.cleanup()
+    assert not any(tmp_path.iterdir())
+
+
+def test_stream_rollup_with_spill_matches_in_memory(triage_detail, tmp_path):
+    detail_df = triage_detail[2]
+    frames = []
+    for spill_mb in (0, 1):
+        args = argparse.Namespace(spill_mb=spill_mb, spill_dir=str(tmp_path))
+        top = make_top_k(args, triage.WORKQUEUE_ORDER, 25)
+        assert isinstance(top, SpilledTopK) == bool(spill_mb)
+        rollup = StreamRollup(triage.STREAM_MEASURES, triage.WORKQUEUE_ORDER, 25, top)
+        for batch in batches(detail_df, 200):
+            rollup.add(batch)
+        frames.append(rollup.top_k_frame(LOOKBACK_DAYS))
+        top.cleanup()
+    pd.testing.assert_frame_equal(frames[1], frames[0])
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from denials_stability import stability_trend, top_k_overlap
+
+
+def test_trend_matches_pairwise_rank_stability():
+    matrix = pd.DataFrame(
+        [[5.0, 3.0, 0.0, 1.0], [2.0, 6.0, 0.0, 1.0], [2.0, 6.0, 4.0, 0.0], [0.0, 0.0, 0.0, 0.0]],
+        index=["2026-02-02", "2026-02-09", "2026-02-16", "2026-02-23"],
+        columns=["AUTH_ELIG", "CODING", "MED_NEC", "OTHER"],
+    )
+    trend = stability_trend(matrix)
+    assert trend["prior_dataset_week_key"].tolist() == matrix.index[:-1].tolist()
+    assert trend["top2_overlap"].tolist() == [2, 1, 0]
+    assert trend["leader_bucket"].tolist()[:2] == ["CODING", "CODING"]
+    for row, (current, prior) in zip(trend.itertuples(), zip(matrix.index[1:], matrix.index[:-1])):
+        active = (matrix.loc[current] > 0) | (matrix.loc[prior] > 0)
+        ranks = matrix.loc[[current, prior], active].rank(axis=1, ascending=False, method="first").T
+        expected = ranks[current].corr(ranks[prior]) if active.sum() >= 2 else np.nan
+        assert row.rank_correlation == pytest.approx(expected, nan_ok=True)
+    assert trend["max_share_shift"].iloc[0] == pytest.approx(6 / 9 - 3 / 9)
+
+
+def test_overlap_ignores_zero_scores():
+    assert top_k_overlap(np.array([[1.0, 0.0, 0.0]]), np.array([[1.0, 0.0, 0.0]])).tolist() == [1]
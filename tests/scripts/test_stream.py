@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import argparse
+import math
+
+import pandas as pd
+import pytest
+
+from conftest import LOOKBACK_DAYS, SOURCE_FQN, batches, windowed
+from denials_anchor import anchored
+from denials_compute import group_agg
+from denials_pushdown import rollup_level, rollup_min_aging_days
+from denials_stream import ExactSum, StreamRollup, TopK
+from denials_topk import top_k_rows
+import denials_triage_bq as triage
+
+
+def stream_order_top_k(df: pd.DataFrame, order, k: int, partition: str) -> list[list[str]]:
+    """Per-partition top k of the whole stream, ties in stream order."""
+    columns = [column for column, _ in order]
+    ascending = [asc for _, asc in order]
+    return [
+        rows.sort_values(columns, ascending=ascending, kind="mergesort").head(k)["claim_id"].tolist()
+        for _, rows in df.groupby(partition, sort=True)
+    ]
+
+
+def test_exact_sum_matches_fsum():
+    values = [1e16, 1.0, -1e16, 0.1, 0.2, 0.3, 1e-8, -0.1] * 50
+    total = ExactSum()
+    for start in range(0, len(values), 7):
+        total.add_many(values[start : start + 7])
+    assert total.value() == math.fsum(values)
+
+
+@pytest.mark.parametrize("page_rows", [1000, 97])
+def test_stream_rollup_matches_detail(triage_detail, page_rows):
+    _, _, detail_df = triage_detail
+    rollup = StreamRollup(triage.STREAM_MEASURES, triage.WORKQUEUE_ORDER, 40)
+    for batch in batches(detail_df, page_rows):
+        rollup.add(batch)
+    rollup_df = rollup.rollup_frame(LOOKBACK_DAYS)
+    assert rollup_min_aging_days(rollup_df) == int(detail_df["min_aging_days"].iloc[0])
+    assert int(rollup_df.loc[rollup_df["dataset_week_start"].isna(), "detail_rows"].iloc[0]) == len(detail_df)
+
+    window_rows = windowed(detail_df)
+    for depth, keys in [(1, ["denial_bucket"]), (2, ["denial_bucket", "denial_reason"])]:
+        columns = ["dataset_week_start", *keys, *triage.SUMMARY_AGGS]
+        expected = group_agg(window_rows, ["dataset_week_start", *keys], triage.SUMMARY_AGGS)[columns]
+        actual = rollup_level(rollup_df, None, depth)[columns]
+        expected = expected.astype({key: str for key in keys}).sort_values(columns[: depth + 1]).reset_index(drop=True)
+        actual = actual.astype({key: str for key in keys}).sort_values(columns[: depth + 1]).reset_index(drop=True)
+        pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+
+    top = rollup.top_k_frame(LOOKBACK_DAYS)
+    top["dataset_week_start"] = top["service_date"] - pd.to_timedelta(top["service_date"].dt.weekday, unit="D")
+    for week, rows in window_rows.groupby("dataset_week_start"):
+        expected_ids = top_k_rows(rows, triage.WORKQUEUE_ORDER, 40)["claim_id"].tolist()
+        kept = top[top["dataset_week_start"] == week]
+        assert top_k_rows(kept, triage.WORKQUEUE_ORDER, 40)["claim_id"].tolist() == expected_ids
+
+
+@pytest.mark.parametrize("k", [1, 12, 500])
+def test_top_k_ties_keep_stream_order(triage_detail, k):
+    # Ordering on priority alone leaves the many 500.00 and 0.00 rows tied; the stream position breaks them.
+    order = [("row_priority", False)]
+    detail_df = windowed(triage_detail[2]).reset_index(drop=True)
+    assert detail_df["row_priority"].duplicated().any()
+    top = TopK(k, order, "dataset_week_start")
+    seen = 0
+    for batch in batches(detail_df, 53):
+        top.add(batch, seen)
+        seen += len(batch)
+    weeks = sorted(top.partitions())
+    kept = [[row["claim_id"] for row in top.rows([week])] for week in weeks]
+    assert kept == stream_order_top_k(detail_df, order, k, "dataset_week_start")
+
+
+def test_memory_budget_streams_the_same_result(triage_detail, local_engine, monkeypatch):
+    detail_sql, params, detail_df = triage_detail
+    monkeypatch.setattr(triage, "DETAIL_PEAK_FACTOR", 1 << 30)
+    args = argparse.Namespace(memory_budget_mb=1, memory_budget_action="stream", workqueue_size=40, lookback_days=LOOKBACK_DAYS)
+    kept_df, rollup_df, top_df = triage._fetch_detail(
+        local_engine, anchored(detail_sql, SOURCE_FQN), params, args, TopK(40, triage.WORKQUEUE_ORDER, "service_date")
+    )
+    assert kept_df is None
+    expected_rollup, expected_top = triage._stream_rollup([detail_df], TopK(40, triage.WORKQUEUE_ORDER, "service_date"), LOOKBACK_DAYS)
+    pd.testing.assert_frame_equal(rollup_df, expected_rollup)
+    pd.testing.assert_frame_equal(top_df, expected_top)
+
+    jobs = local_engine.stats.jobs
+    args.memory_budget_action = "fail"
+    with pytest.raises(RuntimeError, match="--memory-budget-mb=1"):
+        triage._fetch_detail(local_engine, anchored(detail_sql, SOURCE_FQN), params, args, TopK(40, triage.WORKQUEUE_ORDER, "service_date"))
+    assert local_engine.stats.jobs == jobs + 1
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from denials_topk import top_k_rows
+
+
+def _frame(n: int, seed: int = 3) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    score = rng.choice([0.0, 1.5, 2.25, 500.0, 1000.0], n)
+    score[rng.random(n) < 0.05] = np.nan
+    return pd.DataFrame(
+        {
+            "score": score,
+            "amount": rng.choice([10.0, 20.0, np.nan], n),
+            "name": [f"c{int(x):03d}" for x in rng.integers(0, 50, n)],
+            "count": rng.integers(0, 4, n),
+        },
+        index=rng.permutation(n) + 100,
+    )
+
+
+@pytest.mark.parametrize(
+    "order",
+    [
+        [("score", False), ("amount", False), ("name", True)],
+        [("score", True)],
+        [("count", False)],
+        [("name", True), ("score", False)],
+    ],
+)
+@pytest.mark.parametrize("k", [0, 1, 7, 150, 399, 400, 1000])
+def test_top_k_rows_matches_stable_sort(order, k):
+    df = _frame(400)
+    expected = df.sort_values([c for c, _ in order], ascending=[a for _, a in order], kind="mergesort").head(k)
+    pd.testing.assert_frame_equal(top_k_rows(df, order, k), expected)
+
+
+def test_top_k_rows_all_missing_lead():
+    df = _frame(50).assign(score=np.nan)
+    order = [("score", False), ("name", True)]
+    expected = df.sort_values(["score", "name"], ascending=[False, True], kind="mergesort").head(5)
+    pd.testing.assert_frame_equal(top_k_rows(df, order, 5), expected)
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from conftest import windowed
+from denials_compute import group_agg
+from denials_money import PRIORITY_SUM
+from denials_topk import top_k_rows
+from denials_whatif import CURRENT_PROFILE, load_weight_profiles, score_profiles
+import denials_triage_bq as triage
+
+PROFILES_CSV = "profile,AUTH_ELIG,CONTRACTUAL,OTHER_PROXY\nauth_x2,2,,\nflat,1,1,1\nkeep,,,\n"
+
+
+@pytest.fixture()
+def current_week(triage_detail) -> pd.DataFrame:
+    rows = windowed(triage_detail[2])
+    return rows[rows["dataset_week_start"] == rows["dataset_week_start"].max()].reset_index(drop=True)
+
+
+def _profiles(tmp_path, text: str = PROFILES_CSV) -> pd.DataFrame:
+    path = tmp_path / "profiles.csv"
+    path.write_text(text, encoding="utf-8")
+    return load_weight_profiles(path, triage.WHATIF_FACTORS)
+
+
+def _expected(rows: pd.DataFrame, weights: dict[str, float], k: int) -> tuple[pd.DataFrame, list[str]]:
+    weight = rows["denial_bucket"].astype(str).map(weights).fillna(rows["preventability_weight"])
+    scored = rows.assign(row_priority=rows["denied_amount"] * weight)
+    totals = group_agg(scored, ["denial_bucket"], {"priority_score": ("row_priority", PRIORITY_SUM)})
+    return totals.astype({"denial_bucket": str}), top_k_rows(scored, triage.WORKQUEUE_ORDER, k)["claim_id"].tolist()
+
+
+def test_profiles_match_rescored_detail(tmp_path, current_week):
+    assert {"AUTH_ELIG", "CONTRACTUAL"} <= set(current_week["denial_bucket"].astype(str))
+    ranking, workqueue = score_profiles(current_week, "denied_amount", triage.WHATIF_FACTORS, _profiles(tmp_path), 15)
+    all_buckets = {bucket: 1.0 for bucket in ("AUTH_ELIG", "CONTRACTUAL", "OTHER_PROXY")}
+    cases = {CURRENT_PROFILE: {}, "auth_x2": {"AUTH_ELIG": 2.0}, "flat": all_buckets, "keep": {}}
+    for profile, weights in cases.items():
+        totals, queue = _expected(current_week, weights, 15)
+        got = ranking[ranking["profile"] == profile].set_index("denial_bucket")["priority_score"]
+        assert got.to_dict() == totals.set_index("denial_bucket")["priority_score"].to_dict()
+        assert workqueue.loc[workqueue["profile"] == profile, "claim_id"].tolist() == queue
+    current = ranking[ranking["profile"] == CURRENT_PROFILE]
+    assert (current["rank"] == current["current_rank"]).all()
+    assert (workqueue.loc[workqueue["profile"] == CURRENT_PROFILE, "in_current_workqueue"] == "Y").all()
+
+
+@pytest.mark.parametrize(
+    "text, message",
+    [
+        ("profile,NOT_A_BUCKET\na,1\n", "Unknown weight columns"),
+        ("name,AUTH_ELIG\na,1\n", "profile"),
+        ("profile,AUTH_ELIG\ncurrent,1\n", "unique"),
+        ("profile,AUTH_ELIG\na,1\na,2\n", "unique"),
+        ("profile,AUTH_ELIG\na,-1\n", "non-negative"),
+        ("profile,AUTH_ELIG\na,abc\n", "non-negative"),
+    ],
+)
+def test_bad_profiles_raise(tmp_path, text, message):
+    with pytest.raises(RuntimeError, match=message):
+        _profiles(tmp_path, text)
+
+
+def test_weights_beyond_two_decimals_raise(tmp_path, current_week):
+    with pytest.raises(RuntimeError, match="decimals"):
+        score_profiles(current_week, "denied_amount", triage.WHATIF_FACTORS, _profiles(tmp_path, "profile,AUTH_ELIG\na,0.125\n"), 5)